@@ -11,13 +11,22 @@ import pandas as pd
 import numpy as np
 import yaml
 import os
+import json
 import warnings
+from concurrent.futures import ProcessPoolExecutor
 warnings.filterwarnings('ignore')
 
 from statsmodels.tsa.arima.model import ARIMA
 from statsmodels.tsa.stattools import arma_order_select_ic
 from sklearn.metrics import mean_squared_error
 from loguru import logger
+from processing.panel_store import init_worker, open_panel, worker_panel
+from econometrics.resampling import coef_empirical_pvalue, resampling_kwargs
+from econometrics.granger_causality import econometrics_jobs, primary_rows, return_column
+from processing.sentiment_index import index_columns
+from econometrics.incremental import (
+    changed_tickers, load_state, merge_results, save_fingerprints, slice_fingerprint,
+)
 
 
 def load_config(path: str = "config.yaml") -> dict:
@@ -46,8 +55,34 @@ def find_best_arima_order(series: pd.Series, max_p: int = 3, max_q: int = 3) ->
     return best_order, best_aic
 
 
-def fit_arimax(series: pd.Series, exog: pd.Series, order: tuple) -> dict:
-    """Dopasowuje model ARIMAX i zwraca metryki."""
+def select_exog(series: pd.Series, candidates: pd.DataFrame, order: tuple) -> tuple[str, dict]:
+    """
+    Wybór zmiennej egzogennej wg AIC modelu ARIMAX na zbiorze treningowym (80%).
+
+    Returns:
+        (nazwa kolumny, {kolumna: AIC})
+    """
+    split = int(len(series) * 0.8)
+    aics = {}
+    for col in candidates.columns:
+        try:
+            exog = candidates[col].iloc[:split].values.reshape(-1, 1)
+            aics[col] = ARIMA(series.iloc[:split], exog=exog, order=order).fit().aic
+        except Exception:
+            continue
+    if not aics:
+        return candidates.columns[0], aics
+    return min(aics, key=aics.get), aics
+
+
+def fit_arimax(series: pd.Series, exog: pd.Series, order: tuple, model_path: str | None = None) -> dict:
+    """
+    Dopasowuje model ARIMAX i zwraca metryki.
+
+    Z model_path zapisuje model do serwowania prognoz: parametry z treningu,
+    stan filtra dociągnięty przez zbiór testowy (append bez refitu) — gotowy
+    do prognozy na kolejną sesję po ostatniej obserwacji.
+    """
     # Train/test split 80/20
     n = len(series)
     split = int(n * 0.8)
@@ -72,6 +107,9 @@ def fit_arimax(series: pd.Series, exog: pd.Series, order: tuple) -> dict:
 
         improvement = (arima_rmse - arimax_rmse) / arima_rmse * 100
 
+        if model_path:
+            arimax.append(test_y.values, exog=test_x, refit=False).save(model_path)
+
         return {
             "arima_aic": round(arima_aic, 2),
             "arimax_aic": round(arimax_aic, 2),
@@ -89,92 +127,231 @@ def fit_arimax(series: pd.Series, exog: pd.Series, order: tuple) -> dict:
         return {}
 
 
-def run_arimax(config_path: str = "config.yaml") -> pd.DataFrame:
+def model_path_for(models_dir: str, ticker: str) -> str:
+    return os.path.join(models_dir, f"{ticker}.pkl")
+
+
+def meta_path_for(model_path: str) -> str:
+    return f"{os.path.splitext(model_path)[0]}.json"
+
+
+def save_model_meta(model_path: str, meta: dict) -> None:
+    """Metadane modelu (zmienna egzogenna, ostatnia data) dla econometrics.forecast_server."""
+    with open(meta_path_for(model_path), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2, ensure_ascii=False, default=str)
+
+
+def run_arimax_for_ticker(
+    df_t: pd.DataFrame,
+    ticker: str,
+    granger_t: pd.DataFrame,
+    return_col: str = "log_return",
+    resampling: dict | None = None,
+    model_path: str | None = None,
+    index_candidates: list[str] | None = None,
+) -> dict:
+    """
+    ARIMA vs ARIMAX dla jednej spółki.
+
+    Args:
+        granger_t: wiersze granger_results tej spółki (wybór lagu sentymentu).
+        model_path: jeśli podany, dopasowany model ARIMAX zostaje tam zapisany.
+        index_candidates: kolumny indeksów sentymentu z wygaszaniem (sentiment_idx_*)
+            — wchodzą (z opóźnieniem 1 sesji) jako alternatywne zmienne egzogenne
+            obok lagu sentymentu; wybór wg AIC na zbiorze treningowym. Wynik trafia
+            do sentiment_coef / sentiment_pvalue, więc intensywność newsów
+            (news_intensity_*) nie jest tu kandydatem.
+
+    Returns:
+        Słownik metryk (pusty, gdy model nie powstał).
+    """
+    df_t = df_t.sort_values("date")
+
+    # Znajdź optymalny lag sentymentu (najniższe p-value Grangera)
+    best_lag = 1
+    granger_t = primary_rows(granger_t)
+    g_ticker = granger_t[granger_t["significant"]] if not granger_t.empty else granger_t
+    if not g_ticker.empty:
+        best_lag = int(g_ticker.loc[g_ticker["p_value"].idxmin(), "lag_days"])
+
+    lag_col = f"sentiment_lag{best_lag}" if best_lag <= 6 else "sentiment_lag1"
+    if lag_col not in df_t.columns:
+        lag_col = "sentiment_lag1"
+
+    # Indeks z dnia t zawiera newsy z dnia t — jako egzogenna wchodzi wartość z poprzedniej sesji
+    candidate_cols = [lag_col]
+    for col in index_candidates or []:
+        df_t[f"{col}_lag1"] = df_t[col].shift(1)
+        candidate_cols.append(f"{col}_lag1")
+
+    df_t = df_t.dropna(subset=[return_col, *candidate_cols])
+
+    if len(df_t) < 30:
+        logger.warning(f"{ticker}: Za mało obserwacji ({len(df_t)}) — pomijam.")
+        return {}
+
+    series = df_t[return_col].reset_index(drop=True)
+
+    logger.info(f"\n{'='*50}")
+    logger.info(f"ARIMAX dla: {ticker} | best_lag={best_lag} | n={len(df_t)}")
+
+    # Dobierz rząd ARIMA
+    order, base_aic = find_best_arima_order(series)
+    logger.info(f"  Optymalny rząd ARIMA: {order} (AIC={base_aic:.1f})")
+
+    exog_col = lag_col
+    if len(candidate_cols) > 1:
+        exog_col, aics = select_exog(series, df_t[candidate_cols].reset_index(drop=True), order)
+        logger.info("  AIC kandydatów egzogennych: " + ", ".join(f"{c}={a:.1f}" for c, a in aics.items()))
+        logger.info(f"  Wybrana zmienna egzogenna: {exog_col}")
+    exog = df_t[exog_col].reset_index(drop=True)
+
+    # Dopasuj i porównaj modele
+    results = fit_arimax(series, exog, order, model_path=model_path)
+    if not results:
+        return {}
+
+    results["ticker"] = ticker
+    results["best_sentiment_lag"] = best_lag
+    results["exog_column"] = exog_col
+
+    if model_path:
+        save_model_meta(model_path, {
+            "ticker": ticker,
+            "order": list(order),
+            "return_col": return_col,
+            "exog_column": exog_col,
+            "last_date": df_t["date"].iloc[-1].date().isoformat(),
+            "n_obs": len(series),
+        })
+
+    if resampling and resampling.get("enabled", False):
+        # Aproksymacja ARX na zbiorze treningowym, tym samym co sentiment_pvalue
+        split = results["n_train"]
+        results["sentiment_pvalue_empirical"] = round(coef_empirical_pvalue(
+            series.values[:split], exog.values[:split], ar_lags=order[0],
+            ticker=ticker, **resampling_kwargs(resampling),
+        ), 4)
+
+    logger.info(f"  ARIMA  RMSE: {results['arima_rmse']:.6f} | AIC: {results['arima_aic']:.1f}")
+    logger.info(f"  ARIMAX RMSE: {results['arimax_rmse']:.6f} | AIC: {results['arimax_aic']:.1f}")
+    logger.info(f"  Poprawa RMSE: {results['rmse_improvement_pct']:+.1f}%")
+    logger.info(f"  Współczynnik sentymentu: {results['sentiment_coef']:.6f} (p={results['sentiment_pvalue']:.4f})")
+    if "sentiment_pvalue_empirical" in results:
+        logger.info(f"  Empiryczne p-value sentymentu: {results['sentiment_pvalue_empirical']:.4f}")
+
+    marker = "✓ Sentyment istotny!" if results['sentiment_pvalue'] < 0.05 else "✗ Sentyment nieistotny"
+    if len(candidate_cols) > 1:
+        marker += f" (zmienna wybrana spośród {len(candidate_cols)} kandydatów — p-value bez korekty na wybór)"
+    logger.info(f"  → {marker}")
+    return results
+
+
+def _arimax_worker(ticker: str, columns: list[str], granger_t: pd.DataFrame, kwargs: dict) -> dict:
+    """Zadanie puli: wycinek spółki czytany z panelu memmap procesu, bez pickle danych."""
+    return run_arimax_for_ticker(worker_panel().frame(ticker, columns), ticker, granger_t, **kwargs)
+
+
+def run_arimax(config_path: str = "config.yaml", force: bool = False) -> pd.DataFrame:
+    """
+    ARIMAX dla spółek z istotnymi wynikami Grangera.
+
+    Przy econometrics.incremental przeliczane są tylko spółki ze zmienionym
+    wycinkiem danych / wynikami Grangera / ustawieniami albo bez zapisanego modelu.
+    """
     config = load_config(config_path)
     merged_path = config["paths"]["merged"]
-    granger_path = "data/processed/granger_results.csv"
+    granger_path = config["paths"]["granger_results"]
+    output_path = config["paths"]["arimax_results"]
+    models_dir = config["paths"]["arimax_models"]
+    return_col = return_column(config)
+    resampling = config["econometrics"].get("resampling", {})
+    incremental = config["econometrics"].get("incremental", False) and not force
+    n_jobs = econometrics_jobs(config)
 
     if not os.path.exists(merged_path):
         logger.error(f"Brak pliku: {merged_path}")
         return pd.DataFrame()
 
-    merged = pd.read_csv(merged_path, parse_dates=["date"])
+    panel = open_panel(config)
     granger = pd.read_csv(granger_path) if os.path.exists(granger_path) else pd.DataFrame()
 
     # Wybierz spółki z istotnymi wynikami Grangera
     if not granger.empty:
-        sig_tickers = granger[granger["significant"]]["ticker"].unique()
+        sig_tickers = [t for t in granger[granger["significant"]]["ticker"].unique() if t in panel.tickers]
     else:
-        sig_tickers = merged["ticker"].unique()
+        sig_tickers = panel.tickers
 
     if len(sig_tickers) == 0:
         logger.warning("Brak spółek z istotnymi wynikami Grangera — testuję wszystkie.")
-        sig_tickers = merged["ticker"].unique()
+        sig_tickers = panel.tickers
 
     logger.info(f"ARIMAX dla spółek: {list(sig_tickers)}")
 
-    all_results = []
-
+    empty_granger = pd.DataFrame(columns=["ticker", "lag_days", "p_value", "significant"])
+    granger_by_ticker = {}
+    fingerprints = {}
+    # Tylko indeksy sentymentu — intensywność newsów to nie "sentiment_coef"
+    index_candidates = [
+        c for c in index_columns(panel.columns) if c.startswith("sentiment_idx_")
+    ] if config["econometrics"].get("use_sentiment_index", False) else []
+    settings = {"return_col": return_col, "resampling": resampling, "index_candidates": index_candidates}
+    data_cols = ["date", return_col] + [c for c in panel.columns if c.startswith("sentiment_lag")] + index_candidates
     for ticker in sig_tickers:
-        df_t = merged[merged["ticker"] == ticker].sort_values("date").copy()
-
-        # Znajdź optymalny lag sentymentu (najniższe p-value Grangera)
-        best_lag = 1
-        if not granger.empty:
-            g_ticker = granger[(granger["ticker"] == ticker) & (granger["significant"])]
-            if not g_ticker.empty:
-                best_lag = int(g_ticker.loc[g_ticker["p_value"].idxmin(), "lag_days"])
-
-        lag_col = f"sentiment_lag{best_lag}" if best_lag <= 6 else "sentiment_lag1"
-        if lag_col not in df_t.columns:
-            lag_col = "sentiment_lag1"
-
-        df_t = df_t.dropna(subset=["log_return", lag_col])
-
-        if len(df_t) < 30:
-            logger.warning(f"{ticker}: Za mało obserwacji ({len(df_t)}) — pomijam.")
-            continue
-
-        series = df_t["log_return"].reset_index(drop=True)
-        exog = df_t[lag_col].reset_index(drop=True)
-
-        logger.info(f"\n{'='*50}")
-        logger.info(f"ARIMAX dla: {ticker} | best_lag={best_lag} | n={len(df_t)}")
-
-        # Dobierz rząd ARIMA
-        order, base_aic = find_best_arima_order(series)
-        logger.info(f"  Optymalny rząd ARIMA: {order} (AIC={base_aic:.1f})")
-
-        # Dopasuj i porównaj modele
-        results = fit_arimax(series, exog, order)
-
-        if results:
-            results["ticker"] = ticker
-            results["best_sentiment_lag"] = best_lag
-
-            logger.info(f"  ARIMA  RMSE: {results['arima_rmse']:.6f} | AIC: {results['arima_aic']:.1f}")
-            logger.info(f"  ARIMAX RMSE: {results['arimax_rmse']:.6f} | AIC: {results['arimax_aic']:.1f}")
-            logger.info(f"  Poprawa RMSE: {results['rmse_improvement_pct']:+.1f}%")
-            logger.info(f"  Współczynnik sentymentu: {results['sentiment_coef']:.6f} (p={results['sentiment_pvalue']:.4f})")
-
-            marker = "✓ Sentyment istotny!" if results['sentiment_pvalue'] < 0.05 else "✗ Sentyment nieistotny"
-            logger.info(f"  → {marker}")
+        granger_t = granger[granger["ticker"] == ticker] if not granger.empty else empty_granger
+        granger_by_ticker[ticker] = granger_t
+        granger_key = primary_rows(granger_t)[["lag_days", "p_value", "significant"]].to_dict(orient="records")
+        fingerprints[ticker] = slice_fingerprint(
+            panel.frame(ticker, data_cols), {**settings, "granger": granger_key}
+        )
+
+    existing, previous = load_state(output_path) if incremental else (pd.DataFrame(), {})
+    todo = changed_tickers(fingerprints, previous)
+    if not existing.empty:
+        # Spółki z wynikiem, ale bez zapisanego modelu / metadanych — też do przeliczenia
+        todo += [
+            t for t in existing["ticker"].unique()
+            if t in fingerprints and t not in todo and not (
+                os.path.exists(model_path_for(models_dir, t))
+                and os.path.exists(meta_path_for(model_path_for(models_dir, t)))
+            )
+        ]
+    logger.info(f"Do przeliczenia: {len(todo)}/{len(fingerprints)} spółek (reszta bez zmian)")
+
+    os.makedirs(models_dir, exist_ok=True)
+    kwargs = {ticker: dict(return_col=return_col, resampling=resampling, index_candidates=index_candidates,
+                           model_path=model_path_for(models_dir, ticker)) for ticker in todo}
+    if n_jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(n_jobs, len(todo)), initializer=init_worker, initargs=(panel.panel_dir,)
+        ) as executor:
+            futures = [
+                executor.submit(_arimax_worker, ticker, data_cols, granger_by_ticker[ticker], kwargs[ticker])
+                for ticker in todo
+            ]
+            results = [f.result() for f in futures]
+    else:
+        results = [
+            run_arimax_for_ticker(panel.frame(ticker, data_cols), ticker, granger_by_ticker[ticker], **kwargs[ticker])
+            for ticker in todo
+        ]
+    all_results = [pd.DataFrame([r]) for r in results if r]
 
-            all_results.append(results)
+    unchanged = set(fingerprints) - set(todo)
+    final_df = merge_results(existing, all_results, keep=unchanged, order=list(sig_tickers))
 
-    if not all_results:
+    if final_df.empty:
         logger.error("Brak wyników ARIMAX.")
         return pd.DataFrame()
 
-    final_df = pd.DataFrame(all_results)
-    cols = ["ticker", "order", "best_sentiment_lag", "arima_aic", "arimax_aic",
+    cols = ["ticker", "order", "best_sentiment_lag", "exog_column", "arima_aic", "arimax_aic",
             "arima_rmse", "arimax_rmse", "rmse_improvement_pct",
-            "sentiment_coef", "sentiment_pvalue", "n_train", "n_test"]
+            "sentiment_coef", "sentiment_pvalue", "sentiment_pvalue_empirical", "n_train", "n_test"]
     final_df = final_df[[c for c in cols if c in final_df.columns]]
 
-    output_path = "data/processed/arimax_results.csv"
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     final_df.to_csv(output_path, index=False)
+    save_fingerprints(output_path, fingerprints)
 
     logger.info(f"\n{'='*50}")
     logger.info("PODSUMOWANIE ARIMAX:")
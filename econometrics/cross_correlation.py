@@ -0,0 +1,204 @@
+"""
+Korelacje krzyżowe: sentyment z opóźnieniem k × stopa zwrotu, dla wszystkich spółek i lagów naraz.
+
+Panel układamy w macierze dzień × spółka (NaN tam, gdzie brak obserwacji),
+standaryzowane kolumnami. Dla lagu k para (sentyment_{t-k}, zwrot_t) to po
+prostu macierz sentymentu przesunięta o k wierszy. Korelacja Pearsona liczona
+jest na wspólnej próbie każdej pary (pairwise-complete) ze statystyk
+dostatecznych — maski obecności i wartości z zerami w miejscu NaN wchodzą do
+iloczynów macierzowych, więc wszystkie pary spółek dla danego lagu to kilka
+mnożeń T×N · N×T:
+
+    n_ij = Mx_iᵀ My_j,  Σx = X_iᵀ My_j,  Σy = Mx_iᵀ Y_j,  Σxy = X_iᵀ Y_j, ...
+
+Bez cross_ticker liczymy tylko przekątną (sentyment spółki × jej zwrot).
+Przedziały ufności z transformacji Fishera z, p-value z testu t (H0: ρ = 0).
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import yaml
+from loguru import logger
+from scipy import stats
+
+from econometrics.granger_causality import PRIMARY_CAUSE, return_column
+from processing.panel_store import open_panel
+
+
+def load_config(path: str = "config.yaml") -> dict:
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+def panel_matrices(panel, columns: list[str]) -> tuple[np.ndarray, list[str], dict[str, np.ndarray]]:
+    """
+    Kolumny panelu jako macierze (dni × spółki) na wspólnej osi dat.
+
+    Returns:
+        (daty, spółki, {kolumna: macierz float64 z NaN dla braków})
+    """
+    dates = np.unique(panel.array("date"))
+    tickers = panel.tickers
+    matrices = {c: np.full((len(dates), len(tickers)), np.nan) for c in columns}
+    for j, ticker in enumerate(tickers):
+        rows = np.searchsorted(dates, panel.view(ticker, "date"))
+        for c in columns:
+            matrices[c][rows, j] = panel.view(ticker, c)
+    return dates, tickers, matrices
+
+
+def _standardize(m: np.ndarray) -> np.ndarray:
+    """Kolumny do średniej 0 i odchylenia 1 (po obecnych wartościach) — stabilność sum."""
+    mean = np.nanmean(m, axis=0)
+    std = np.nanstd(m, axis=0)
+    return (m - mean) / np.where(std > 0, std, 1.0)
+
+
+def lagged_correlations(
+    x: np.ndarray, y: np.ndarray, max_lag: int, cross: bool = False
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Korelacje Pearsona corr(x_{t-k}[:, i], y_t[:, j]) dla k = 0..max_lag (pairwise-complete).
+
+    Args:
+        x, y: macierze (N dni × T spółek) z NaN dla braków.
+        cross: wszystkie pary (i, j); inaczej tylko i = j.
+
+    Returns:
+        (r, n): przy cross kształt (K+1, T, T), inaczej (K+1, T); n — liczba wspólnych obserwacji.
+    """
+    x, y = _standardize(x), _standardize(y)
+    mx, my = ~np.isnan(x), ~np.isnan(y)
+    x0, y0 = np.where(mx, x, 0.0), np.where(my, y, 0.0)
+    mx, my = mx.astype(np.float64), my.astype(np.float64)
+
+    def pair_sums(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        return a.T @ b if cross else np.einsum("nt,nt->t", a, b)
+
+    r_all, n_all = [], []
+    n_rows = len(x)
+    for k in range(max_lag + 1):
+        # Wiersz t macierzy y łączymy z wierszem t - k macierzy x
+        xs, xs2, mxs = x0[: n_rows - k], x0[: n_rows - k] ** 2, mx[: n_rows - k]
+        ys, ys2, mys = y0[k:], y0[k:] ** 2, my[k:]
+        n = pair_sums(mxs, mys)
+        sx, sy = pair_sums(xs, mys), pair_sums(mxs, ys)
+        sxx, syy, sxy = pair_sums(xs2, mys), pair_sums(mxs, ys2), pair_sums(xs, ys)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = n * sxy - sx * sy
+            var = (n * sxx - sx ** 2) * (n * syy - sy ** 2)
+            r = np.where((n > 2) & (var > 1e-12 * np.maximum(n, 1) ** 4), cov / np.sqrt(var), np.nan)
+        r_all.append(np.clip(r, -1.0, 1.0))
+        n_all.append(n)
+    return np.stack(r_all), np.stack(n_all).astype(np.int64)
+
+
+def correlation_bounds(r: np.ndarray, n: np.ndarray, confidence: float = 0.95) -> tuple[np.ndarray, ...]:
+    """Przedział ufności (Fisher z) i p-value testu t dla korelacji r z próby n."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.arctanh(np.clip(r, -0.999999, 0.999999))
+        half = stats.norm.ppf(0.5 + confidence / 2) / np.sqrt(n - 3)
+        lower, upper = np.tanh(z - half), np.tanh(z + half)
+        t = r * np.sqrt((n - 2) / np.maximum(1 - r ** 2, 1e-12))
+        p_value = 2 * stats.t.sf(np.abs(t), n - 2)
+    invalid = n <= 3
+    return (np.where(invalid, np.nan, lower), np.where(invalid, np.nan, upper),
+            np.where(n <= 2, np.nan, p_value))
+
+
+def cross_correlation_table(
+    panel,
+    return_col: str = "log_return",
+    max_lag: int = 6,
+    cross_ticker: bool = False,
+    confidence: float = 0.95,
+    alpha: float = 0.05,
+    min_obs: int = 10,
+    cause: str = PRIMARY_CAUSE,
+) -> pd.DataFrame:
+    """
+    Tabela korelacji w formacie długim.
+
+    Returns:
+        DataFrame: ticker (zwrot), sentiment_ticker, lag_days, n_obs, corr,
+        ci_lower, ci_upper, p_value, significant — pary z n_obs >= min_obs
+        i niestałym sentymentem.
+    """
+    _, tickers, m = panel_matrices(panel, [cause, return_col])
+    r, n = lagged_correlations(m[cause], m[return_col], max_lag, cross=cross_ticker)
+    lower, upper, p_value = correlation_bounds(r, n, confidence)
+
+    lags = np.arange(max_lag + 1)
+    tick = np.asarray(tickers, dtype=object)
+    if cross_ticker:
+        lag_idx, sent_idx, ret_idx = np.meshgrid(lags, np.arange(len(tick)), np.arange(len(tick)), indexing="ij")
+    else:
+        lag_idx, sent_idx = np.meshgrid(lags, np.arange(len(tick)), indexing="ij")
+        ret_idx = sent_idx
+    table = pd.DataFrame({
+        "ticker": tick[ret_idx.ravel()],
+        "sentiment_ticker": tick[sent_idx.ravel()],
+        "lag_days": lag_idx.ravel(),
+        "n_obs": n.ravel(),
+        "corr": r.ravel(),
+        "ci_lower": lower.ravel(),
+        "ci_upper": upper.ravel(),
+        "p_value": p_value.ravel(),
+    })
+    table["significant"] = table["p_value"] < alpha
+    table = table[(table["n_obs"] >= min_obs) & table["corr"].notna()]
+    return table.sort_values(["ticker", "sentiment_ticker", "lag_days"], ignore_index=True)
+
+
+def own_correlation_matrix(table: pd.DataFrame, lags: range | None = None) -> pd.DataFrame:
+    """Spółka × "Lag k" — korelacja sentymentu spółki z jej własną stopą zwrotu (do heatmapy)."""
+    own = table[table["ticker"] == table["sentiment_ticker"]]
+    if lags is not None:
+        own = own[own["lag_days"].isin(list(lags))]
+    matrix = own.pivot(index="ticker", columns="lag_days", values="corr")
+    matrix.columns = [f"Lag {k}" for k in matrix.columns]
+    matrix.index.name = None
+    return matrix.reindex(list(dict.fromkeys(own["ticker"]))).round(3)
+
+
+def run_cross_correlation(config_path: str = "config.yaml") -> pd.DataFrame:
+    """Korelacje krzyżowe dla całego panelu → paths.cross_correlation."""
+    config = load_config(config_path)
+    settings = config["econometrics"].get("cross_correlation", {})
+    output_path = config["paths"]["cross_correlation"]
+
+    if not os.path.exists(config["paths"]["merged"]):
+        logger.error(f"Brak pliku: {config['paths']['merged']}. Uruchom najpierw moduły ingestion i sentiment.")
+        return pd.DataFrame()
+
+    panel = open_panel(config)
+    table = cross_correlation_table(
+        panel,
+        return_col=return_column(config),
+        max_lag=settings.get("max_lag", 6),
+        cross_ticker=settings.get("cross_ticker", False),
+        confidence=settings.get("confidence", 0.95),
+        alpha=config["econometrics"]["significance_level"],
+        min_obs=settings.get("min_obs", 10),
+    )
+    if table.empty:
+        logger.error("Brak korelacji (za mało obserwacji).")
+        return table
+
+    own = table[table["ticker"] == table["sentiment_ticker"]]
+    strongest = own.loc[own["corr"].abs().idxmax()]
+    logger.info(
+        f"Korelacje krzyżowe: {len(table)} par × lagów | istotne: {int(table['significant'].sum())} | "
+        f"najsilniejsza własna: {strongest['ticker']} lag {strongest['lag_days']} r={strongest['corr']:+.3f} "
+        f"[{strongest['ci_lower']:+.2f}, {strongest['ci_upper']:+.2f}]"
+    )
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    table.to_csv(output_path, index=False)
+    logger.success(f"Korelacje krzyżowe zapisane do: {output_path}")
+    return table
+
+
+if __name__ == "__main__":
+    run_cross_correlation()
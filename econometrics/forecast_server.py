@@ -0,0 +1,223 @@
+"""
+Lokalny serwis prognoz na kolejną sesję z zapisanych modeli ARIMAX.
+
+Modele (paths.arimax_models/<ticker>.pkl + <ticker>.json) zapisuje run_arimax:
+parametry z treningu, stan filtra do ostatniej obserwacji. Serwis ładuje je
+leniwie przy pierwszym zapytaniu o spółkę; prognoza to jeden krok filtra
+Kalmana (get_forecast), bez dopasowywania modelu.
+
+Endpointy (JSON):
+    GET  /health
+    GET  /forecast?ticker=LPP.WA&exog=0.31[&alpha=0.05]
+         exog — wartość zmiennej egzogennej modelu (exog_column) dla prognozowanej
+         sesji, np. dzisiejszy sentyment dla sentiment_lag1
+    POST /update  {"ticker": "LPP.WA", "value": 0.0042, "exog": 0.31, "date": "2026-06-18"}
+         nowa obserwacja stopy zwrotu + egzogenna z tej sesji → append(refit=False)
+
+Użycie: python -m econometrics.forecast_server
+"""
+import json
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import yaml
+from loguru import logger
+from statsmodels.tsa.arima.model import ARIMAResults
+
+from econometrics.arimax_model import meta_path_for, model_path_for, save_model_meta
+
+
+def load_config(path: str = "config.yaml") -> dict:
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+class ModelStore:
+    """Leniwie ładowane modele per spółka; aktualizacje stanu pod blokadą spółki."""
+
+    def __init__(self, models_dir: str, persist_updates: bool = True):
+        self.models_dir = models_dir
+        self.persist_updates = persist_updates
+        self._models: dict[str, tuple] = {}
+        self._locks: dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _ticker_lock(self, ticker: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def available(self) -> list[str]:
+        if not os.path.isdir(self.models_dir):
+            return []
+        return sorted(
+            name[:-len(".pkl")] for name in os.listdir(self.models_dir)
+            if name.endswith(".pkl") and os.path.exists(meta_path_for(os.path.join(self.models_dir, name)))
+        )
+
+    def get(self, ticker: str) -> tuple:
+        """(wyniki ARIMAX, metadane); KeyError, gdy brak modelu spółki."""
+        model = self._models.get(ticker)
+        if model is not None:
+            return model
+        with self._ticker_lock(ticker):
+            if ticker not in self._models:
+                path = model_path_for(self.models_dir, ticker)
+                if not (os.path.exists(path) and os.path.exists(meta_path_for(path))):
+                    raise KeyError(ticker)
+                start = time.perf_counter()
+                with open(meta_path_for(path), encoding="utf-8") as f:
+                    meta = json.load(f)
+                self._models[ticker] = (ARIMAResults.load(path), meta)
+                logger.info(f"Załadowano model {ticker} ({(time.perf_counter() - start) * 1000:.0f} ms)")
+            return self._models[ticker]
+
+    def forecast(self, ticker: str, exog: float, alpha: float = 0.05) -> dict:
+        results, meta = self.get(ticker)
+        prediction = results.get_forecast(steps=1, exog=np.array([[exog]]))
+        mean = float(np.asarray(prediction.predicted_mean)[0])
+        lower, upper = np.asarray(prediction.conf_int(alpha=alpha))[0]
+        return {
+            "ticker": ticker,
+            "forecast": mean,
+            "lower": float(lower),
+            "upper": float(upper),
+            "alpha": alpha,
+            "return_col": meta["return_col"],
+            "exog_column": meta["exog_column"],
+            "exog": exog,
+            "last_date": meta["last_date"],
+            "n_obs": meta["n_obs"],
+        }
+
+    def update(self, ticker: str, value: float, exog: float, date: str | None = None) -> dict:
+        """Dokłada obserwację do stanu filtra (bez ponownej estymacji parametrów)."""
+        self.get(ticker)
+        with self._ticker_lock(ticker):
+            results, meta = self._models[ticker]
+            results = results.append(np.array([value]), exog=np.array([[exog]]), refit=False)
+            meta = {**meta, "n_obs": meta["n_obs"] + 1, "last_date": date or meta["last_date"]}
+            self._models[ticker] = (results, meta)
+            if self.persist_updates:
+                path = model_path_for(self.models_dir, ticker)
+                tmp_path = f"{path}.tmp"
+                results.save(tmp_path)
+                os.replace(tmp_path, path)
+                save_model_meta(path, meta)
+        return {"ticker": ticker, "n_obs": meta["n_obs"], "last_date": meta["last_date"]}
+
+
+def _finite(name: str, raw) -> float:
+    """float z parametru żądania; ValueError dla nan/inf (model ich nie przyjmie)."""
+    value = float(raw)
+    if not math.isfinite(value):
+        raise ValueError(f"{name} musi być skończoną liczbą, jest: {raw}")
+    return value
+
+
+class ForecastHandler(BaseHTTPRequestHandler):
+    store: ModelStore = None
+
+    def _send(self, status: int, payload: dict) -> None:
+        try:
+            body = json.dumps(payload, ensure_ascii=False, allow_nan=False).encode("utf-8")
+        except ValueError:
+            # NaN / inf w wyniku modelu — nie wysyłamy niepoprawnego JSON-a
+            status, body = 500, json.dumps({"error": "Model zwrócił wartość nieskończoną"}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/health":
+            self._send(200, {"status": "ok", "models": self.store.available()})
+            return
+        if url.path != "/forecast":
+            self._send(404, {"error": f"Nieznany endpoint: {url.path}"})
+            return
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        missing = [k for k in ("ticker", "exog") if k not in query]
+        if missing:
+            self._send(400, {"error": f"Brak parametrów: {', '.join(missing)}"})
+            return
+        try:
+            exog, alpha = _finite("exog", query["exog"]), _finite("alpha", query.get("alpha", 0.05))
+            if not 0 < alpha < 1:
+                raise ValueError(f"alpha musi być w przedziale (0, 1), jest: {alpha}")
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+            return
+        try:
+            payload = self.store.forecast(query["ticker"], exog, alpha)
+        except KeyError:
+            self._send(404, {"error": f"Brak modelu dla {query['ticker']}"})
+            return
+        except Exception as e:
+            logger.exception(f"Błąd prognozy {query['ticker']}")
+            self._send(500, {"error": f"Błąd prognozy: {e}"})
+            return
+        self._send(200, payload)
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path != "/update":
+            self._send(404, {"error": f"Nieznany endpoint: {self.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise ValueError(f"Nieprawidłowy Content-Length: {length}")
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+            return
+        try:
+            data = json.loads(self.rfile.read(length) or b"{}")
+            ticker, value, exog = data["ticker"], _finite("value", data["value"]), _finite("exog", data["exog"])
+        except KeyError as e:
+            self._send(400, {"error": f"Brak pola: {e.args[0]}"})
+            return
+        except (ValueError, TypeError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        try:
+            payload = self.store.update(ticker, value, exog, data.get("date"))
+        except KeyError:
+            self._send(404, {"error": f"Brak modelu dla {ticker}"})
+            return
+        except Exception as e:
+            logger.exception(f"Błąd aktualizacji {ticker}")
+            self._send(500, {"error": f"Błąd aktualizacji: {e}"})
+            return
+        self._send(200, payload)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def build_server(config: dict) -> ThreadingHTTPServer:
+    server_cfg = config.get("forecast_server", {})
+    store = ModelStore(config["paths"]["arimax_models"], server_cfg.get("persist_updates", True))
+    handler = type("Handler", (ForecastHandler,), {"store": store})
+    return ThreadingHTTPServer((server_cfg.get("host", "127.0.0.1"), server_cfg.get("port", 8765)), handler)
+
+
+def run_server(config_path: str = "config.yaml") -> None:
+    server = build_server(load_config(config_path))
+    host, port = server.server_address[:2]
+    logger.info(f"Serwis prognoz ARIMAX: http://{host}:{port} (modele: {server.RequestHandlerClass.store.available()})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    run_server()
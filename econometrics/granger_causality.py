@@ -8,8 +8,18 @@ import pandas as pd
 import numpy as np
 import yaml
 import os
+from concurrent.futures import ProcessPoolExecutor
 from statsmodels.tsa.stattools import grangercausalitytests, adfuller
 from loguru import logger
+from processing.panel_store import init_worker, open_panel, worker_panel
+from processing.sentiment_index import index_columns
+from econometrics.resampling import granger_empirical_pvalues, resampling_kwargs
+from econometrics.incremental import (
+    changed_tickers, load_state, merge_results, save_fingerprints, slice_fingerprint,
+)
+
+
+PRIMARY_CAUSE = "sentiment_mean"
 
 
 def load_config(path: str = "config.yaml") -> dict:
@@ -17,6 +27,31 @@ def load_config(path: str = "config.yaml") -> dict:
         return yaml.safe_load(f)
 
 
+def return_column(config: dict) -> str:
+    """Kolumna stopy zwrotu wg econometrics.return_type: "log" → log_return, "pct" → simple_return."""
+    return "simple_return" if config["econometrics"].get("return_type", "log") == "pct" else "log_return"
+
+
+def granger_causes(config: dict, columns) -> list[str]:
+    """sentiment_mean + (econometrics.use_sentiment_index) indeksy z wygaszaniem obecne w panelu."""
+    causes = [PRIMARY_CAUSE]
+    if config["econometrics"].get("use_sentiment_index", False):
+        causes += index_columns(columns)
+    return causes
+
+
+def primary_rows(granger: pd.DataFrame) -> pd.DataFrame:
+    """Wiersze testu dla samego sentiment_mean (CSV sprzed kolumny cause — wszystkie)."""
+    if "cause" not in granger.columns:
+        return granger
+    return granger[granger["cause"] == PRIMARY_CAUSE]
+
+
+def econometrics_jobs(config: dict) -> int:
+    """Liczba procesów dla obliczeń per spółka (econometrics.n_jobs)."""
+    return max(int(config["econometrics"].get("n_jobs", 1)), 1)
+
+
 def check_stationarity(series: pd.Series, name: str) -> bool:
     if series.dropna().nunique() < 2:
         logger.warning(f"ADF [{name}]: seria stała — pomijam test.")
@@ -34,16 +69,39 @@ def run_granger_for_ticker(
     merged_df: pd.DataFrame,
     ticker: str,
     max_lag: int = 10,
-    alpha: float = 0.05
+    alpha: float = 0.05,
+    resampling: dict | None = None,
+    return_col: str = "log_return",
+    causes: list[str] | None = None,
 ) -> pd.DataFrame:
     """
     Przeprowadza test Grangera dla jednej spółki.
 
+    Args:
+        resampling: ustawienia econometrics.resampling — jeśli włączone, do wyników
+            dochodzi kolumna p_value_empirical (permutacje / block bootstrap).
+        causes: kolumny testowane jako przyczyna (domyślnie tylko sentiment_mean;
+            np. także indeksy sentymentu z wygaszaniem).
+
     Returns:
-        DataFrame z wynikami dla każdego opóźnienia.
+        DataFrame z wynikami dla każdej przyczyny i każdego opóźnienia.
     """
-    df_ticker = merged_df[merged_df["ticker"] == ticker].copy()
-    df_ticker = df_ticker.sort_values("date").dropna(subset=["log_return", "sentiment_mean"])
+    df_ticker = merged_df[merged_df["ticker"] == ticker]
+    return granger_for_slice(df_ticker, ticker, max_lag, alpha, resampling, return_col, causes)
+
+
+def granger_for_slice(
+    df_ticker: pd.DataFrame,
+    ticker: str,
+    max_lag: int = 10,
+    alpha: float = 0.05,
+    resampling: dict | None = None,
+    return_col: str = "log_return",
+    causes: list[str] | None = None,
+) -> pd.DataFrame:
+    """Test Grangera na gotowym wycinku jednej spółki (np. widoku z panelu memmap)."""
+    causes = causes or [PRIMARY_CAUSE]
+    df_ticker = df_ticker.sort_values("date").dropna(subset=[return_col, PRIMARY_CAUSE])
 
     if len(df_ticker) < max_lag * 3:
         logger.warning(f"{ticker}: Za mało obserwacji ({len(df_ticker)}) — pomijam.")
@@ -53,16 +111,39 @@ def run_granger_for_ticker(
     logger.info(f"Test Grangera dla: {ticker} (n={len(df_ticker)})")
 
     # Pomiń jeśli sentyment jest stały (za mało newsów)
-    if df_ticker["sentiment_mean"].dropna().nunique() < 2:
+    if df_ticker[PRIMARY_CAUSE].dropna().nunique() < 2:
         logger.warning(f"{ticker}: sentyment stały (za mało newsów) — pomijam.")
         return pd.DataFrame()
 
     # Sprawdź stacjonarność
-    check_stationarity(df_ticker["log_return"], f"{ticker} log_return")
-    check_stationarity(df_ticker["sentiment_mean"], f"{ticker} sentiment")
+    check_stationarity(df_ticker[return_col], f"{ticker} {return_col}")
+
+    frames = [
+        _granger_cause(df_ticker, ticker, cause, max_lag, alpha, resampling, return_col)
+        for cause in causes
+    ]
+    frames = [f for f in frames if not f.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def _granger_cause(
+    df_ticker: pd.DataFrame,
+    ticker: str,
+    cause: str,
+    max_lag: int,
+    alpha: float,
+    resampling: dict | None,
+    return_col: str,
+) -> pd.DataFrame:
+    """Test Grangera cause → stopa zwrotu dla lagów 1..max_lag."""
+    if df_ticker[cause].dropna().nunique() < 2:
+        logger.warning(f"{ticker}: {cause} stały — pomijam.")
+        return pd.DataFrame()
+    label = "sentiment" if cause == PRIMARY_CAUSE else cause
+    check_stationarity(df_ticker[cause], f"{ticker} {label}")
 
     # Dane do testu: [zmienna zależna (Y), zmienna wyjaśniająca (X)]
-    data = df_ticker[["log_return", "sentiment_mean"]].dropna().values
+    data = df_ticker[[return_col, cause]].dropna().values
 
     results = []
     try:
@@ -76,6 +157,7 @@ def run_granger_for_ticker(
 
             results.append({
                 "ticker": ticker,
+                "cause": cause,
                 "lag_days": lag,
                 "f_statistic": round(f_stat, 4),
                 "p_value": round(p_value, 4),
@@ -84,50 +166,90 @@ def run_granger_for_ticker(
             })
 
             marker = "✓ ***" if p_value < 0.01 else ("✓ *" if significant else "")
-            logger.info(f"  Lag={lag:2d}: F={f_stat:.3f}, p={p_value:.4f} {marker}")
+            logger.info(f"  [{label}] Lag={lag:2d}: F={f_stat:.3f}, p={p_value:.4f} {marker}")
 
     except Exception as e:
-        logger.error(f"Błąd testu Grangera dla {ticker}: {e}")
+        logger.error(f"Błąd testu Grangera dla {ticker} ({cause}): {e}")
+
+    results_df = pd.DataFrame(results)
+    if results_df.empty or not (resampling and resampling.get("enabled", False)):
+        return results_df
+
+    params = resampling_kwargs(resampling)
+    empirical = granger_empirical_pvalues(data[:, 0], data[:, 1], max_lag, ticker=ticker, **params)
+    results_df["p_value_empirical"] = empirical["p_value_empirical"].round(4).values
+    logger.info(
+        f"  {ticker} [{label}]: empiryczne p-value ({params['n_resamples']} × {params['method']}): "
+        + ", ".join(f"{p:.3f}" for p in results_df["p_value_empirical"])
+    )
+    return results_df
 
-    return pd.DataFrame(results)
 
+def _granger_worker(ticker: str, kwargs: dict) -> pd.DataFrame:
+    """Zadanie puli: wycinek spółki czytany z panelu memmap procesu, bez pickle danych."""
+    columns = ["date", kwargs["return_col"], *kwargs["causes"]]
+    return granger_for_slice(worker_panel().frame(ticker, columns), ticker, **kwargs)
 
-def run_granger(config_path: str = "config.yaml") -> pd.DataFrame:
+
+def run_granger(config_path: str = "config.yaml", force: bool = False) -> pd.DataFrame:
+    """
+    Testy Grangera dla wszystkich spółek panelu.
+
+    Przy econometrics.incremental przeliczane są tylko spółki, których wycinek
+    danych lub ustawienia zmieniły się od poprzedniego uruchomienia (force=True — wszystkie).
+    """
     config = load_config(config_path)
     merged_path = config["paths"]["merged"]
+    output_path = config["paths"]["granger_results"]
+    incremental = config["econometrics"].get("incremental", False) and not force
     max_lag = config["econometrics"]["max_lag_days"]
     alpha = config["econometrics"]["significance_level"]
+    resampling = config["econometrics"].get("resampling", {})
+    return_col = return_column(config)
+    n_jobs = econometrics_jobs(config)
 
     if not os.path.exists(merged_path):
         logger.error(f"Brak pliku: {merged_path}. Uruchom najpierw moduły ingestion i sentiment.")
         return pd.DataFrame()
 
-    merged_df = pd.read_csv(merged_path, parse_dates=["date"])
-    tickers = merged_df["ticker"].unique()
-    logger.info(f"Testy Grangera dla {len(tickers)} spółek, max_lag={max_lag}")
+    # Panel memmap: do procesów trafia tylko symbol; każdy proces kopiuje najwyżej wycinek swojej spółki
+    panel = open_panel(config)
+    logger.info(f"Testy Grangera dla {len(panel.tickers)} spółek, max_lag={max_lag}")
 
-    all_results = []
-    for ticker in tickers:
-        result = run_granger_for_ticker(merged_df, ticker, max_lag=max_lag, alpha=alpha)
-        if not result.empty:
-            all_results.append(result)
+    causes = granger_causes(config, panel.columns)
+    slices = {ticker: panel.frame(ticker, ["date", return_col, *causes]) for ticker in panel.tickers}
+    kwargs = dict(max_lag=max_lag, alpha=alpha, resampling=resampling, return_col=return_col, causes=causes)
+    fingerprints = {ticker: slice_fingerprint(df_t, kwargs) for ticker, df_t in slices.items()}
+    existing, previous = load_state(output_path) if incremental else (pd.DataFrame(), {})
+    todo = changed_tickers(fingerprints, previous)
+    logger.info(f"Do przeliczenia: {len(todo)}/{len(slices)} spółek (reszta bez zmian)")
 
-    if not all_results:
+    if n_jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(n_jobs, len(todo)), initializer=init_worker, initargs=(panel.panel_dir,)
+        ) as executor:
+            futures = [executor.submit(_granger_worker, ticker, kwargs) for ticker in todo]
+            results = [f.result() for f in futures]
+    else:
+        results = [granger_for_slice(slices[ticker], ticker, **kwargs) for ticker in todo]
+
+    unchanged = set(slices) - set(todo)
+    final_df = merge_results(existing, results, keep=unchanged, order=list(slices))
+
+    if final_df.empty:
         logger.error("Brak wyników testów.")
         return pd.DataFrame()
 
-    final_df = pd.concat(all_results, ignore_index=True)
-
     # Podsumowanie
     significant = final_df[final_df["significant"]]
     logger.info(f"\n{'='*50}")
     logger.info(f"PODSUMOWANIE: {len(significant)} istotnych wyników (p < {alpha})")
     if not significant.empty:
-        logger.info(f"\n{significant[['ticker','lag_days','p_value','interpretation']].to_string()}")
+        logger.info(f"\n{significant[['ticker','cause','lag_days','p_value','interpretation']].to_string()}")
 
-    output_path = "data/processed/granger_results.csv"
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     final_df.to_csv(output_path, index=False)
+    save_fingerprints(output_path, fingerprints)
     logger.success(f"Wyniki zapisane do: {output_path}")
 
     return final_df
@@ -0,0 +1,69 @@
+"""
+Przyrostowe przeliczanie wyników per spółka.
+
+Dla każdej spółki liczymy odcisk (SHA-256) jej wycinka danych wejściowych
+i ustawień wpływających na wynik. Odciski zapisujemy obok tabeli wyników
+(<wyniki>.fingerprints.json); przy kolejnym uruchomieniu przeliczamy tylko
+spółki, których odcisk się zmienił, a ich wiersze podmieniamy w istniejącej tabeli.
+"""
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+
+def fingerprint_path(results_path: str) -> str:
+    return f"{os.path.splitext(results_path)[0]}.fingerprints.json"
+
+
+def slice_fingerprint(df: pd.DataFrame, settings: dict) -> str:
+    """Odcisk wycinka danych (wartości + kolejność wierszy) i ustawień."""
+    h = hashlib.sha256()
+    h.update(",".join(df.columns).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    h.update(json.dumps(settings, sort_keys=True, default=str).encode("utf-8"))
+    return h.hexdigest()
+
+
+def load_state(results_path: str) -> tuple[pd.DataFrame, dict]:
+    """Istniejąca tabela wyników i odciski; bez tabeli odciski są bezużyteczne."""
+    fp_path = fingerprint_path(results_path)
+    if not (os.path.exists(results_path) and os.path.exists(fp_path)):
+        return pd.DataFrame(), {}
+    with open(fp_path, encoding="utf-8") as f:
+        fingerprints = json.load(f)
+    return pd.read_csv(results_path), fingerprints
+
+
+def save_fingerprints(results_path: str, fingerprints: dict) -> None:
+    with open(fingerprint_path(results_path), "w", encoding="utf-8") as f:
+        json.dump(fingerprints, f, indent=2, sort_keys=True)
+
+
+def changed_tickers(current: dict, previous: dict) -> list:
+    return [ticker for ticker, fp in current.items() if previous.get(ticker) != fp]
+
+
+def merge_results(
+    existing: pd.DataFrame,
+    new_results: list[pd.DataFrame],
+    keep: set,
+    order: list | None = None,
+) -> pd.DataFrame:
+    """
+    Wiersze istniejących wyników dla spółek z `keep` + świeżo policzone wyniki.
+    Spółki spoza `keep` (przeliczone lub usunięte z panelu) znikają ze starej tabeli.
+    `order` — kolejność spółek w wyniku (stabilnie, wiersze spółki bez zmian).
+    """
+    frames = []
+    if not existing.empty:
+        frames.append(existing[existing["ticker"].isin(keep)])
+    frames.extend(r for r in new_results if not r.empty)
+    if not frames:
+        return pd.DataFrame()
+    result = pd.concat(frames, ignore_index=True)
+    if order is not None:
+        rank = pd.Categorical(result["ticker"], categories=list(order)).codes
+        result = result.iloc[rank.argsort(kind="stable")].reset_index(drop=True)
+    return result
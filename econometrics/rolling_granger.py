@@ -0,0 +1,260 @@
+"""
+Test Grangera w przesuwnym oknie — czy zależność sentyment → cena jest stabilna w czasie.
+
+Okno obejmuje `window` kolejnych obserwacji spółki; dla każdego opóźnienia p
+wynik w oknie jest tym samym testem F (ssr_ftest), który grangercausalitytests
+policzyłby na tym wycinku:
+
+    ograniczony:  y_t ~ 1 + y_{t-1..t-p}
+    pełny:        y_t ~ 1 + y_{t-1..t-p} + x_{t-1..t-p}
+
+Zamiast dopasowywać oba modele od zera w każdym oknie, śledzimy je rekurencyjną
+MNK (RLS): przesunięcie okna o jedną sesję to dodanie nowego wiersza i usunięcie
+najstarszego — dwie aktualizacje rzędu 1 (wzór Shermana–Morrisona) macierzy
+P = (X'X)^-1, współczynników i SSR, koszt O(k²) zamiast O(n·k²). Co
+`refresh_every` kroków (i gdy okno staje się osobliwe) stan liczony jest od nowa
+dokładnie, żeby błędy zaokrągleń się nie kumulowały. Okna, w których któryś
+regresor jest stały (np. dni bez newsów), są osobliwe z góry — pomijamy je bez
+liczenia rzędu, a rekurencja wraca po pierwszym udanym refit za nimi.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import yaml
+from loguru import logger
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import stats
+
+from econometrics.granger_causality import PRIMARY_CAUSE, econometrics_jobs, return_column
+from econometrics.incremental import (
+    changed_tickers, load_state, merge_results, save_fingerprints, slice_fingerprint,
+)
+from processing.panel_store import init_worker, open_panel, worker_panel
+
+# Próg osobliwości: 1 - x'Px przy usuwaniu wiersza i względny rząd przy dokładnym dopasowaniu
+SINGULAR_TOL = 1e-10
+
+
+def load_config(path: str = "config.yaml") -> dict:
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+class RecursiveOLS:
+    """MNK z aktualizacjami rzędu 1: add / drop wiersza, refit — dokładnie od nowa."""
+
+    def __init__(self):
+        self.valid = False
+
+    def refit(self, X: np.ndarray, y: np.ndarray) -> bool:
+        gram = X.T @ X
+        if np.linalg.matrix_rank(gram, tol=SINGULAR_TOL * max(np.abs(gram).max(), 1.0)) < X.shape[1]:
+            self.valid = False
+            return False
+        self.P = np.linalg.inv(gram)
+        self.beta = self.P @ (X.T @ y)
+        resid = y - X @ self.beta
+        self.ssr = float(resid @ resid)
+        self.valid = True
+        return True
+
+    def add(self, x: np.ndarray, y: float) -> None:
+        px = self.P @ x
+        denom = 1.0 + x @ px
+        error = y - x @ self.beta
+        self.beta = self.beta + px * (error / denom)
+        self.P = self.P - np.outer(px, px) / denom
+        self.ssr += error * error / denom
+
+    def drop(self, x: np.ndarray, y: float) -> bool:
+        """Usuwa wiersz; False, gdy bez niego układ staje się osobliwy (potrzebny refit)."""
+        px = self.P @ x
+        denom = 1.0 - x @ px
+        if denom <= SINGULAR_TOL:
+            self.valid = False
+            return False
+        error = y - x @ self.beta
+        self.beta = self.beta - px * (error / denom)
+        self.P = self.P + np.outer(px, px) / denom
+        self.ssr -= error * error / denom
+        return True
+
+
+def _designs(y: np.ndarray, x: np.ndarray, lag: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Macierze [1, lagi y] i [1, lagi y, lagi x] oraz cel y_t dla t = lag..N-1 (wiersz i ↔ t = lag + i)."""
+    n = len(y)
+    y_lags = sliding_window_view(y, lag)[: n - lag, ::-1]
+    x_lags = sliding_window_view(x, lag)[: n - lag, ::-1]
+    restricted = np.column_stack([np.ones(n - lag), y_lags])
+    return restricted, np.column_stack([restricted, x_lags]), y[lag:]
+
+
+def _constant_windows(X: np.ndarray, n_obs: int) -> np.ndarray:
+    """Okna po n_obs wierszy, w których któraś kolumna poza wyrazem wolnym jest stała (model osobliwy)."""
+    changes = (np.diff(X[:, 1:], axis=0) != 0).astype(np.int64)
+    cumulative = np.vstack([np.zeros((1, changes.shape[1]), dtype=np.int64), np.cumsum(changes, axis=0)])
+    # Zmiany wartości między wierszami j .. j + n_obs - 1
+    in_window = cumulative[n_obs - 1:] - cumulative[:len(X) - n_obs + 1]
+    return (in_window == 0).any(axis=1)
+
+
+def rolling_granger_lag(
+    y: np.ndarray, x: np.ndarray, lag: int, window: int, refresh_every: int = 50
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Statystyki F i p-value testu Grangera x → y dla opóźnienia `lag` w każdym oknie.
+
+    Returns:
+        (f, p) długości N - window + 1; element j dotyczy obserwacji [j, j + window)
+        — NaN, gdy model w oknie jest osobliwy (np. stały sentyment).
+    """
+    n_windows = len(y) - window + 1
+    f_stat = np.full(n_windows, np.nan)
+    if n_windows <= 0:
+        return f_stat, f_stat.copy()
+    restricted, unrestricted, target = _designs(y, x, lag)
+    n_obs = window - lag
+    df_resid = n_obs - 2 * lag - 1
+    if df_resid <= 0:
+        return f_stat, f_stat.copy()
+
+    models = [(RecursiveOLS(), restricted), (RecursiveOLS(), unrestricted)]
+    # Kolumny modelu ograniczonego są podzbiorem pełnego — wystarczy sprawdzić pełny
+    constant = _constant_windows(unrestricted, n_obs)
+    since_refit = 0
+    for j in range(n_windows):
+        if constant[j]:
+            for model, _ in models:
+                model.valid = False
+            continue
+        # Wiersze okna j: cele t = j + lag .. j + window - 1 → wiersze j .. j + n_obs - 1
+        first, last = j, j + n_obs - 1
+        if j > 0 and since_refit < refresh_every and all(m.valid for m, _ in models):
+            for model, X in models:
+                model.add(X[last], target[last])
+                if not model.drop(X[first - 1], target[first - 1]):
+                    break
+            since_refit += 1
+        if not all(m.valid for m, _ in models) or j == 0 or since_refit >= refresh_every:
+            since_refit = 0
+            rows = slice(first, last + 1)
+            if not all([model.refit(X[rows], target[rows]) for model, X in models]):
+                continue
+        ssr_r, ssr_u = models[0][0].ssr, models[1][0].ssr
+        if ssr_u > 0:
+            f_stat[j] = max(ssr_r - ssr_u, 0.0) / lag / (ssr_u / df_resid)
+    p_value = stats.f.sf(f_stat, lag, df_resid)
+    return f_stat, p_value
+
+
+def rolling_granger_for_slice(
+    df_ticker: pd.DataFrame,
+    ticker: str,
+    max_lag: int = 5,
+    window: int = 60,
+    alpha: float = 0.05,
+    refresh_every: int = 50,
+    return_col: str = "log_return",
+    cause: str = PRIMARY_CAUSE,
+) -> pd.DataFrame:
+    """
+    Szeregi F i p-value testu Grangera cause → stopa zwrotu w przesuwnym oknie.
+
+    Returns:
+        Long DataFrame: ticker, cause, date (ostatnia sesja okna), lag_days,
+        f_statistic, p_value, significant.
+    """
+    df_ticker = df_ticker.sort_values("date").dropna(subset=[return_col, cause])
+    if len(df_ticker) < window:
+        logger.warning(f"{ticker}: Za mało obserwacji ({len(df_ticker)}) na okno {window} — pomijam.")
+        return pd.DataFrame()
+
+    y = df_ticker[return_col].to_numpy(np.float64)
+    x = df_ticker[cause].to_numpy(np.float64)
+    dates = df_ticker["date"].to_numpy()[window - 1:]
+
+    frames = []
+    for lag in range(1, max_lag + 1):
+        f_stat, p_value = rolling_granger_lag(y, x, lag, window, refresh_every)
+        frames.append(pd.DataFrame({
+            "ticker": ticker,
+            "cause": cause,
+            "date": dates,
+            "lag_days": lag,
+            "f_statistic": f_stat,
+            "p_value": p_value,
+            "significant": p_value < alpha,
+        }))
+    result = pd.concat(frames, ignore_index=True)
+    share = result.groupby("lag_days")["significant"].mean()
+    logger.info(
+        f"{ticker}: {len(dates)} okien × {max_lag} lagów | odsetek okien istotnych: "
+        + ", ".join(f"lag {lag}: {s:.0%}" for lag, s in share.items())
+    )
+    return result
+
+
+def _rolling_worker(ticker: str, kwargs: dict) -> pd.DataFrame:
+    columns = ["date", kwargs["return_col"], kwargs["cause"]]
+    return rolling_granger_for_slice(worker_panel().frame(ticker, columns), ticker, **kwargs)
+
+
+def run_rolling_granger(config_path: str = "config.yaml", force: bool = False) -> pd.DataFrame:
+    """
+    Rolling Granger dla spółek z econometrics.rolling_granger.tickers (puste — wszystkie).
+
+    Przyrostowo jak run_granger: przeliczane są tylko spółki ze zmienionym wycinkiem lub ustawieniami.
+    """
+    config = load_config(config_path)
+    settings = config["econometrics"].get("rolling_granger", {})
+    output_path = config["paths"]["rolling_granger"]
+    incremental = config["econometrics"].get("incremental", False) and not force
+    n_jobs = econometrics_jobs(config)
+
+    if not os.path.exists(config["paths"]["merged"]):
+        logger.error(f"Brak pliku: {config['paths']['merged']}. Uruchom najpierw moduły ingestion i sentiment.")
+        return pd.DataFrame()
+
+    panel = open_panel(config)
+    tickers = [t for t in (settings.get("tickers") or panel.tickers) if t in panel.tickers]
+    kwargs = dict(
+        max_lag=settings.get("max_lag", 5),
+        window=settings.get("window", 60),
+        alpha=config["econometrics"]["significance_level"],
+        refresh_every=settings.get("refresh_every", 50),
+        return_col=return_column(config),
+        cause=PRIMARY_CAUSE,
+    )
+    logger.info(f"Rolling Granger: {len(tickers)} spółek, okno={kwargs['window']}, max_lag={kwargs['max_lag']}")
+
+    slices = {t: panel.frame(t, ["date", kwargs["return_col"], kwargs["cause"]]) for t in tickers}
+    fingerprints = {t: slice_fingerprint(df_t, kwargs) for t, df_t in slices.items()}
+    existing, previous = load_state(output_path) if incremental else (pd.DataFrame(), {})
+    todo = changed_tickers(fingerprints, previous)
+    logger.info(f"Do przeliczenia: {len(todo)}/{len(slices)} spółek (reszta bez zmian)")
+
+    if n_jobs > 1 and len(todo) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(n_jobs, len(todo)), initializer=init_worker, initargs=(panel.panel_dir,)
+        ) as executor:
+            futures = [executor.submit(_rolling_worker, ticker, kwargs) for ticker in todo]
+            results = [f.result() for f in futures]
+    else:
+        results = [rolling_granger_for_slice(slices[ticker], ticker, **kwargs) for ticker in todo]
+
+    final_df = merge_results(existing, results, keep=set(slices) - set(todo), order=list(slices))
+    if final_df.empty:
+        logger.error("Brak wyników rolling Granger.")
+        return pd.DataFrame()
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    final_df.to_csv(output_path, index=False)
+    save_fingerprints(output_path, fingerprints)
+    logger.success(f"Rolling Granger zapisany do: {output_path} ({len(final_df)} wierszy)")
+    return final_df
+
+
+if __name__ == "__main__":
+    run_rolling_granger()
@@ -0,0 +1 @@
+# experiments module
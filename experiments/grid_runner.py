@@ -0,0 +1,239 @@
+"""
+Runner eksperymentów: siatka ustawień config.yaml → jedna tabela porównawcza.
+
+Pipeline dzielimy na etapy. Artefakt etapu trafia do katalogu cache o kluczu
+będącym hashem jego ustawień i klucza etapu poprzedniego — punkty siatki
+o identycznych ustawieniach "w górę" współdzielą wyniki (np. FinBERT liczy się
+raz dla wszystkich wariantów lagów i typu stopy zwrotu).
+
+Użycie: python -m experiments.grid_runner experiments/grid_example.yaml
+"""
+import argparse
+import copy
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import yaml
+from loguru import logger
+
+CACHE_DIR = "data/experiments/cache"
+RESULTS_DIR = "data/experiments"
+
+
+def load_config(path: str = "config.yaml") -> dict:
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+def set_key(config: dict, dotted: str, value) -> None:
+    parts = dotted.split(".")
+    node = config
+    for part in parts[:-1]:
+        node = node.setdefault(part, {})
+    node[parts[-1]] = value
+
+
+def _file_stamp(path: str) -> list | None:
+    """Zmiana surowych danych unieważnia cache (rozmiar + mtime)."""
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [stat.st_size, int(stat.st_mtime)]
+
+
+def _run_scoring(config_path: str) -> None:
+    from processing.sentiment_finbert import score_articles
+    score_articles(config_path)
+
+
+def _run_aggregation(config_path: str) -> None:
+    from processing.sentiment_finbert import run_aggregation
+    run_aggregation(config_path)
+
+
+def _run_merge(config_path: str) -> None:
+    from processing.aggregator import create_merged_dataset
+    create_merged_dataset(config_path)
+
+
+def _run_econometrics(config_path: str) -> None:
+    from econometrics.granger_causality import run_granger
+    from econometrics.arimax_model import run_arimax
+    run_granger(config_path)
+    run_arimax(config_path)
+
+
+# Ustawienia nlp używane przez score_articles — reszta sekcji (aggregation,
+# sentiment_index) działa na późniejszych etapach i nie może unieważniać scoringu
+SCORING_NLP_KEYS = ["translation_enabled", "finbert_model", "batch_size", "cascade", "body_scoring"]
+# Ustawienia econometrics czytane przez run_granger / run_arimax — rolling_granger,
+# cross_correlation, n_jobs czy incremental nie zmieniają ich wyników
+ECONOMETRICS_KEYS = ["max_lag_days", "significance_level", "return_type", "use_sentiment_index", "resampling"]
+
+# (nazwa, funkcja ustawień wpływających na etap, wykonawca, artefakty w config["paths"])
+STAGES = [
+    (
+        "scoring",
+        lambda c: {
+            "nlp": {k: c["nlp"].get(k) for k in SCORING_NLP_KEYS},
+            "tickers": c["tickers"],
+            "raw_news": _file_stamp(c["paths"]["raw_news"]),
+        },
+        _run_scoring,
+        ["news_scored", "cascade_report"],
+    ),
+    (
+        "aggregation",
+        lambda c: {
+            "aggregation": c["nlp"].get("aggregation", "mean"),
+            "sectors": {t["symbol"]: t.get("sector") for t in c["tickers"]},
+        },
+        _run_aggregation,
+        ["sentiment_daily", "sentiment_sector", "sentiment_market"],
+    ),
+    (
+        "merge",
+        lambda c: {
+            "max_lag_days": c["econometrics"]["max_lag_days"],
+            "sentiment_index": c["nlp"].get("sentiment_index", {}),
+            "sectors": {t["symbol"]: t.get("sector") for t in c["tickers"]},
+            "raw_prices": _file_stamp(c["paths"]["raw_prices"]),
+        },
+        _run_merge,
+        ["merged", "panel"],
+    ),
+    (
+        "econometrics",
+        lambda c: {k: c["econometrics"].get(k) for k in ECONOMETRICS_KEYS},
+        _run_econometrics,
+        ["granger_results", "arimax_results", "arimax_models"],
+    ),
+]
+
+
+def expand_grid(grid: dict) -> list[dict]:
+    """{"a.b": [1, 2], "c": [x]} → [{"a.b": 1, "c": x}, {"a.b": 2, "c": x}]"""
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def _hash(payload) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def plan_point(base_config: dict, overrides: dict) -> tuple[dict, list[str]]:
+    """
+    Buduje config punktu siatki z przekierowanymi ścieżkami artefaktów.
+
+    Returns:
+        (config, lista kluczy etapów)
+    """
+    config = copy.deepcopy(base_config)
+    for key, value in overrides.items():
+        set_key(config, key, value)
+    # Równoległość jest na poziomie punktów siatki — bez zagnieżdżonych pul procesów
+    set_key(config, "econometrics.n_jobs", 1)
+
+    stage_keys = []
+    upstream = ""
+    for name, settings, _, artifacts in STAGES:
+        upstream = _hash([upstream, name, settings(config)])
+        stage_keys.append(upstream)
+        stage_dir = os.path.join(CACHE_DIR, f"{name}_{upstream}")
+        for artifact in artifacts:
+            filename = os.path.basename(base_config["paths"][artifact])
+            config["paths"][artifact] = os.path.join(stage_dir, filename)
+    return config, stage_keys
+
+
+def _run_stage(stage_index: int, stage_key: str, config: dict) -> str:
+    name, _, runner, _ = STAGES[stage_index]
+    stage_dir = os.path.join(CACHE_DIR, f"{name}_{stage_key}")
+    os.makedirs(stage_dir, exist_ok=True)
+    config_path = os.path.join(stage_dir, "config.yaml")
+    with open(config_path, "w") as f:
+        yaml.safe_dump(config, f, allow_unicode=True, sort_keys=False)
+    runner(config_path)
+    with open(os.path.join(stage_dir, "done.json"), "w") as f:
+        json.dump({"stage": name, "key": stage_key}, f)
+    return stage_key
+
+
+def summarize_point(config: dict, alpha: float) -> dict:
+    """Metryki porównawcze jednego punktu siatki."""
+    summary = {}
+    granger_path = config["paths"]["granger_results"]
+    if os.path.exists(granger_path):
+        from econometrics.granger_causality import primary_rows
+        granger = primary_rows(pd.read_csv(granger_path))
+        summary["granger_tickers_significant"] = granger.loc[granger["significant"], "ticker"].nunique()
+        summary["granger_min_p"] = granger["p_value"].min()
+        if "p_value_empirical" in granger.columns:
+            sig_emp = granger[granger["p_value_empirical"] < alpha]
+            summary["granger_tickers_significant_empirical"] = sig_emp["ticker"].nunique()
+    arimax_path = config["paths"]["arimax_results"]
+    if os.path.exists(arimax_path):
+        arimax = pd.read_csv(arimax_path)
+        summary["arimax_tickers"] = len(arimax)
+        summary["arimax_mean_rmse_improvement_pct"] = arimax["rmse_improvement_pct"].mean()
+        summary["arimax_best_rmse_improvement_pct"] = arimax["rmse_improvement_pct"].max()
+        summary["arimax_sentiment_significant"] = int((arimax["sentiment_pvalue"] < alpha).sum())
+    return summary
+
+
+def run_grid(grid_path: str, config_path: str = "config.yaml", max_workers: int | None = None) -> pd.DataFrame:
+    spec = load_config(grid_path)
+    base_config = load_config(config_path)
+    name = spec.get("name", os.path.splitext(os.path.basename(grid_path))[0])
+    max_workers = max_workers or spec.get("max_workers", 4)
+
+    points = expand_grid(spec["grid"])
+    plans = [plan_point(base_config, overrides) for overrides in points]
+    logger.info(f"Eksperyment '{name}': {len(points)} punktów siatki, {len(STAGES)} etapy")
+
+    # Etap po etapie: unikalne klucze, pominięcie gotowych, reszta równolegle
+    for stage_index, (stage_name, _, _, _) in enumerate(STAGES):
+        todo = {}
+        for config, keys in plans:
+            key = keys[stage_index]
+            done = os.path.join(CACHE_DIR, f"{stage_name}_{key}", "done.json")
+            if key not in todo and not os.path.exists(done):
+                todo[key] = config
+        unique = len({keys[stage_index] for _, keys in plans})
+        logger.info(f"Etap {stage_name}: {unique} wariantów, do policzenia {len(todo)} (reszta z cache)")
+        if not todo:
+            continue
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(todo))) as executor:
+            futures = [executor.submit(_run_stage, stage_index, key, cfg) for key, cfg in todo.items()]
+            for future in futures:
+                future.result()
+
+    rows = []
+    for overrides, (config, _) in zip(points, plans):
+        alpha = config["econometrics"]["significance_level"]
+        rows.append({**overrides, **summarize_point(config, alpha)})
+
+    results = pd.DataFrame(rows)
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output_path = os.path.join(RESULTS_DIR, f"{name}_results.csv")
+    results.to_csv(output_path, index=False)
+    logger.info(f"\n{results.to_string(index=False)}")
+    logger.success(f"Tabela porównawcza zapisana do: {output_path}")
+    return results
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Siatka eksperymentów WIG20 Sentiment")
+    parser.add_argument("grid", help="Plik YAML z siatką (patrz experiments/grid_example.yaml)")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--workers", type=int, default=None)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    run_grid(args.grid, config_path=args.config, max_workers=args.workers)
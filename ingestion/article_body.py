@@ -0,0 +1,145 @@
+"""
+Pobieranie treści artykułów (body) do scoringu sentymentu.
+
+Fetcher jest wymienny: dowolna funkcja url → tekst (albo None). Domyślny
+pobiera stronę przez HttpClient i wyciąga akapity z <article> / <p>;
+lokalnie można podać własny (nlp.body_scoring.fetcher = "moduł:fabryka",
+fabryka dostaje config i zwraca funkcję).
+
+Wyciągnięty tekst trafia do cache na dysku (<sha256(url)>.txt), więc
+kolejne uruchomienia nie pobierają ponownie tych samych artykułów. Nieudane
+lub puste pobrania zapisujemy jako <sha256(url)>.miss — przez miss_ttl sekund
+(wiek pliku) artykuł jest pomijany, potem próbujemy ponownie.
+"""
+import hashlib
+import importlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from bs4 import BeautifulSoup
+from loguru import logger
+
+from ingestion.http_client import HttpClient, build_client
+
+BodyFetcher = Callable[[str], str | None]
+
+MIN_PARAGRAPH_CHARS = 40
+
+
+def extract_text(html: str) -> str:
+    """Tekst artykułu: akapity z <article> (lub całej strony), bez skryptów i nawigacji."""
+    soup = BeautifulSoup(html, "lxml")
+    for tag in soup(["script", "style", "nav", "header", "footer", "aside", "form"]):
+        tag.decompose()
+    root = soup.find("article") or soup.body or soup
+    paragraphs = [p.get_text(" ", strip=True) for p in root.find_all("p")]
+    return "\n".join(p for p in paragraphs if len(p) >= MIN_PARAGRAPH_CHARS)
+
+
+def http_body_fetcher(client: HttpClient) -> BodyFetcher:
+    """Domyślny fetcher: GET przez wspólnego klienta HTTP + extract_text."""
+    def fetch(url: str) -> str | None:
+        response = client.get(url)
+        if response.status_code >= 400:
+            logger.warning(f"Body {url}: HTTP {response.status_code}")
+            return None
+        return extract_text(response.text) or None
+    return fetch
+
+
+def load_fetcher(config: dict, client: HttpClient | None = None) -> BodyFetcher:
+    """Fetcher z nlp.body_scoring.fetcher ("moduł:fabryka") albo domyślny HTTP."""
+    spec = config["nlp"].get("body_scoring", {}).get("fetcher")
+    if not spec:
+        return http_body_fetcher(client or build_client(config))
+    module_name, _, factory_name = spec.partition(":")
+    factory = getattr(importlib.import_module(module_name), factory_name)
+    return factory(config)
+
+
+class BodyCache:
+    """Cache wyciągniętych treści: <sha256(url)>.txt, nieudane pobrania: <sha256(url)>.miss."""
+
+    def __init__(self, cache_dir: str, miss_ttl: float = 24 * 3600):
+        self.cache_dir = cache_dir
+        self.miss_ttl = miss_ttl
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str, suffix: str = "txt") -> str:
+        return os.path.join(self.cache_dir, f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.{suffix}")
+
+    def load(self, url: str) -> str | None:
+        """Tekst z cache, "" dla świeżego wpisu o braku treści, None — trzeba pobrać."""
+        path = self._path(url)
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                return f.read()
+        miss_path = self._path(url, "miss")
+        if os.path.exists(miss_path) and time.time() - os.path.getmtime(miss_path) < self.miss_ttl:
+            return ""
+        return None
+
+    def store(self, url: str, text: str) -> None:
+        tmp_path = f"{self._path(url)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, self._path(url))
+
+    def store_miss(self, url: str) -> None:
+        """Zapamiętuje nieudane / puste pobranie (znacznik czasu = mtime pliku)."""
+        with open(self._path(url, "miss"), "w", encoding="utf-8") as f:
+            f.write(url)
+
+
+def fetch_bodies(
+    urls: list[str],
+    fetcher: BodyFetcher,
+    cache_dir: str,
+    max_workers: int = 8,
+    miss_ttl: float = 24 * 3600,
+) -> dict[str, str]:
+    """
+    Pobiera treści artykułów równolegle (wątki), z cache na dysku.
+
+    Błąd fetchera (dowolny wyjątek — fetcher jest wymienny) albo pusta treść
+    pomija tylko ten artykuł i trafia do cache jako brak na miss_ttl sekund.
+
+    Returns:
+        {url: tekst} — tylko artykuły, których treść udało się pobrać.
+    """
+    cache = BodyCache(cache_dir, miss_ttl=miss_ttl)
+    bodies = {}
+    missing = []
+    known_missing = 0
+    for url in dict.fromkeys(u for u in urls if isinstance(u, str) and u):
+        text = cache.load(url)
+        if text is None:
+            missing.append(url)
+        elif text:
+            bodies[url] = text
+        else:
+            known_missing += 1
+    logger.info(
+        f"Treści artykułów: {len(bodies)} z cache, {known_missing} znanych braków, {len(missing)} do pobrania"
+    )
+
+    def fetch_one(url: str) -> tuple[str, str | None]:
+        try:
+            return url, fetcher(url)
+        except Exception as e:
+            logger.warning(f"Błąd pobierania treści {url}: {type(e).__name__}: {e}")
+            return url, None
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for url, text in executor.map(fetch_one, missing):
+                if text:
+                    cache.store(url, text)
+                    bodies[url] = text
+                else:
+                    cache.store_miss(url)
+
+    logger.info(f"Treści artykułów: {len(bodies)}/{len(set(urls))} dostępnych")
+    return bodies
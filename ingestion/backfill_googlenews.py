@@ -0,0 +1,260 @@
+"""
+Historyczny backfill newsów z Google News RSS w oknach dat.
+
+Jedno zapytanie RSS zwraca ok. 100 pozycji, więc zwykły scraping per spółka
+(scraper_googlenews) przy długim horyzoncie daje tylko najnowszą historię.
+Backfill dzieli horyzont na okna i dla każdej pary (spółka, okno) pyta z
+operatorami `after:` / `before:`:
+
+- okna pobierane są równolegle (wątki), ale wspólny RateLimiter pilnuje
+  odstępu ingestion.request_delay między żądaniami,
+- okno, które zwróciło co najmniej item_cap pozycji (odpowiedź prawdopodobnie
+  ucięta), jest dzielone na pół i pobierane ponownie — aż do min_window_days,
+- każde zakończone okno (wraz z artykułami) i każdy podział trafia jako linia
+  do checkpointu JSONL, więc przerwany backfill wznawia się od miejsca przerwania;
+  okna sięgające dzisiejszego dnia są jeszcze otwarte — pobieramy je przy każdym
+  uruchomieniu i nie zapisujemy.
+
+Adres feedu to sources.google_news.base_url — w testach można wskazać lokalny
+serwer z fałszywym feedem.
+
+Użycie: python -m ingestion.backfill_googlenews [dni]
+"""
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+import pandas as pd
+import requests
+import yaml
+from loguru import logger
+
+from ingestion.feed_parser import fetch_feed
+from ingestion.http_client import HttpClient, build_client
+from ingestion.scraper_googlenews import _build_query, article_record
+
+DEFAULT_BASE_URL = "https://news.google.com/rss/search"
+DEFAULT_PARAMS = {"hl": "pl", "gl": "PL", "ceid": "PL:pl"}
+
+
+def load_config(path: str = "config.yaml") -> dict:
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+class RateLimiter:
+    """Minimalny odstęp między kolejnymi żądaniami, wspólny dla wszystkich wątków."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def date_windows(start: date, end: date, window_days: int) -> list[tuple[date, date]]:
+    """
+    Okna po window_days dni pokrywające [start, end), wyrównane do stałej siatki
+    (liczba porządkowa dnia podzielna przez window_days) — te same granice przy
+    każdym uruchomieniu, więc checkpoint pasuje także następnego dnia.
+    """
+    cursor = date.fromordinal(start.toordinal() - start.toordinal() % window_days)
+    windows = []
+    while cursor < end:
+        upper = cursor + timedelta(days=window_days)
+        windows.append((cursor, upper))
+        cursor = upper
+    return windows
+
+
+def split_window(start: date, end: date) -> list[tuple[date, date]]:
+    """Dzieli okno na dwie połowy (po całych dniach)."""
+    middle = start + timedelta(days=(end - start).days // 2)
+    return [(start, middle), (middle, end)]
+
+
+def window_url(base_url: str, query: str, start: date, end: date, params: dict | None = None) -> str:
+    """URL wyszukiwania RSS z operatorami after: / before: (okno [start, end))."""
+    q = f"{query} after:{start.isoformat()} before:{end.isoformat()}"
+    return f"{base_url}?{urlencode({'q': q, **(params or DEFAULT_PARAMS)})}"
+
+
+def _key(symbol: str, start: date, end: date) -> tuple[str, str, str]:
+    return symbol, start.isoformat(), end.isoformat()
+
+
+class Checkpoint:
+    """
+    Dziennik postępu JSONL: jedna linia na zakończone okno albo jego podział.
+
+        {"ticker": ..., "start": ..., "end": ..., "status": "done", "n_items": ..., "articles": [...]}
+        {"ticker": ..., "start": ..., "end": ..., "status": "split"}
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.done: dict[tuple, list[dict]] = {}
+        self.split: set[tuple] = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._load()
+
+    def _load(self) -> None:
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Ucięta ostatnia linia po przerwaniu zapisu — okno pobierzemy ponownie
+                    continue
+                key = (entry["ticker"], entry["start"], entry["end"])
+                if entry["status"] == "split":
+                    self.split.add(key)
+                else:
+                    self.done[key] = entry.get("articles", [])
+        logger.info(f"Checkpoint {self.path}: {len(self.done)} okien gotowych, {len(self.split)} podzielonych")
+
+    def _append(self, entry: dict) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+
+    def mark_done(self, key: tuple, articles: list[dict], n_items: int) -> None:
+        self._append({"ticker": key[0], "start": key[1], "end": key[2], "status": "done",
+                      "n_items": n_items, "articles": articles})
+        self.done[key] = articles
+
+    def mark_split(self, key: tuple) -> None:
+        self._append({"ticker": key[0], "start": key[1], "end": key[2], "status": "split"})
+        self.split.add(key)
+
+
+def _pending_windows(checkpoint: Checkpoint, symbol: str, start: date, end: date) -> list[tuple[date, date]]:
+    """Okna do pobrania w [start, end) — z uwzględnieniem wcześniej zapisanych podziałów."""
+    key = _key(symbol, start, end)
+    if key in checkpoint.done:
+        return []
+    if key in checkpoint.split:
+        return [w for half in split_window(start, end) for w in _pending_windows(checkpoint, symbol, *half)]
+    return [(start, end)]
+
+
+def backfill_google_news(
+    days_back: int = 365,
+    config_path: str = "config.yaml",
+    client: HttpClient | None = None,
+    end: date | None = None,
+) -> pd.DataFrame:
+    """
+    Pobiera historię newsów per spółka z Google News w oknach dat (z wznawianiem).
+
+    Args:
+        days_back: długość horyzontu w dniach, licząc wstecz od `end`.
+        end: koniec horyzontu (wyłącznie); domyślnie jutro, żeby objąć dzisiejsze newsy.
+            Okna kończące się po dzisiejszym dniu nie trafiają do checkpointu.
+
+    Returns:
+        DataFrame jak scrape_google_news (title, url, published_at, source,
+        ticker_mentioned, scraped_at) — także artykuły z okien pobranych
+        w poprzednich, przerwanych uruchomieniach. Okna wyrównane do siatki
+        mogą wykraczać o kilka dni poza horyzont.
+    """
+    config = load_config(config_path)
+    cfg = config["ingestion"].get("backfill", {})
+    source_cfg = config["sources"].get("google_news", {})
+    base_url = source_cfg.get("base_url", DEFAULT_BASE_URL)
+    params = source_cfg.get("params", DEFAULT_PARAMS)
+    window_days = cfg.get("window_days", 30)
+    min_window_days = cfg.get("min_window_days", 1)
+    item_cap = cfg.get("item_cap", 100)
+    checkpoint = Checkpoint(cfg.get("checkpoint", "data/raw/backfill_googlenews.jsonl"))
+    limiter = RateLimiter(config["ingestion"]["request_delay"])
+    client = client or build_client(config)
+
+    end = end or date.today() + timedelta(days=1)
+    start = end - timedelta(days=days_back)
+    tickers = {t["symbol"]: t for t in config["tickers"]}
+    queries = {symbol: _build_query(info) for symbol, info in tickers.items()}
+
+    pending = [
+        (symbol, w)
+        for symbol in tickers
+        for base in date_windows(start, end, window_days)
+        for w in _pending_windows(checkpoint, symbol, *base)
+    ]
+    logger.info(f"Backfill Google News: {len(pending)} okien do pobrania ({len(tickers)} spółek, {days_back} dni)")
+
+    def fetch_window(symbol: str, window: tuple[date, date]) -> tuple[str, tuple, list | None]:
+        limiter.wait()
+        url = window_url(base_url, queries[symbol], *window, params=params)
+        try:
+            return symbol, window, list(fetch_feed(url, client=client))
+        except requests.RequestException as e:
+            logger.warning(f"Błąd {symbol} {window[0]}–{window[1]}: {e}")
+        except Exception as e:
+            # Uszkodzony feed (np. XMLSyntaxError) psuje tylko to okno, nie cały backfill
+            logger.warning(f"Błąd parsowania {symbol} {window[0]}–{window[1]}: {type(e).__name__}: {e}")
+        return symbol, window, None
+
+    today = date.today()
+    open_articles = []
+    failed = capped = 0
+    with ThreadPoolExecutor(max_workers=cfg.get("max_workers", 4)) as executor:
+        futures = {executor.submit(fetch_window, symbol, w) for symbol, w in pending}
+        while futures:
+            finished, futures = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                symbol, (w_start, w_end), feed_articles = future.result()
+                if feed_articles is None:
+                    # Błąd sieci lub parsowania: okno zostaje poza checkpointem —
+                    # kolejne uruchomienie spróbuje ponownie
+                    failed += 1
+                    continue
+                key = _key(symbol, w_start, w_end)
+                closed = w_end <= today
+                if len(feed_articles) >= item_cap:
+                    if (w_end - w_start).days > min_window_days:
+                        if closed:
+                            checkpoint.mark_split(key)
+                        futures |= {executor.submit(fetch_window, symbol, half) for half in split_window(w_start, w_end)}
+                        continue
+                    capped += 1
+                    logger.warning(f"{symbol} {w_start}–{w_end}: {len(feed_articles)} pozycji w oknie minimalnym — możliwe braki")
+                records = [article_record(a, tickers[symbol]) for a in feed_articles]
+                if closed:
+                    checkpoint.mark_done(key, records, len(feed_articles))
+                else:
+                    open_articles.extend(records)
+
+    articles = [a for (symbol, w_start, w_end), rows in checkpoint.done.items()
+                if symbol in tickers and w_end > start.isoformat() and w_start < end.isoformat() for a in rows]
+    df = pd.DataFrame(articles + open_articles)
+    if not df.empty:
+        df.drop_duplicates(subset=["title", "ticker_mentioned"], inplace=True)
+    logger.success(
+        f"Backfill Google News: {len(df)} artykułów | okna nieudane={failed}, ucięte={capped}"
+    )
+    return df
+
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    df = backfill_google_news(days_back=days)
+    if not df.empty:
+        df["published_at"] = pd.to_datetime(df["published_at"], utc=True, errors="coerce")
+        print(df.groupby("ticker_mentioned")["published_at"].agg(["count", "min", "max"]).to_string())
+    else:
+        print("Brak artykułów.")
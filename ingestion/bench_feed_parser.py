@@ -0,0 +1,101 @@
+"""
+Benchmark: strumieniowy parser lxml (feed_parser) vs dotychczasowa ścieżka BeautifulSoup.
+Generuje syntetyczne duże feedy RSS i mierzy czas oraz przyrost szczytowego RSS procesu
+(każdy pomiar w osobnym procesie — tracemalloc nie widzi alokacji C w lxml/libxml2).
+
+Użycie: python -m ingestion.bench_feed_parser --items 50000
+"""
+import argparse
+import io
+import multiprocessing as mp
+import resource
+import time
+from datetime import datetime, timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+
+from bs4 import BeautifulSoup
+from ingestion.feed_parser import iter_feed
+
+
+def build_rss(n_items: int) -> bytes:
+    now = datetime.now().astimezone()
+    parts = ['<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>bench</title>']
+    for i in range(n_items):
+        published = format_datetime(now - timedelta(minutes=i))
+        parts.append(
+            f"<item><title>PKO BP podnosi prognozę wyników nr {i}</title>"
+            f"<link>https://example.com/artykul/{i}</link>"
+            f"<pubDate>{published}</pubDate>"
+            f"<source url=\"https://example.com\">Bankier.pl</source></item>"
+        )
+    parts.append("</channel></rss>")
+    return "".join(parts).encode("utf-8")
+
+
+def parse_bs4(payload: bytes, cutoff: datetime) -> int:
+    """Odtworzenie starej ścieżki: cały tekst w pamięci + drzewo BeautifulSoup."""
+    soup = BeautifulSoup(payload.decode("utf-8"), "xml")
+    count = 0
+    for item in soup.find_all("item"):
+        title_tag = item.find("title")
+        link_tag = item.find("link")
+        date_tag = item.find("pubDate")
+        item.find("source")
+        if not title_tag:
+            continue
+        link_tag.get_text(strip=True) if link_tag else ""
+        if date_tag:
+            published_at = parsedate_to_datetime(date_tag.get_text(strip=True))
+            if published_at.replace(tzinfo=None) < cutoff:
+                continue
+        count += 1
+    return count
+
+
+def parse_lxml(payload: bytes, cutoff: datetime) -> int:
+    return sum(1 for _ in iter_feed(io.BytesIO(payload), cutoff=cutoff))
+
+
+def _measure_child(func_name: str, n_items: int, queue) -> None:
+    payload = build_rss(n_items)
+    # Połowa artykułów starsza niż cutoff
+    cutoff = datetime.now() - timedelta(minutes=n_items // 2)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    count = PARSERS[func_name](payload, cutoff)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    queue.put((elapsed, (peak - baseline) / 1024, count))
+
+
+def measure(func_name: str, n_items: int) -> tuple[float, float, int]:
+    """Zwraca (czas [s], przyrost szczytowego RSS [MB], liczba artykułów)."""
+    queue = mp.Queue()
+    process = mp.Process(target=_measure_child, args=(func_name, n_items, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+PARSERS = {"bs4": parse_bs4, "lxml": parse_lxml}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parserów RSS")
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    print(f"{'items':>8} | {'bs4 [s]':>8} | {'lxml [s]':>8} | {'speedup':>7} | "
+          f"{'bs4 [MB]':>8} | {'lxml [MB]':>9} | {'mem x':>6}")
+    for n_items in args.items:
+        t_bs4, mem_bs4, n_bs4 = measure("bs4", n_items)
+        t_lxml, mem_lxml, n_lxml = measure("lxml", n_items)
+        assert n_bs4 == n_lxml, f"Różna liczba artykułów: {n_bs4} vs {n_lxml}"
+
+        print(f"{n_items:>8} | {t_bs4:>8.3f} | {t_lxml:>8.3f} | {t_bs4 / t_lxml:>6.1f}x | "
+              f"{mem_bs4:>8.1f} | {mem_lxml:>9.1f} | {mem_bs4 / max(mem_lxml, 1.0):>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,11 +2,8 @@
 Test Google News RSS dla polskich spółek.
 Nie wymaga żadnego API key — działa od razu.
 """
-import requests
-from bs4 import BeautifulSoup
 from urllib.parse import quote
-
-HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+from ingestion.feed_parser import fetch_feed
 
 queries = [
     ("PKO BP akcje", "PKO.WA"),
@@ -21,14 +18,10 @@ for query, ticker in queries:
     
     print(f"\n=== {ticker}: {query} ===")
     try:
-        r = requests.get(url, headers=HEADERS, timeout=10)
-        soup = BeautifulSoup(r.text, "xml")
-        items = soup.find_all("item")
+        items = list(fetch_feed(url))
         print(f"Liczba artykułów: {len(items)}")
         for item in items[:3]:
-            title = item.find("title").get_text(strip=True) if item.find("title") else ""
-            date = item.find("pubDate").get_text(strip=True) if item.find("pubDate") else ""
-            source = item.find("source").get_text(strip=True) if item.find("source") else ""
-            print(f"  [{date[:16]}] {source}: {title[:70]}")
+            date = item.published_at.strftime("%a, %d %b %Y") if item.published_at else ""
+            print(f"  [{date}] {item.source or ''}: {item.title[:70]}")
     except Exception as e:
         print(f"BŁĄD: {e}")
\ No newline at end of file
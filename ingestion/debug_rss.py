@@ -1,10 +1,7 @@
 """
 Test RSS feedów Bankier.pl — uruchom i wklej output.
 """
-import requests
-from bs4 import BeautifulSoup
-
-HEADERS = {"User-Agent": "Mozilla/5.0"}
+from ingestion.feed_parser import fetch_feed
 
 feeds = [
     "https://www.bankier.pl/rss/wiadomosci.xml",
@@ -15,13 +12,11 @@ feeds = [
 for url in feeds:
     print(f"\n=== {url} ===")
     try:
-        r = requests.get(url, headers=HEADERS, timeout=10)
-        soup = BeautifulSoup(r.text, "xml")
-        items = soup.find_all("item")
+        items = list(fetch_feed(url))
         print(f"Liczba artykułów: {len(items)}")
         for item in items[:3]:
-            print(f"  TYTUŁ: {item.find('title').get_text()[:80]}")
-            print(f"  DATA:  {item.find('pubDate').get_text() if item.find('pubDate') else 'brak'}")
+            print(f"  TYTUŁ: {item.title[:80]}")
+            print(f"  DATA:  {item.published_at or 'brak'}")
             print()
     except Exception as e:
         print(f"BŁĄD: {e}")
\ No newline at end of file
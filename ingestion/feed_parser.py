@@ -0,0 +1,166 @@
+"""
+Wspólny, strumieniowy parser feedów RSS 2.0 / 1.0 (RDF) i Atom oparty o lxml.etree.iterparse.
+
+Zamiast trzymać całą odpowiedź w pamięci i budować drzewo BeautifulSoup,
+parsujemy body kawałkami i od razu zwalniamy przetworzone elementy.
+Filtr daty (cutoff) stosowany jest w trakcie parsowania. Elementy `item` /
+`entry` rozpoznajemy po nazwie lokalnej, więc przestrzeń nazw (RSS 1.0, Atom)
+nie ma znaczenia.
+"""
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from typing import IO, Iterator, NamedTuple
+
+from lxml import etree
+from loguru import logger
+from ingestion.http_client import HttpClient
+
+DC_NS = "{http://purl.org/dc/elements/1.1/}"
+# {*} — dowolna przestrzeń nazw albo jej brak
+ITEM_TAGS = ("{*}item", "{*}entry")
+
+
+class FeedArticle(NamedTuple):
+    """Lekki rekord artykułu z feedu."""
+    title: str
+    url: str
+    published_at: datetime | None
+    source: str | None
+
+
+def _text(element) -> str:
+    if element is None or element.text is None:
+        return ""
+    return element.text.strip()
+
+
+def _namespace(element) -> str:
+    """"{uri}" przestrzeni nazw elementu albo "" dla elementu bez przestrzeni."""
+    uri = etree.QName(element).namespace
+    return f"{{{uri}}}" if uri else ""
+
+
+def _parse_date(value: str) -> datetime | None:
+    """Parsuje datę RFC 2822 (RSS) lub ISO 8601 (Atom)."""
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+
+
+def _parse_rss_item(item) -> FeedArticle | None:
+    """Element item RSS 2.0 (bez przestrzeni nazw) lub RSS 1.0 (data w dc:date)."""
+    ns = _namespace(item)
+    title = _text(item.find(f"{ns}title"))
+    if not title:
+        return None
+    date_tag = item.find(f"{ns}pubDate")
+    if date_tag is None:
+        date_tag = item.find(f"{DC_NS}date")
+    source_tag = item.find(f"{ns}source")
+    return FeedArticle(
+        title=title,
+        url=_text(item.find(f"{ns}link")),
+        published_at=_parse_date(_text(date_tag)),
+        source=_text(source_tag) if source_tag is not None else None,
+    )
+
+
+def _parse_atom_entry(entry) -> FeedArticle | None:
+    ns = _namespace(entry)
+    title = _text(entry.find(f"{ns}title"))
+    if not title:
+        return None
+
+    url = ""
+    for link in entry.iterfind(f"{ns}link"):
+        if link.get("rel", "alternate") == "alternate":
+            url = link.get("href", "")
+            break
+
+    date_tag = entry.find(f"{ns}published")
+    if date_tag is None:
+        date_tag = entry.find(f"{ns}updated")
+
+    source_tag = entry.find(f"{ns}source/{ns}title")
+    return FeedArticle(
+        title=title,
+        url=url,
+        published_at=_parse_date(_text(date_tag)),
+        source=_text(source_tag) if source_tag is not None else None,
+    )
+
+
+def iter_feed(stream: IO[bytes], cutoff: datetime | None = None) -> Iterator[FeedArticle]:
+    """
+    Iteruje po artykułach feedu RSS/Atom czytanych ze strumienia bajtów.
+
+    Args:
+        stream: obiekt plikopodobny (np. response.raw, open(..., "rb")).
+        cutoff: artykuły opublikowane przed tą datą (naiwną) są pomijane.
+    """
+    context = etree.iterparse(
+        stream, events=("end",), tag=ITEM_TAGS, recover=True, huge_tree=True
+    )
+    for _, element in context:
+        if etree.QName(element).localname == "item":
+            article = _parse_rss_item(element)
+        else:
+            article = _parse_atom_entry(element)
+
+        # Zwolnij przetworzony element i jego poprzedników — stała pamięć
+        element.clear()
+        parent = element.getparent()
+        if parent is not None:
+            while element.getprevious() is not None:
+                del parent[0]
+
+        if article is None:
+            continue
+        if (
+            cutoff is not None
+            and article.published_at is not None
+            and article.published_at.replace(tzinfo=None) < cutoff
+        ):
+            continue
+        yield article
+
+
+_default_client: HttpClient | None = None
+
+
+def fetch_feed(
+    url: str,
+    cutoff: datetime | None = None,
+    client: HttpClient | None = None,
+) -> Iterator[FeedArticle]:
+    """
+    Pobiera feed strumieniowo (przez wspólny klient HTTP) i zwraca artykuły w miarę parsowania.
+
+    Generator — połączenie jest otwarte do wyczerpania (lub zamknięcia) iteratora,
+    a w pamięci jest najwyżej jeden element feedu. Żądanie wysyłane jest przy
+    pierwszym next(), więc pętlę po wyniku trzeba objąć obsługą błędów.
+
+    Raises:
+        requests.RequestException: błąd sieci lub status HTTP != 2xx (w trakcie iteracji).
+    """
+    global _default_client
+    if client is None:
+        if _default_client is None:
+            _default_client = HttpClient()
+        client = _default_client
+
+    with client.get(url, stream=True) as response:
+        response.raise_for_status()
+        n_articles = 0
+        for article in iter_feed(response.raw, cutoff=cutoff):
+            n_articles += 1
+            yield article
+
+    logger.debug(f"Feed {url}: {n_articles} artykułów po filtrze daty")
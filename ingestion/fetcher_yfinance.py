@@ -3,10 +3,13 @@ Pobieranie cen spółek WIG20 przez yfinance.
 Kompatybilne z yfinance >= 1.0.0
 """
 import yfinance as yf
+import numpy as np
 import pandas as pd
 import yaml
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from loguru import logger
+from ingestion.schema import apply_prices_schema
 
 
 def load_config(path: str = "config.yaml") -> dict:
@@ -14,68 +17,110 @@ def load_config(path: str = "config.yaml") -> dict:
         return yaml.safe_load(f)
 
 
-def fetch_prices(days: int = 90, config_path: str = "config.yaml") -> pd.DataFrame:
+PRICE_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _download_chunk(symbols: list[str], start: str, end: str) -> pd.DataFrame:
+    """
+    Pobiera jedną paczkę symboli. Uruchamiane w osobnym procesie —
+    yf.download trzyma stan w globalnych zmiennych modułu i nie jest thread-safe.
+    """
+    raw = yf.download(
+        tickers=symbols,
+        start=start,
+        end=end,
+        progress=False,
+        auto_adjust=True,
+        threads=False,
+    )
+    if not raw.empty and not isinstance(raw.columns, pd.MultiIndex):
+        raw.columns = pd.MultiIndex.from_product([raw.columns, symbols], names=["Price", "Ticker"])
+    return raw
+
+
+def _wide_to_long(raw: pd.DataFrame) -> pd.DataFrame:
+    """Szeroka ramka (kolumny: Price × Ticker) → format długi jedną operacją stack."""
+    raw.columns = raw.columns.set_names(["Price", "Ticker"])
+    long_df = raw.stack(level="Ticker", future_stack=True)
+    long_df = long_df.dropna(subset=["Close"])
+    long_df.index = long_df.index.set_names(["date", "ticker"])
+    long_df = long_df.reset_index()
+    long_df.columns.name = None
+    long_df["date"] = pd.to_datetime(long_df["date"]).dt.tz_localize(None).dt.normalize()
+    return long_df.sort_values(["ticker", "date"], ignore_index=True)
+
+
+def add_returns(df: pd.DataFrame) -> pd.DataFrame:
+    """Logarytmiczne i proste stopy zwrotu — jedno przesunięcie grupowe dla wszystkich spółek."""
+    prev_close = df.groupby("ticker", sort=False)["Close"].shift(1)
+    ratio = df["Close"] / prev_close
+    df["log_return"] = np.log(ratio)
+    df["simple_return"] = ratio - 1
+    return df
+
+
+def fetch_prices(
+    days: int = 90,
+    config_path: str = "config.yaml",
+    symbols: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Pobiera dzienne notowania w paczkach (równolegle) i zwraca ramkę w formacie długim.
+
+    Args:
+        symbols: lista symboli; domyślnie spółki z config.yaml. Pozwala pobrać
+            większe uniwersum (np. WIG20 + mWIG40 + sWIG80).
+
+    Returns:
+        DataFrame: date, ticker, ticker_id, name, Open, High, Low, Close, Volume, log_return, simple_return
+    """
     config = load_config(config_path)
     tickers_config = config["tickers"]
+    chunk_size = config["ingestion"].get("price_chunk_size", 50)
+    max_workers = config["ingestion"].get("price_workers", 4)
 
     end_date = datetime.today()
     start_date = end_date - timedelta(days=days)
+    start, end = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
 
-    symbols = [t["symbol"] for t in tickers_config]
+    symbols = symbols or [t["symbol"] for t in tickers_config]
     name_map = {t["symbol"]: t["name"] for t in tickers_config}
-
-    logger.info(f"Pobieranie danych dla {len(symbols)} spolok naraz...")
-
-    try:
-        raw = yf.download(
-            tickers=symbols,
-            start=start_date.strftime("%Y-%m-%d"),
-            end=end_date.strftime("%Y-%m-%d"),
-            progress=False,
-            auto_adjust=True,
-        )
-    except Exception as e:
-        logger.error(f"Blad pobierania danych: {e}")
-        return pd.DataFrame()
-
-    if raw.empty:
-        logger.error("yfinance zwrocilo pusty DataFrame.")
-        return pd.DataFrame()
-
-    all_data = []
-    for symbol in symbols:
-        try:
-            if isinstance(raw.columns, pd.MultiIndex):
-                df = raw.xs(symbol, axis=1, level=1).copy()
-            else:
-                df = raw.copy()
-
-            df = df.dropna(subset=["Close"])
-            if df.empty:
-                logger.warning(f"Brak danych dla {symbol} — pomijam.")
+    chunks = [symbols[i:i + chunk_size] for i in range(0, len(symbols), chunk_size)]
+
+    logger.info(f"Pobieranie danych dla {len(symbols)} spolek w {len(chunks)} paczkach...")
+
+    frames = []
+    with ProcessPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        futures = {executor.submit(_download_chunk, chunk, start, end): chunk for chunk in chunks}
+        for future in as_completed(futures):
+            chunk = futures[future]
+            try:
+                raw = future.result()
+            except Exception as e:
+                logger.error(f"Blad pobierania paczki {chunk[0]}..{chunk[-1]}: {e}")
                 continue
+            if raw.empty:
+                logger.warning(f"yfinance zwrocilo pusty DataFrame dla paczki {chunk[0]}..{chunk[-1]}.")
+                continue
+            frames.append(raw)
 
-            df = df.reset_index()
-            df.rename(columns={"Date": "date"}, inplace=True)
-            df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None).dt.normalize()
-            df["ticker"] = symbol
-            df["name"] = name_map.get(symbol, symbol)
-            df["log_return"] = df["Close"].pct_change()
-
-            cols = ["date", "ticker", "name", "Open", "High", "Low", "Close", "Volume", "log_return"]
-            cols_available = [c for c in cols if c in df.columns]
-            all_data.append(df[cols_available])
-            logger.info(f"  OK {symbol} ({name_map.get(symbol, '')}): {len(df)} sesji")
-
-        except Exception as e:
-            logger.warning(f"Problem z {symbol}: {e}")
-
-    if not all_data:
+    if not frames:
         logger.error("Nie pobrano zadnych danych cenowych!")
         return pd.DataFrame()
 
-    result = pd.concat(all_data, ignore_index=True)
-    logger.success(f"Pobrano lacznie {len(result)} rekordow dla {len(all_data)} spolek.")
+    result = _wide_to_long(pd.concat(frames, axis=1))
+    result["name"] = result["ticker"].map(name_map).fillna(result["ticker"])
+    result = add_returns(result)
+
+    missing = sorted(set(symbols) - set(result["ticker"].unique()))
+    if missing:
+        logger.warning(f"Brak danych dla: {missing}")
+
+    cols = ["date", "ticker", "name", *PRICE_COLUMNS, "log_return", "simple_return"]
+    result = apply_prices_schema(result[[c for c in cols if c in result.columns]], config)
+    logger.success(
+        f"Pobrano lacznie {len(result)} rekordow dla {result['ticker'].nunique()} spolek."
+    )
     return result
 
 
@@ -0,0 +1,443 @@
+"""
+Wspólna warstwa HTTP dla wszystkich źródeł newsów.
+
+- sesje requests z pulą połączeń (keep-alive) osobno dla każdego hosta,
+- konfigurowalne retry z backoffem (urllib3 Retry, respektuje Retry-After),
+- cache odpowiedzi na dysku zgodny z RFC 9111 (max-age, Expires, heurystyka
+  Last-Modified, no-store/no-cache, rewalidacja ETag / Last-Modified → 304),
+- przy stream=True body nie jest buforowane w pamięci: kawałki czytane przez
+  konsumenta są równolegle dopisywane do pliku cache, a trafienie w cache
+  zwraca strumień z pliku,
+- metryki żądań per host.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from email.utils import formatdate, parsedate_to_datetime
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.util.retry import Retry
+from loguru import logger
+
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
+CACHEABLE_STATUS = {200, 203, 301, 308, 410}
+# Heurystyczna świeżość (RFC 9111 §4.2.2): 10% wieku Last-Modified, max 1 dzień
+HEURISTIC_FRACTION = 0.1
+HEURISTIC_MAX_SECONDS = 24 * 3600
+
+
+def _parse_cache_control(value: str | None) -> dict:
+    directives = {}
+    for part in (value or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        key, _, arg = part.partition("=")
+        directives[key.strip().lower()] = arg.strip().strip('"') or None
+    return directives
+
+
+def _lower_keys(headers: dict) -> dict:
+    """Nazwy nagłówków są niewrażliwe na wielkość liter (RFC 9110 §5.1) — porównujemy małymi."""
+    return {name.lower(): value for name, value in headers.items()}
+
+
+def _http_date(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpCache:
+    """Prywatny cache HTTP na dysku: <klucz>.json (metadane) + <klucz>.body."""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url: str) -> tuple[str, str]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return f"{base}.json", f"{base}.body"
+
+    def load(self, url: str, request_headers: dict) -> dict | None:
+        """Metadane wpisu (body zostaje na dysku — entry["body_path"]) albo None."""
+        meta_path, body_path = self._paths(url)
+        if not (os.path.exists(meta_path) and os.path.exists(body_path)):
+            return None
+        with open(meta_path, encoding="utf-8") as f:
+            entry = json.load(f)
+        # Vary: wpis pasuje tylko przy identycznych nagłówkach żądania
+        request_headers = _lower_keys(request_headers)
+        for name, value in entry.get("vary", {}).items():
+            if request_headers.get(name.lower()) != value:
+                return None
+        entry["body_path"] = body_path
+        return entry
+
+    def writer(self, url: str, status: int, headers: dict, request_headers: dict) -> "CacheWriter":
+        """Zapis wpisu kawałkami — widoczny w cache dopiero po commit()."""
+        meta_path, body_path = self._paths(url)
+        vary = CaseInsensitiveDict(headers).get("Vary", "")
+        vary_names = [v.strip().lower() for v in vary.split(",") if v.strip()]
+        request_headers = _lower_keys(request_headers)
+        entry = {
+            "url": url,
+            "status": status,
+            "headers": dict(headers),
+            "stored_at": time.time(),
+            "vary": {name: request_headers.get(name) for name in vary_names},
+        }
+        return CacheWriter(meta_path, body_path, entry)
+
+    def store(self, url: str, status: int, headers: dict, body: bytes, request_headers: dict) -> None:
+        writer = self.writer(url, status, headers, request_headers)
+        writer.write(body)
+        writer.commit()
+
+    def refresh(self, url: str, entry: dict, new_headers: dict) -> None:
+        """Aktualizuje metadane po odpowiedzi 304 (RFC 9111 §4.3.4)."""
+        meta_path, _ = self._paths(url)
+        headers = CaseInsensitiveDict(entry["headers"])
+        for name, value in new_headers.items():
+            if name.lower() not in ("content-length", "content-encoding", "transfer-encoding"):
+                headers[name] = value
+        entry = {k: v for k, v in entry.items() if k != "body_path"}
+        entry["headers"] = dict(headers)
+        entry["stored_at"] = time.time()
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+
+    @staticmethod
+    def is_storable(status: int, headers: dict, request_headers: dict) -> bool:
+        if status not in CACHEABLE_STATUS:
+            return False
+        cc = _parse_cache_control(headers.get("Cache-Control"))
+        req_cc = _parse_cache_control(request_headers.get("Cache-Control"))
+        if "no-store" in cc or "no-store" in req_cc:
+            return False
+        if headers.get("Vary", "").strip() == "*":
+            return False
+        return True
+
+    @staticmethod
+    def freshness_lifetime(headers: dict) -> float:
+        cc = _parse_cache_control(headers.get("Cache-Control"))
+        if "max-age" in cc:
+            try:
+                return float(cc["max-age"])
+            except (TypeError, ValueError):
+                return 0.0
+        expires = _http_date(headers.get("Expires"))
+        date = _http_date(headers.get("Date"))
+        if headers.get("Expires") is not None:
+            # Niepoprawny Expires (np. "0") oznacza "już wygasło"
+            if expires is None or date is None:
+                return 0.0
+            return max(0.0, expires - date)
+        last_modified = _http_date(headers.get("Last-Modified"))
+        if last_modified is not None and date is not None:
+            return min(HEURISTIC_MAX_SECONDS, max(0.0, (date - last_modified) * HEURISTIC_FRACTION))
+        return 0.0
+
+    @classmethod
+    def is_fresh(cls, entry: dict) -> bool:
+        headers = CaseInsensitiveDict(entry["headers"])
+        if "no-cache" in _parse_cache_control(headers.get("Cache-Control")):
+            return False
+        try:
+            age_header = float(headers.get("Age", 0))
+        except ValueError:
+            age_header = 0.0
+        current_age = age_header + (time.time() - entry["stored_at"])
+        return current_age < cls.freshness_lifetime(headers)
+
+
+class CacheWriter:
+    """Body do pliku tymczasowego; commit() podmienia body i metadane atomowo, abort() porzuca wpis."""
+
+    def __init__(self, meta_path: str, body_path: str, entry: dict):
+        self.meta_path = meta_path
+        self.body_path = body_path
+        self.entry = entry
+        self.n_bytes = 0
+        # Unikalna nazwa — równoległe pobrania tego samego URL nie piszą do jednego pliku
+        self._tmp_body = f"{body_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        self._file = open(self._tmp_body, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self.n_bytes += len(chunk)
+
+    def commit(self) -> None:
+        self._file.close()
+        os.replace(self._tmp_body, self.body_path)
+        tmp_meta = f"{self._tmp_body}.json"
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump(self.entry, f)
+        os.replace(tmp_meta, self.meta_path)
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp_body):
+            os.remove(self._tmp_body)
+
+
+class CachingStream(io.RawIOBase):
+    """
+    Strumień body (zdekodowany) z jednoczesnym zapisem do cache.
+
+    Wpis trafia do cache dopiero, gdy konsument doczyta body do końca; zamknięcie
+    wcześniej albo błąd odczytu porzuca niepełny plik.
+    """
+
+    def __init__(self, raw, writer: CacheWriter, on_complete=None):
+        self._raw = raw
+        self._writer = writer
+        self._on_complete = on_complete
+        self._done = False
+        raw.decode_content = True
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        try:
+            data = self._raw.read(None if size is None or size < 0 else size)
+        except Exception:
+            self._finish(commit=False)
+            raise
+        if data:
+            self._writer.write(data)
+        # read() bez rozmiaru czyta do końca; z rozmiarem koniec sygnalizuje pusty wynik
+        if size is None or size < 0 or (not data and size != 0):
+            self._finish(commit=True)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def _finish(self, commit: bool) -> None:
+        if self._done:
+            return
+        self._done = True
+        if commit:
+            self._writer.commit()
+            if self._on_complete:
+                self._on_complete(self._writer.n_bytes)
+        else:
+            self._writer.abort()
+
+    def release_conn(self) -> None:
+        release = getattr(self._raw, "release_conn", None)
+        if release:
+            release()
+
+    def close(self) -> None:
+        self._finish(commit=False)
+        self._raw.close()
+        super().close()
+
+
+class RequestMetrics:
+    """Liczniki żądań per host (thread-safe)."""
+
+    FIELDS = ("requests", "network", "cache_hits", "revalidated", "retries",
+              "errors", "bytes", "elapsed_s")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = defaultdict(lambda: dict.fromkeys(self.FIELDS, 0))
+
+    def add(self, host: str, **values) -> None:
+        with self._lock:
+            row = self._data[host]
+            for key, value in values.items():
+                row[key] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {host: dict(row) for host, row in self._data.items()}
+
+    def log_summary(self) -> None:
+        for host, row in sorted(self.snapshot().items()):
+            logger.info(
+                f"HTTP {host}: {row['requests']} żądań | sieć={row['network']} "
+                f"cache={row['cache_hits']} 304={row['revalidated']} retry={row['retries']} "
+                f"błędy={row['errors']} | {row['bytes'] / 1024:.0f} KB | {row['elapsed_s']:.2f}s"
+            )
+
+
+class HttpClient:
+    """
+    Klient HTTP z pulą sesji per host, retry/backoff i opcjonalnym cache na dysku.
+
+    Gdy cache jest włączony, przy stream=True response.raw odpowiedzi nadającej
+    się do zapisu to CachingStream (body dopisywane do cache w trakcie czytania),
+    a odpowiedź z cache czyta body wprost z pliku — konsumenci strumieniowi
+    (feed_parser) działają bez zmian i bez buforowania całego body w pamięci.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10,
+        retries: int = 3,
+        backoff_factor: float = 1.0,
+        status_forcelist: tuple = (429, 500, 502, 503, 504),
+        pool_maxsize: int = 10,
+        cache_dir: str | None = None,
+        headers: dict | None = None,
+    ):
+        self.timeout = timeout
+        self.retry = Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=status_forcelist,
+            allowed_methods=frozenset({"GET", "HEAD"}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        self.pool_maxsize = pool_maxsize
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self.cache = HttpCache(cache_dir) if cache_dir else None
+        self.metrics = RequestMetrics()
+        self._sessions: dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    def _session(self, host: str) -> requests.Session:
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    max_retries=self.retry, pool_connections=1, pool_maxsize=self.pool_maxsize
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers.update(self.headers)
+                self._sessions[host] = session
+            return session
+
+    @staticmethod
+    def _from_cache(url: str, entry: dict, stream: bool = False) -> requests.Response:
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.url = url
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.encoding = get_encoding_from_headers(response.headers)
+        if stream:
+            # Strumień z pliku; zamykany przez response.close() / with
+            response.raw = open(entry["body_path"], "rb")
+        else:
+            with open(entry["body_path"], "rb") as f:
+                response._content = f.read()
+            response.raw = io.BytesIO(response._content)
+        response.from_cache = True
+        return response
+
+    def get(self, url: str, params: dict | None = None, stream: bool = False) -> requests.Response:
+        """
+        GET przez pulę sesji i cache.
+
+        Raises:
+            requests.RequestException: błąd sieci (po wyczerpaniu retry).
+        """
+        if params:
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(params)}"
+        host = urlsplit(url).netloc
+        session = self._session(host)
+        request_headers = dict(session.headers)
+        self.metrics.add(host, requests=1)
+
+        entry = self.cache.load(url, request_headers) if self.cache else None
+        if entry is not None and HttpCache.is_fresh(entry):
+            self.metrics.add(host, cache_hits=1)
+            return self._from_cache(url, entry, stream)
+
+        conditional = {}
+        if entry is not None:
+            cached_headers = CaseInsensitiveDict(entry["headers"])
+            if cached_headers.get("ETag"):
+                conditional["If-None-Match"] = cached_headers["ETag"]
+            if cached_headers.get("Last-Modified"):
+                conditional["If-Modified-Since"] = cached_headers["Last-Modified"]
+
+        start = time.perf_counter()
+        try:
+            response = session.get(url, headers=conditional, timeout=self.timeout, stream=True)
+        except requests.RequestException:
+            self.metrics.add(host, network=1, errors=1, elapsed_s=time.perf_counter() - start)
+            raise
+
+        history = getattr(getattr(response.raw, "retries", None), "history", None) or ()
+        self.metrics.add(host, network=1, retries=len(history))
+
+        if response.status_code == 304 and entry is not None:
+            response.close()
+            self.cache.refresh(url, entry, response.headers)
+            self.metrics.add(host, revalidated=1, elapsed_s=time.perf_counter() - start)
+            return self._from_cache(url, entry, stream)
+
+        if response.status_code >= 400:
+            self.metrics.add(host, errors=1)
+
+        if self.cache and HttpCache.is_storable(response.status_code, response.headers, request_headers):
+            # W cache trafia body po dekompresji — nagłówki kodowania już go nie opisują
+            headers = {k: v for k, v in response.headers.items()
+                       if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")}
+            headers.setdefault("Date", formatdate(usegmt=True))
+            writer = self.cache.writer(url, response.status_code, headers, request_headers)
+            if stream:
+                response.raw = CachingStream(
+                    response.raw, writer, on_complete=lambda n: self.metrics.add(host, bytes=n)
+                )
+                self.metrics.add(host, elapsed_s=time.perf_counter() - start)
+                return response
+            try:
+                writer.write(response.content)
+            except Exception:
+                writer.abort()
+                raise
+            writer.commit()
+            self.metrics.add(host, bytes=writer.n_bytes, elapsed_s=time.perf_counter() - start)
+            return response
+
+        if stream:
+            response.raw.decode_content = True
+            self.metrics.add(host, bytes=int(response.headers.get("Content-Length", 0) or 0))
+        else:
+            self.metrics.add(host, bytes=len(response.content))
+        self.metrics.add(host, elapsed_s=time.perf_counter() - start)
+        return response
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+def build_client(config: dict) -> HttpClient:
+    """Tworzy klienta HTTP na podstawie sekcji `http` z config.yaml."""
+    http_cfg = config.get("http", {})
+    return HttpClient(
+        timeout=http_cfg.get("timeout", 10),
+        retries=http_cfg.get("retries", 3),
+        backoff_factor=http_cfg.get("backoff_factor", 1.0),
+        status_forcelist=tuple(http_cfg.get("status_forcelist", (429, 500, 502, 503, 504))),
+        pool_maxsize=http_cfg.get("pool_maxsize", 10),
+        cache_dir=http_cfg.get("cache_dir") if http_cfg.get("cache_enabled", False) else None,
+    )
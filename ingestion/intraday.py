@@ -0,0 +1,356 @@
+"""
+Notowania śróddzienne (np. 5m / 1h): pobieranie, magazyn, resampling i okna zdarzeń.
+
+- Provider jest wymienny: funkcja (symbol, start, end, interval) → DataFrame
+  z kolumnami timestamp (UTC), Open, High, Low, Close, Volume. Domyślny korzysta
+  z yfinance; własny podaje się jako intraday.provider = "moduł:fabryka"
+  (fabryka dostaje config i zwraca funkcję).
+- Magazyn: <paths.intraday>/<interval>/<ticker>/<RRRR-MM>.npz — kolumny jako
+  tablice NumPy (czas int64 [ns] UTC, OHLC float32, wolumen int64), jeden plik
+  na spółkę i miesiąc; odczyt zakresu dat otwiera tylko potrzebne miesiące.
+- Resampling do dowolnej grubszej rozdzielczości (np. "15min", "1h", "1D")
+  jednym przebiegiem np.*.reduceat; wynik trafia do cache na dysku z odciskiem
+  partycji źródłowych — przeliczany tylko po zmianie danych.
+- Okna zdarzeń: ścieżki cen wokół czasu publikacji każdego artykułu naraz —
+  siatka (artykuł × przesunięcie) i jedno np.searchsorted na spółkę.
+
+Użycie: python -m ingestion.intraday [dni]
+"""
+import importlib
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import yaml
+from loguru import logger
+
+IntradayProvider = Callable[[str, datetime, datetime, str], pd.DataFrame]
+
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def load_config(path: str = "config.yaml") -> dict:
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+def yfinance_provider(symbol: str, start: datetime, end: datetime, interval: str) -> pd.DataFrame:
+    """Domyślny provider: yf.download z interwałem śróddziennym (5m — do 60 dni wstecz, 1h — do 730)."""
+    import yfinance as yf
+
+    raw = yf.download(
+        tickers=symbol, start=start, end=end, interval=interval,
+        progress=False, auto_adjust=True, threads=False,
+    )
+    if raw.empty:
+        return pd.DataFrame(columns=["timestamp", *BAR_COLUMNS])
+    if isinstance(raw.columns, pd.MultiIndex):
+        raw.columns = raw.columns.get_level_values(0)
+    raw.index = pd.DatetimeIndex(raw.index).tz_convert("UTC") if raw.index.tz else raw.index.tz_localize("UTC")
+    return raw.rename_axis("timestamp").reset_index()[["timestamp", *BAR_COLUMNS]]
+
+
+def load_provider(config: dict) -> IntradayProvider:
+    """Provider z intraday.provider ("moduł:fabryka") albo domyślny yfinance."""
+    spec = config.get("intraday", {}).get("provider")
+    if not spec:
+        return yfinance_provider
+    module_name, _, factory_name = spec.partition(":")
+    factory = getattr(importlib.import_module(module_name), factory_name)
+    return factory(config)
+
+
+def _to_ns(values) -> np.ndarray:
+    """Znaczniki czasu (naiwne = UTC) → int64 [ns] UTC."""
+    index = pd.DatetimeIndex(pd.to_datetime(values, utc=True))
+    return index.asi8.astype(np.int64)
+
+
+class IntradayStore:
+    """Partycje <root>/<interval>/<ticker>/<RRRR-MM>.npz z posortowanymi, unikalnymi słupkami."""
+
+    def __init__(self, root: str, interval: str):
+        self.root = root
+        self.interval = interval
+
+    def _ticker_dir(self, ticker: str) -> str:
+        return os.path.join(self.root, self.interval, ticker)
+
+    def partitions(self, ticker: str) -> list[str]:
+        directory = self._ticker_dir(ticker)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(".npz"))
+
+    def stamp(self, ticker: str) -> list:
+        """Odcisk partycji (nazwa, rozmiar, mtime) — klucz ważności cache resamplingu."""
+        return [[os.path.basename(p), os.path.getsize(p), os.stat(p).st_mtime_ns] for p in self.partitions(ticker)]
+
+    def write(self, ticker: str, bars: pd.DataFrame) -> int:
+        """
+        Dopisuje słupki do partycji miesięcznych (nowsze wartości nadpisują te same znaczniki czasu).
+
+        Returns:
+            Liczba zapisanych partycji.
+        """
+        bars = bars.dropna(subset=["Close"])
+        if bars.empty:
+            return 0
+        ts = _to_ns(bars["timestamp"])
+        months = pd.DatetimeIndex(ts.astype("datetime64[ns]")).strftime("%Y-%m")
+        os.makedirs(self._ticker_dir(ticker), exist_ok=True)
+        written = 0
+        for month in np.unique(months):
+            mask = months == month
+            new = {"ts": ts[mask], **{c: bars[c].to_numpy(np.float64)[mask] for c in BAR_COLUMNS}}
+            new["Volume"] = np.nan_to_num(new["Volume"])
+            path = os.path.join(self._ticker_dir(ticker), f"{month}.npz")
+            if os.path.exists(path):
+                with np.load(path) as old:
+                    new = {k: np.concatenate([old[k], new[k]]) for k in new}
+            # Ostatnie wystąpienie znacznika wygrywa: unikalność na odwróconych tablicach
+            _, last = np.unique(new["ts"][::-1], return_index=True)
+            keep = len(new["ts"]) - 1 - last
+            tmp_path = f"{path}.tmp.npz"
+            np.savez_compressed(
+                tmp_path,
+                ts=new["ts"][keep].astype(np.int64),
+                **{c: new[c][keep].astype(np.int64 if c == "Volume" else np.float32) for c in BAR_COLUMNS},
+            )
+            os.replace(tmp_path, path)
+            written += 1
+        return written
+
+    def read(self, ticker: str, start=None, end=None) -> dict[str, np.ndarray]:
+        """Kolumny słupków spółki w [start, end) — otwiera tylko miesiące z tego zakresu."""
+        lo = _to_ns([start])[0] if start is not None else None
+        hi = _to_ns([end])[0] if end is not None else None
+        first = pd.Timestamp(lo).strftime("%Y-%m") if lo is not None else None
+        last = pd.Timestamp(hi).strftime("%Y-%m") if hi is not None else None
+        parts = []
+        for path in self.partitions(ticker):
+            month = os.path.basename(path)[:-len(".npz")]
+            if (first and month < first) or (last and month > last):
+                continue
+            with np.load(path) as data:
+                parts.append({k: data[k] for k in ("ts", *BAR_COLUMNS)})
+        if not parts:
+            return {"ts": np.empty(0, np.int64), **{c: np.empty(0, np.float32) for c in BAR_COLUMNS}}
+        bars = {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+        mask = np.ones(len(bars["ts"]), dtype=bool)
+        if lo is not None:
+            mask &= bars["ts"] >= lo
+        if hi is not None:
+            mask &= bars["ts"] < hi
+        return {k: v[mask] for k, v in bars.items()}
+
+
+def bars_frame(bars: dict[str, np.ndarray]) -> pd.DataFrame:
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(bars["ts"], utc=True),
+        **{c: bars[c] for c in BAR_COLUMNS},
+    })
+
+
+def resample_bars(bars: dict[str, np.ndarray], rule: str) -> dict[str, np.ndarray]:
+    """
+    Słupki w grubszej rozdzielczości: kubełki [k·rule, (k+1)·rule) od północy UTC.
+
+    Open = pierwszy, High = max, Low = min, Close = ostatni, Volume = suma.
+    Znacznik wyniku = początek kubełka.
+    """
+    step = pd.Timedelta(rule).value
+    ts = bars["ts"]
+    if len(ts) == 0:
+        return {k: v[:0] for k, v in bars.items()}
+    bucket = ts - ts % step
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], len(ts)] - 1
+    return {
+        "ts": bucket[starts],
+        "Open": bars["Open"][starts],
+        "High": np.maximum.reduceat(bars["High"], starts),
+        "Low": np.minimum.reduceat(bars["Low"], starts),
+        "Close": bars["Close"][ends],
+        "Volume": np.add.reduceat(bars["Volume"], starts),
+    }
+
+
+class ResampleCache:
+    """Wyniki resample_bars na dysku: <cache_dir>/<interval>/<ticker>/<rule>.npz + odcisk partycji."""
+
+    def __init__(self, store: IntradayStore, cache_dir: str):
+        self.store = store
+        self.cache_dir = cache_dir
+
+    def _path(self, ticker: str, rule: str) -> str:
+        return os.path.join(self.cache_dir, self.store.interval, ticker, f"{rule}.npz")
+
+    def get(self, ticker: str, rule: str) -> dict[str, np.ndarray]:
+        """Słupki spółki w rozdzielczości `rule` — z cache, jeśli partycje się nie zmieniły."""
+        step, base = pd.Timedelta(rule), pd.Timedelta(self.store.interval)
+        if step < base or step % base:
+            raise ValueError(f"Rozdzielczość {rule} nie jest wielokrotnością interwału magazynu {self.store.interval}")
+        if step == base:
+            return self.store.read(ticker)
+        stamp = json.dumps(self.store.stamp(ticker))
+        path = self._path(ticker, rule)
+        if os.path.exists(path):
+            with np.load(path) as data:
+                if str(data["source"]) == stamp:
+                    return {k: data[k] for k in ("ts", *BAR_COLUMNS)}
+
+        result = resample_bars(self.store.read(ticker), rule)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, source=np.array(stamp), **result)
+        os.replace(tmp_path, path)
+        return result
+
+
+def event_offsets(before: str, after: str, step: str) -> np.ndarray:
+    """Przesunięcia względem zdarzenia [ns]: -before, ..., 0, ..., +after co `step`."""
+    step_ns = pd.Timedelta(step).value
+    lo = -(pd.Timedelta(before).value // step_ns)
+    hi = pd.Timedelta(after).value // step_ns
+    return np.arange(lo, hi + 1, dtype=np.int64) * step_ns
+
+
+def event_window_returns(
+    bars: dict[str, np.ndarray], bar_step: str, event_ts: np.ndarray, offsets: np.ndarray
+) -> np.ndarray:
+    """
+    Skumulowane log-stopy zwrotu wokół zdarzeń jednej spółki, bez pętli po zdarzeniach.
+
+    Cena w chwili τ to zamknięcie ostatniego słupka zakończonego do τ
+    (słupek [t, t + bar_step) zna się dopiero w t + bar_step — bez zaglądania
+    w przyszłość). Wynik [i, k] = ln(P(event_i + offset_k) / P(event_i));
+    NaN przed pierwszym i po ostatnim słupku.
+
+    Args:
+        event_ts: czasy zdarzeń, int64 [ns] UTC, shape (E,).
+        offsets: przesunięcia [ns], shape (K,).
+
+    Returns:
+        Macierz (E, K).
+    """
+    closes_at = bars["ts"] + pd.Timedelta(bar_step).value
+    if len(closes_at) == 0:
+        return np.full((len(event_ts), len(offsets)), np.nan)
+    log_close = np.log(bars["Close"].astype(np.float64))
+
+    grid = event_ts[:, None] + offsets[None, :]
+    idx = np.searchsorted(closes_at, grid, side="right") - 1
+    idx0 = np.searchsorted(closes_at, event_ts, side="right") - 1
+
+    valid = (idx >= 0) & (grid <= closes_at[-1]) & (idx0 >= 0)[:, None]
+    safe = np.clip(idx, 0, None)
+    result = log_close[safe] - log_close[np.clip(idx0, 0, None)][:, None]
+    return np.where(valid, result, np.nan)
+
+
+def extract_event_windows(
+    events: pd.DataFrame,
+    cache: ResampleCache,
+    rule: str,
+    before: str = "1h",
+    after: str = "4h",
+) -> pd.DataFrame:
+    """
+    Ścieżki cen wokół artykułów dla wszystkich spółek.
+
+    Args:
+        events: ticker_mentioned, published_at (artykuły bez spółki / daty są pomijane).
+        rule: rozdzielczość ścieżki (np. "5min"), >= interwału magazynu.
+
+    Returns:
+        DataFrame z indeksem artykułów i kolumnami r_<przesunięcie w minutach>m
+        (np. r_-60m, r_+0m, r_+30m) — skumulowana log-stopa zwrotu od chwili publikacji.
+    """
+    offsets = event_offsets(before, after, rule)
+    columns = [f"r_{o // 60_000_000_000:+d}m" for o in offsets]
+    events = events.dropna(subset=["ticker_mentioned", "published_at"])
+    event_ns = pd.Series(_to_ns(events["published_at"]), index=events.index)
+
+    frames = []
+    for ticker, idx in events.groupby(events["ticker_mentioned"].astype(str)).groups.items():
+        bars = cache.get(ticker, rule)
+        if len(bars["ts"]) == 0:
+            continue
+        returns = event_window_returns(bars, rule, event_ns.loc[idx].to_numpy(), offsets)
+        frames.append(pd.DataFrame(returns.astype(np.float32), index=idx, columns=columns))
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    return pd.concat(frames).sort_index()
+
+
+def fetch_intraday(
+    days: int = 30,
+    config_path: str = "config.yaml",
+    symbols: list[str] | None = None,
+    provider: IntradayProvider | None = None,
+) -> dict[str, int]:
+    """
+    Pobiera słupki śróddzienne (intraday.interval) i dopisuje je do magazynu.
+
+    Returns:
+        {symbol: liczba pobranych słupków}
+    """
+    config = load_config(config_path)
+    cfg = config.get("intraday", {})
+    interval = cfg.get("interval", "5m")
+    store = IntradayStore(config["paths"]["intraday"], interval)
+    provider = provider or load_provider(config)
+    symbols = symbols or [t["symbol"] for t in config["tickers"]]
+
+    end = datetime.now(timezone.utc)
+    start = end - timedelta(days=days)
+    counts = {}
+    for symbol in symbols:
+        try:
+            bars = provider(symbol, start, end, interval)
+        except Exception as e:
+            logger.error(f"Intraday {symbol}: błąd providera: {e}")
+            continue
+        partitions = store.write(symbol, bars)
+        counts[symbol] = len(bars)
+        logger.info(f"  {symbol}: {len(bars)} słupków {interval} → {partitions} partycji")
+    logger.success(f"Intraday {interval}: {sum(counts.values())} słupków dla {len(counts)} spółek → {store.root}")
+    return counts
+
+
+def run_event_windows(config_path: str = "config.yaml") -> pd.DataFrame:
+    """Okna cen wokół ocenionych artykułów (paths.news_scored) → paths.event_windows."""
+    from ingestion.schema import apply_news_schema
+
+    config = load_config(config_path)
+    cfg = config.get("intraday", {})
+    windows_cfg = cfg.get("event_window", {})
+    store = IntradayStore(config["paths"]["intraday"], cfg.get("interval", "5m"))
+    cache = ResampleCache(store, cfg.get("resample_cache", "data/cache/intraday"))
+
+    news = apply_news_schema(pd.read_csv(config["paths"]["news_scored"]), config)
+    windows = extract_event_windows(
+        news,
+        cache,
+        rule=windows_cfg.get("resolution", "5min"),
+        before=windows_cfg.get("before", "1h"),
+        after=windows_cfg.get("after", "4h"),
+    )
+    keys = ["title", "published_at", "ticker_mentioned", "sentiment_score", "sentiment_label"]
+    result = news.loc[windows.index, [c for c in keys if c in news.columns]].join(windows)
+
+    output_path = config["paths"]["event_windows"]
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    result.to_csv(output_path, index=False)
+    logger.success(f"Okna zdarzeń: {len(result)} artykułów × {windows.shape[1]} punktów → {output_path}")
+    return result
+
+
+if __name__ == "__main__":
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    fetch_intraday(days=days)
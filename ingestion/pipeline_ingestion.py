@@ -8,7 +8,11 @@ import yaml
 from loguru import logger
 from ingestion.scraper_bankier import scrape_bankier
 from ingestion.scraper_googlenews import scrape_google_news
+from ingestion.backfill_googlenews import backfill_google_news
 from ingestion.fetcher_yfinance import fetch_prices, save_prices
+from ingestion.intraday import fetch_intraday
+from ingestion.http_client import build_client
+from ingestion.schema import apply_news_schema, memory_report
 
 
 def load_config(path: str = "config.yaml") -> dict:
@@ -16,27 +20,48 @@ def load_config(path: str = "config.yaml") -> dict:
         return yaml.safe_load(f)
 
 
-def run_ingestion(days: int = 90, config_path: str = "config.yaml") -> None:
+def run_ingestion(days: int = 90, config_path: str = "config.yaml", backfill: bool = False) -> None:
+    """
+    Args:
+        backfill: Google News w oknach dat (pełna historia `days`, z checkpointem)
+            zamiast jednego zapytania per spółka.
+    """
     config = load_config(config_path)
     os.makedirs("data/raw", exist_ok=True)
+    # Jeden klient HTTP (pula połączeń, retry, cache) dla wszystkich źródeł
+    client = build_client(config)
 
     # 1. Ceny WIG20
     logger.info("Pobieranie cen spółek WIG20...")
     prices_df = fetch_prices(days=days, config_path=config_path)
     save_prices(prices_df, config["paths"]["raw_prices"])
 
+    # 1b. Słupki śróddzienne (opcjonalnie) — dopisywane do magazynu partycji miesięcznych
+    intraday_cfg = config.get("intraday", {})
+    if intraday_cfg.get("enabled", False):
+        logger.info(f"Pobieranie notowań śróddziennych ({intraday_cfg.get('interval', '5m')})...")
+        fetch_intraday(days=intraday_cfg.get("days_back", 30), config_path=config_path)
+
     # 2. Bankier RSS — bieżące newsy ogólnorynkowe
     logger.info("Scraping: Bankier.pl RSS...")
-    bankier_df = scrape_bankier(days_back=days, config_path=config_path)
+    bankier_df = scrape_bankier(days_back=days, config_path=config_path, client=client)
 
     # 3. Google News RSS — historia per spółka
-    logger.info("Scraping: Google News RSS...")
-    gnews_df = scrape_google_news(days_back=days, config_path=config_path)
+    if backfill:
+        logger.info("Backfill: Google News RSS w oknach dat...")
+        gnews_df = backfill_google_news(days_back=days, config_path=config_path, client=client)
+    else:
+        logger.info("Scraping: Google News RSS...")
+        gnews_df = scrape_google_news(days_back=days, config_path=config_path, client=client)
 
     # 4. Połącz i zapisz
     all_news = pd.concat([bankier_df, gnews_df], ignore_index=True)
     all_news.drop_duplicates(subset=["title", "ticker_mentioned"], inplace=True)
+    typed_news = apply_news_schema(all_news, config)
+    memory_report(typed_news, "news", baseline=all_news)
+    all_news = typed_news
     all_news.to_csv(config["paths"]["raw_news"], index=False)
+    client.metrics.log_summary()
 
     logger.success(f"Zapisano {len(all_news)} artykułów → {config['paths']['raw_news']}")
     logger.info(f"Per spółka:\n{all_news['ticker_mentioned'].value_counts(dropna=False).to_string()}")
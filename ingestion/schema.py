@@ -0,0 +1,147 @@
+"""
+Warstwa schematu danych w pamięci: newsy, ceny, dzienny sentyment i panel merged.
+
+- ticker / source / sentiment_label / name jako category,
+- liczba całkowita ticker_id (kolejność spółek z config.yaml),
+- prawdziwe datetime64 zamiast stringów ISO,
+- float32 tam, gdzie precyzja pozwala (sentyment, OHLC); stopy zwrotu zostają float64.
+
+Schemat stosujemy na granicach wejścia danych (po scrapingu, po każdym read_csv),
+CSV nie przechowuje typów.
+"""
+from typing import Iterable
+
+import pandas as pd
+from loguru import logger
+
+SENTIMENT_LABELS = ["negative", "neutral", "positive"]
+LABEL_DTYPE = pd.CategoricalDtype(SENTIMENT_LABELS)
+
+NEWS_FLOAT32 = ["sentiment_score", "sentiment_confidence", "headline_sentiment_score", "body_sentiment_score"]
+PRICE_FLOAT32 = ["Open", "High", "Low", "Close"]
+SENTIMENT_FLOAT32 = ["sentiment_mean", "sentiment_std", "positive_pct", "negative_pct"]
+TIMESTAMP_COLUMNS = ["published_at", "scraped_at"]
+
+
+def ticker_dtype(config: dict, extra: Iterable = ()) -> pd.CategoricalDtype:
+    """Kategorie tickerów: spółki z config.yaml (w tej kolejności) + ewentualne dodatkowe symbole."""
+    symbols = [t["symbol"] for t in config["tickers"]]
+    known = set(symbols)
+    extra_symbols = sorted({s for s in extra if isinstance(s, str) and s not in known})
+    return pd.CategoricalDtype(symbols + extra_symbols)
+
+
+def _to_float32(df: pd.DataFrame, columns: list[str]) -> None:
+    for col in columns:
+        if col in df.columns:
+            df[col] = df[col].astype("float32")
+
+
+def _to_category(df: pd.DataFrame, column: str, dtype="category") -> None:
+    if column in df.columns:
+        df[column] = df[column].astype(dtype)
+
+
+def _set_ticker(df: pd.DataFrame, column: str, config: dict, dtype: pd.CategoricalDtype | None) -> None:
+    if column not in df.columns:
+        return
+    if dtype is None:
+        dtype = ticker_dtype(config, df[column].dropna().unique())
+    df[column] = df[column].astype(object).astype(dtype)
+
+
+def add_ticker_id(df: pd.DataFrame, column: str = "ticker") -> pd.DataFrame:
+    """Dodaje ticker_id (int16) = kod kategorii tickera; -1 dla braku."""
+    df["ticker_id"] = df[column].cat.codes.astype("int16")
+    return df
+
+
+def apply_news_schema(
+    df: pd.DataFrame, config: dict, tickers: pd.CategoricalDtype | None = None
+) -> pd.DataFrame:
+    """Newsy (surowe lub po scoringu): ticker_mentioned/source/label jako category, daty jako datetime64[UTC]."""
+    if df.empty:
+        return df
+    df = df.copy()
+    _set_ticker(df, "ticker_mentioned", config, tickers)
+    _to_category(df, "source")
+    _to_category(df, "sentiment_label", LABEL_DTYPE)
+    _to_category(df, "body_sentiment_label", LABEL_DTYPE)
+    _to_category(df, "sentiment_stage")
+    for col in TIMESTAMP_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], utc=True, errors="coerce", format="ISO8601")
+    _to_float32(df, NEWS_FLOAT32)
+    return df
+
+
+def apply_prices_schema(
+    df: pd.DataFrame, config: dict, tickers: pd.CategoricalDtype | None = None
+) -> pd.DataFrame:
+    """Ceny: ticker/name jako category, ticker_id, OHLC float32, Volume int64."""
+    if df.empty:
+        return df
+    df = df.copy()
+    _set_ticker(df, "ticker", config, tickers)
+    add_ticker_id(df)
+    _to_category(df, "name")
+    df["date"] = pd.to_datetime(df["date"])
+    _to_float32(df, PRICE_FLOAT32)
+    if "Volume" in df.columns:
+        df["Volume"] = df["Volume"].fillna(0).astype("int64")
+    return df
+
+
+def apply_daily_sentiment_schema(
+    df: pd.DataFrame, config: dict, tickers: pd.CategoricalDtype | None = None
+) -> pd.DataFrame:
+    """Dzienny sentyment per spółka."""
+    if df.empty:
+        return df
+    df = df.copy()
+    column = "ticker" if "ticker" in df.columns else "ticker_mentioned"
+    _set_ticker(df, column, config, tickers)
+    df["date"] = pd.to_datetime(df["date"])
+    _to_float32(df, SENTIMENT_FLOAT32)
+    if "article_count" in df.columns:
+        df["article_count"] = df["article_count"].fillna(0).astype("int32")
+    return df
+
+
+def apply_merged_schema(
+    df: pd.DataFrame, config: dict, tickers: pd.CategoricalDtype | None = None
+) -> pd.DataFrame:
+    """Panel merged = ceny + sentyment (spółka, sektor, rynek) + lagi i indeksy sentymentu (float32)."""
+    if df.empty:
+        return df
+    df = apply_prices_schema(df, config, tickers)
+    df = apply_daily_sentiment_schema(df, config, df["ticker"].dtype)
+    lag_cols = [c for c in df.columns if c.startswith(("sentiment_lag", "sentiment_idx_", "news_intensity_"))]
+    _to_float32(df, lag_cols + ["sector_sentiment_mean", "market_sentiment_mean"])
+    for col in ("sector_article_count", "market_article_count"):
+        if col in df.columns:
+            df[col] = df[col].fillna(0).astype("int32")
+    return df
+
+
+def memory_report(df: pd.DataFrame, name: str, baseline: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    Raport zużycia pamięci (deep) per kolumna; opcjonalnie porównanie z ramką bazową.
+
+    Returns:
+        DataFrame: column, dtype, bytes
+    """
+    usage = df.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        "column": usage.index,
+        "dtype": [str(df[c].dtype) for c in usage.index],
+        "bytes": usage.values,
+    })
+    total_mb = usage.sum() / 1024 ** 2
+    msg = f"Pamięć [{name}]: {total_mb:.2f} MB ({len(df)} wierszy)"
+    if baseline is not None:
+        base_mb = baseline.memory_usage(deep=True, index=False).sum() / 1024 ** 2
+        msg += f" | przed schematem: {base_mb:.2f} MB ({base_mb / max(total_mb, 1e-9):.1f}x)"
+    logger.info(msg)
+    logger.debug(f"\n{report.to_string(index=False)}")
+    return report
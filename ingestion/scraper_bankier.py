@@ -3,17 +3,15 @@ Pobieranie newsów z Bankier.pl przez RSS feed.
 RSS jest niezawodny, daje czyste dane z datą — lepszy niż scraping HTML.
 """
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import time
 import yaml
 from datetime import datetime, timedelta
-from email.utils import parsedate_to_datetime
 from loguru import logger
+from ingestion.feed_parser import fetch_feed
+from ingestion.http_client import HttpClient, build_client
 
 
-HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"}
-
 RSS_FEEDS = [
     "https://www.bankier.pl/rss/wiadomosci.xml",
     "https://www.bankier.pl/rss/gielda.xml",
@@ -25,7 +23,11 @@ def load_config(path: str = "config.yaml") -> dict:
         return yaml.safe_load(f)
 
 
-def scrape_bankier(days_back: int = 90, config_path: str = "config.yaml") -> pd.DataFrame:
+def scrape_bankier(
+    days_back: int = 90,
+    config_path: str = "config.yaml",
+    client: HttpClient | None = None,
+) -> pd.DataFrame:
     """
     Pobiera newsy z Bankier.pl przez RSS.
 
@@ -35,54 +37,31 @@ def scrape_bankier(days_back: int = 90, config_path: str = "config.yaml") -> pd.
     config = load_config(config_path)
     tickers = config["tickers"]
     cutoff_date = datetime.now() - timedelta(days=days_back)
+    client = client or build_client(config)
 
     articles = []
 
     for feed_url in RSS_FEEDS:
         logger.info(f"Pobieranie RSS: {feed_url}")
+        feed_records = []
         try:
-            response = requests.get(feed_url, headers=HEADERS, timeout=10)
-            response.raise_for_status()
+            for article in fetch_feed(feed_url, cutoff=cutoff_date, client=client):
+                ticker_mentioned = _find_mentioned_ticker(article.title, tickers)
+
+                feed_records.append({
+                    "title": article.title,
+                    "url": article.url,
+                    "published_at": article.published_at.isoformat() if article.published_at else None,
+                    "source": "bankier",
+                    "ticker_mentioned": ticker_mentioned,
+                    "scraped_at": datetime.now().isoformat()
+                })
         except requests.RequestException as e:
             logger.error(f"Błąd RSS {feed_url}: {e}")
             continue
 
-        soup = BeautifulSoup(response.text, "xml")
-        items = soup.find_all("item")
-        logger.info(f"  Znaleziono {len(items)} artykułów")
-
-        for item in items:
-            title_tag = item.find("title")
-            link_tag = item.find("link")
-            date_tag = item.find("pubDate")
-
-            if not title_tag:
-                continue
-
-            title = title_tag.get_text(strip=True)
-            url = link_tag.get_text(strip=True) if link_tag else ""
-
-            # Parsuj datę z formatu RFC 2822 (standard RSS)
-            published_at = None
-            if date_tag:
-                try:
-                    published_at = parsedate_to_datetime(date_tag.get_text(strip=True))
-                    # Pomiń artykuły starsze niż cutoff
-                    if published_at.replace(tzinfo=None) < cutoff_date:
-                        continue
-                except Exception:
-                    published_at = None
-
-            ticker_mentioned = _find_mentioned_ticker(title, tickers)
-
-            articles.append({
-                "title": title,
-                "url": url,
-                "published_at": published_at.isoformat() if published_at else None,
-                "source": "bankier",
-                "ticker_mentioned": ticker_mentioned,
-                "scraped_at": datetime.now().isoformat()
-            })
+        logger.info(f"  Znaleziono {len(feed_records)} artykułów")
+        articles.extend(feed_records)
 
         time.sleep(1)
 
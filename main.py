@@ -1,6 +1,6 @@
 """
 WIG20 Sentiment Analysis — punkt wejścia
-Użycie: python main.py --mode [full|ingest|sentiment|econometrics|dashboard]
+Użycie: python main.py --mode [full|ingest|sentiment|econometrics|experiments|report|serve|dashboard]
 """
 import argparse
 from loguru import logger
@@ -10,7 +10,7 @@ def parse_args():
     parser = argparse.ArgumentParser(description="WIG20 Sentiment Analysis Pipeline")
     parser.add_argument(
         "--mode",
-        choices=["full", "ingest", "sentiment", "econometrics", "dashboard"],
+        choices=["full", "ingest", "sentiment", "econometrics", "experiments", "report", "serve", "dashboard"],
         default="full",
         help="Który moduł uruchomić"
     )
@@ -20,6 +20,16 @@ def parse_args():
         default=90,
         help="Ile dni wstecz pobierać dane (domyślnie 90)"
     )
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Google News w oknach dat z checkpointem — pełna historia --days (tryb ingest)"
+    )
+    parser.add_argument(
+        "--grid",
+        default="experiments/grid_example.yaml",
+        help="Plik z siatką eksperymentów (tryb experiments)"
+    )
     return parser.parse_args()
 
 
@@ -30,17 +40,42 @@ def main():
     if args.mode in ("full", "ingest"):
         logger.info("▶ Moduł 1: Ingestion — pobieranie danych...")
         from ingestion.pipeline_ingestion import run_ingestion
-        run_ingestion(days=args.days)
+        run_ingestion(days=args.days, backfill=args.backfill)
 
     if args.mode in ("full", "sentiment"):
         logger.info("▶ Moduł 2: NLP — analiza sentymentu...")
         from processing.sentiment_finbert import run_sentiment
         run_sentiment()
+        from processing.sentiment_finbert import load_config
+        if load_config().get("intraday", {}).get("enabled", False):
+            from ingestion.intraday import run_event_windows
+            run_event_windows()
 
     if args.mode in ("full", "econometrics"):
         logger.info("▶ Moduł 3: Ekonometria — testy i modele...")
         from econometrics.granger_causality import run_granger
         run_granger()
+        from econometrics.granger_causality import load_config
+        if load_config()["econometrics"].get("rolling_granger", {}).get("enabled", False):
+            from econometrics.rolling_granger import run_rolling_granger
+            run_rolling_granger()
+        from econometrics.cross_correlation import run_cross_correlation
+        run_cross_correlation()
+
+    if args.mode == "experiments":
+        logger.info("▶ Eksperymenty — siatka ustawień...")
+        from experiments.grid_runner import run_grid
+        run_grid(args.grid)
+
+    if args.mode == "report":
+        logger.info("▶ Raport — wykresy i docs/index.html...")
+        from visualization.report import build_report
+        build_report()
+
+    if args.mode == "serve":
+        logger.info("▶ Serwis prognoz ARIMAX...")
+        from econometrics.forecast_server import run_server
+        run_server()
 
     if args.mode == "dashboard":
         logger.info("▶ Moduł 4: Dashboard...")
@@ -7,6 +7,13 @@ import numpy as np
 import yaml
 import os
 from loguru import logger
+from ingestion.schema import (
+    apply_daily_sentiment_schema, apply_merged_schema, apply_prices_schema,
+    memory_report, ticker_dtype,
+)
+from processing.panel_store import export_panel
+from processing.sentiment_index import add_sentiment_index
+from processing.sentiment_levels import broadcast_levels, sector_map
 
 
 def load_config(path: str = "config.yaml") -> dict:
@@ -27,10 +34,13 @@ def create_merged_dataset(config_path: str = "config.yaml") -> pd.DataFrame:
     output_path = config["paths"]["merged"]
     max_lag = config["econometrics"]["max_lag_days"]
 
-    # Wczytaj dane
+    # Wczytaj dane — wspólne kategorie tickerów, żeby merge nie wrócił do object
     prices = pd.read_csv(prices_path, parse_dates=["date"])
     sentiment = pd.read_csv(sentiment_path, parse_dates=["date"])
     sentiment.rename(columns={"ticker_mentioned": "ticker"}, inplace=True)
+    tickers = ticker_dtype(config, [*prices["ticker"].unique(), *sentiment["ticker"].dropna().unique()])
+    prices = apply_prices_schema(prices, config, tickers)
+    sentiment = apply_daily_sentiment_schema(sentiment, config, tickers)
 
     logger.info(f"Ceny: {len(prices)} wierszy | Sentyment: {len(sentiment)} wierszy")
 
@@ -43,25 +53,47 @@ def create_merged_dataset(config_path: str = "config.yaml") -> pd.DataFrame:
     )
 
     # Uzupełnij brakujący sentyment zerem (dni bez newsów = neutralny)
-    sentiment_cols = ["sentiment_mean", "sentiment_std", "article_count", "positive_pct", "negative_pct"]
+    sentiment_cols = ["sentiment_mean", "sentiment_std", "article_count", "sentiment_sum", "positive_pct", "negative_pct"]
     for col in sentiment_cols:
         if col in merged.columns:
             merged[col] = merged[col].fillna(0)
 
     # Dodaj lagi sentymentu
     merged = merged.sort_values(["ticker", "date"])
+    grouped_sentiment = merged.groupby("ticker", observed=True)["sentiment_mean"]
     for lag in range(1, min(max_lag, 6) + 1):
-        merged[f"sentiment_lag{lag}"] = merged.groupby("ticker")["sentiment_mean"].shift(lag)
+        merged[f"sentiment_lag{lag}"] = grouped_sentiment.shift(lag)
 
-    # Logarytmiczne stopy zwrotu (jeśli nie ma)
-    if "log_return" not in merged.columns:
-        merged["log_return"] = merged.groupby("ticker")["Close"].transform(
-            lambda x: np.log(x / x.shift(1))
+    # Sentyment sektora i całego rynku (w tym newsy bez spółki) — ten sam dla spółek w danym dniu
+    sector_path = config["paths"].get("sentiment_sector")
+    market_path = config["paths"].get("sentiment_market")
+    if sector_path and market_path and os.path.exists(sector_path) and os.path.exists(market_path):
+        merged = broadcast_levels(
+            merged,
+            pd.read_csv(sector_path, parse_dates=["date"]),
+            pd.read_csv(market_path, parse_dates=["date"]),
+            sector_map(config),
         )
 
+    # Indeksy sentymentu z wygaszaniem wykładniczym (nlp.sentiment_index)
+    index_cfg = config["nlp"].get("sentiment_index", {})
+    if index_cfg.get("enabled", False):
+        merged = add_sentiment_index(merged, sentiment, index_cfg.get("half_lives", [1, 5, 20]))
+
+    # Stopy zwrotu (jeśli nie ma) — logarytmiczne i proste, wybór wg econometrics.return_type
+    prev_close = merged.groupby("ticker", observed=True)["Close"].shift(1)
+    if "log_return" not in merged.columns:
+        merged["log_return"] = np.log(merged["Close"] / prev_close).astype("float64")
+    if "simple_return" not in merged.columns:
+        merged["simple_return"] = (merged["Close"] / prev_close - 1).astype("float64")
+
+    merged = apply_merged_schema(merged, config, tickers)
+    memory_report(merged, "merged")
+
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
     merged.to_csv(output_path, index=False)
     logger.success(f"Merged dataset zapisany do: {output_path} ({len(merged)} wierszy)")
+    export_panel(merged, config["paths"]["panel"], source_path=output_path)
 
     return merged
 
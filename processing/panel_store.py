@@ -0,0 +1,154 @@
+"""
+Kolumnowy magazyn panelu merged w plikach .npy mapowanych do pamięci.
+
+Układ katalogu (paths.panel):
+- <kolumna>.npy — jedna ciągła tablica na kolumnę liczbową, wiersze posortowane
+  po spółce (kolejność kategorii tickerów), potem po dacie; data jako int64 [ns],
+- index.json — lista spółek z zakresami wierszy [start, end), kolumny i odcisk CSV.
+
+Procesy robocze otwierają magazyn raz (np.load z mmap_mode="r") — do puli
+trafia tylko symbol spółki, bez serializacji panelu i bez czytania CSV.
+Bez kopii są tylko widoki view(); frame() to wygodny DataFrame na tych
+widokach, ale pandas może go skonsolidować przy dalszych operacjach, a
+sort_values / dropna w funkcjach ekonometrycznych i tak robią kopię wycinka.
+Kopiowany jest więc najwyżej wycinek jednej spółki (wybrane kolumny), nigdy cały panel.
+"""
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+INDEX_FILE = "index.json"
+
+_worker_panel = None
+
+
+def _source_stamp(path: str) -> list | None:
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def export_panel(merged: pd.DataFrame, panel_dir: str, source_path: str | None = None) -> dict:
+    """
+    Zapisuje panel jako kolumny .npy posortowane po (ticker, date) + indeks offsetów.
+
+    Args:
+        merged: panel ze schematem apply_merged_schema (ticker jako category).
+        source_path: CSV, z którego pochodzi panel — jego odcisk trafia do indeksu.
+
+    Returns:
+        Zawartość index.json.
+    """
+    merged = merged.sort_values(["ticker", "date"], kind="stable")
+    codes = merged["ticker"].cat.codes.to_numpy()
+    categories = list(merged["ticker"].cat.categories)
+
+    os.makedirs(panel_dir, exist_ok=True)
+    columns = {}
+    np.save(os.path.join(panel_dir, "date.npy"), merged["date"].to_numpy("datetime64[ns]").view("int64"))
+    columns["date"] = "datetime64[ns]"
+    for col in merged.columns:
+        if col == "date" or not pd.api.types.is_numeric_dtype(merged[col]) or isinstance(
+            merged[col].dtype, pd.CategoricalDtype
+        ):
+            continue
+        values = merged[col].to_numpy()
+        np.save(os.path.join(panel_dir, f"{col}.npy"), np.ascontiguousarray(values))
+        columns[col] = str(values.dtype)
+
+    # Zakresy wierszy per spółka — kody są posortowane, więc wystarczy searchsorted
+    present = np.unique(codes[codes >= 0])
+    starts = np.searchsorted(codes, present, side="left")
+    ends = np.searchsorted(codes, present, side="right")
+    index = {
+        "tickers": {categories[c]: [int(s), int(e)] for c, s, e in zip(present, starts, ends)},
+        "columns": columns,
+        "n_rows": len(merged),
+        "source": _source_stamp(source_path) if source_path else None,
+    }
+    # Indeks na końcu — jego obecność oznacza kompletny zapis kolumn
+    with open(os.path.join(panel_dir, INDEX_FILE), "w", encoding="utf-8") as f:
+        json.dump(index, f, indent=2)
+
+    size_mb = sum(os.path.getsize(os.path.join(panel_dir, f"{c}.npy")) for c in columns) / 1024 ** 2
+    logger.info(f"Panel memmap: {len(columns)} kolumn, {len(index['tickers'])} spółek, {size_mb:.2f} MB → {panel_dir}")
+    return index
+
+
+class PanelStore:
+    """Panel otwarty z dysku: kolumny jako np.memmap, widoki per spółka (view) bez kopii."""
+
+    def __init__(self, panel_dir: str):
+        self.panel_dir = panel_dir
+        with open(os.path.join(panel_dir, INDEX_FILE), encoding="utf-8") as f:
+            self.index = json.load(f)
+        self._arrays = {}
+
+    @property
+    def tickers(self) -> list[str]:
+        return list(self.index["tickers"])
+
+    @property
+    def columns(self) -> list[str]:
+        return list(self.index["columns"])
+
+    def array(self, column: str) -> np.ndarray:
+        if column not in self._arrays:
+            data = np.load(os.path.join(self.panel_dir, f"{column}.npy"), mmap_mode="r")
+            if column == "date":
+                data = data.view("datetime64[ns]")
+            self._arrays[column] = data
+        return self._arrays[column]
+
+    def view(self, ticker: str, column: str) -> np.ndarray:
+        """Widok (bez kopii) kolumny dla jednej spółki, posortowany po dacie."""
+        start, end = self.index["tickers"][ticker]
+        return self.array(column)[start:end]
+
+    def frame(self, ticker: str, columns: list[str]) -> pd.DataFrame:
+        """
+        Wycinek spółki jako DataFrame na widokach memmap (copy=False).
+
+        Przy pandas 2.2 kolumny zaraz po utworzeniu dzielą pamięć z memmap, ale to
+        nie jest gwarancja: konsolidacja bloków przy późniejszych operacjach albo
+        sort_values / dropna po stronie wywołującego kopiują wycinek. Gdzie kopia
+        ma znaczenie, używaj view().
+        """
+        return pd.DataFrame({c: self.view(ticker, c) for c in columns}, copy=False)
+
+
+def open_panel(config: dict) -> PanelStore:
+    """
+    Otwiera magazyn paths.panel; jeśli go brak lub nie pasuje do aktualnego
+    paths.merged (rozmiar / mtime), eksportuje panel ponownie z CSV.
+    """
+    from ingestion.schema import apply_merged_schema
+
+    panel_dir = config["paths"]["panel"]
+    merged_path = config["paths"]["merged"]
+    index_path = os.path.join(panel_dir, INDEX_FILE)
+    if os.path.exists(index_path):
+        store = PanelStore(panel_dir)
+        if store.index.get("source") == _source_stamp(merged_path):
+            return store
+        logger.info("Panel memmap nieaktualny względem merged CSV — eksportuję ponownie.")
+
+    merged = apply_merged_schema(pd.read_csv(merged_path, parse_dates=["date"]), config)
+    export_panel(merged, panel_dir, source_path=merged_path)
+    return PanelStore(panel_dir)
+
+
+def init_worker(panel_dir: str) -> None:
+    """Inicjalizator ProcessPoolExecutor — jeden PanelStore na proces."""
+    global _worker_panel
+    _worker_panel = PanelStore(panel_dir)
+
+
+def worker_panel() -> PanelStore:
+    if _worker_panel is None:
+        raise RuntimeError("Panel nie został zainicjalizowany w procesie (init_worker).")
+    return _worker_panel
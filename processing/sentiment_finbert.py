@@ -1,12 +1,30 @@
 """
 Analiza sentymentu nagłówków newsów przy użyciu FinBERT.
 Pipeline: Polski tekst → Tłumaczenie EN → FinBERT → wynik [-1, 1]
+
+Tryb kaskadowy (nlp.cascade): szybki leksykon (VADER + słownik finansowy)
+rozstrzyga pewne nagłówki, do FinBERT trafiają tylko niepewne. Leksykon jest
+angielski, więc działa na title_en — przy translation_enabled tłumaczenie
+obejmuje nadal wszystkie nagłówki, a kaskada oszczędza tylko inferencję FinBERT.
+
+Treści artykułów (nlp.body_scoring): tekst dzielony na nakładające się okna
+po max_length tokenów, okna wszystkich artykułów liczone we wspólnych partiach,
+prawdopodobieństwa uśredniane z powrotem per artykuł (wagi = liczba tokenów okna).
 """
+import json
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
 import yaml
 import os
 from loguru import logger
+from ingestion.article_body import fetch_bodies, load_fetcher
+from ingestion.schema import apply_news_schema, memory_report
+from processing.sentiment_levels import aggregate_levels, sector_map
+
+# Limit pojedynczego zapytania GoogleTranslator (~5000 znaków) z zapasem
+TRANSLATE_MAX_CHARS = 4500
 
 
 def load_config(path: str = "config.yaml") -> dict:
@@ -29,24 +47,58 @@ def translate_to_english(texts: list[str]) -> list[str]:
     return translated
 
 
-def run_finbert(texts: list[str], batch_size: int = 16) -> list[dict]:
-    """
-    Uruchamia FinBERT na liście tekstów.
+def _split_text(text: str, max_chars: int) -> list[str]:
+    """Dzieli tekst na kawałki <= max_chars po granicach akapitów, a w razie potrzeby zdań."""
+    chunks, current = [], ""
+    for part in text.replace(". ", ".\n").split("\n"):
+        part = part.strip()
+        if not part:
+            continue
+        while len(part) > max_chars:
+            chunks.append(part[:max_chars])
+            part = part[max_chars:]
+        if current and len(current) + len(part) + 1 > max_chars:
+            chunks.append(current)
+            current = part
+        else:
+            current = f"{current} {part}" if current else part
+    if current:
+        chunks.append(current)
+    return chunks
 
-    Returns:
-        Lista słowników: [{"label": "positive"|"negative"|"neutral", "score": float}]
-    """
+
+def translate_long(texts: list[str], max_chars: int = TRANSLATE_MAX_CHARS) -> list[str]:
+    """Tłumaczenie długich tekstów (treści artykułów) kawałkami mieszczącymi się w limicie."""
+    chunked = [_split_text(text, max_chars) for text in texts]
+    translated = iter(translate_to_english([chunk for chunks in chunked for chunk in chunks]))
+    return [" ".join(next(translated) for _ in chunks) for chunks in chunked]
+
+
+@lru_cache(maxsize=2)
+def _load_finbert(model_name: str):
     from transformers import pipeline
 
     logger.info("Ładowanie modelu FinBERT (pierwsze uruchomienie pobierze ~400MB)...")
-    nlp_pipeline = pipeline(
+    return pipeline(
         "text-classification",
-        model="ProsusAI/finbert",
-        tokenizer="ProsusAI/finbert",
+        model=model_name,
+        tokenizer=model_name,
         truncation=True,
         max_length=512
     )
 
+
+def run_finbert(texts: list[str], batch_size: int = 16, model_name: str = "ProsusAI/finbert") -> list[dict]:
+    """
+    Uruchamia FinBERT na liście tekstów.
+
+    Returns:
+        Lista słowników: [{"label": "positive"|"negative"|"neutral", "score": float}]
+    """
+    if not texts:
+        return []
+    nlp_pipeline = _load_finbert(model_name)
+
     results = []
     for i in range(0, len(texts), batch_size):
         batch = texts[i:i + batch_size]
@@ -57,6 +109,249 @@ def run_finbert(texts: list[str], batch_size: int = 16) -> list[dict]:
     return results
 
 
+def split_windows(n_tokens: int, window: int, stride: int) -> list[tuple[int, int]]:
+    """Zakresy [start, end) okien długości `window` co `stride` tokenów; ostatnie okno dosunięte do końca."""
+    if n_tokens <= window:
+        return [(0, n_tokens)]
+    starts = list(range(0, n_tokens - window, stride)) + [n_tokens - window]
+    return [(start, start + window) for start in starts]
+
+
+def run_finbert_windows(
+    texts: list[str],
+    batch_size: int = 16,
+    model_name: str = "ProsusAI/finbert",
+    max_length: int = 512,
+    overlap: int = 128,
+) -> list[dict]:
+    """
+    FinBERT dla długich tekstów bez obcinania do max_length.
+
+    Każdy tekst dzielony jest na okna po max_length tokenów (ze specjalnymi)
+    zachodzące na siebie o `overlap` tokenów. Okna wszystkich tekstów liczone są
+    we wspólnych partiach (posortowane po długości — mniej paddingu), a rozkłady
+    etykiet uśredniane per tekst z wagą = liczba tokenów okna.
+
+    Returns:
+        Lista słowników jak run_finbert + "windows" (liczba okien tekstu).
+    """
+    if not texts:
+        return []
+    import torch
+
+    nlp_pipeline = _load_finbert(model_name)
+    tokenizer, model = nlp_pipeline.tokenizer, nlp_pipeline.model
+    content = max_length - tokenizer.num_special_tokens_to_add()
+    stride = max(content - overlap, 1)
+
+    windows, owners, weights = [], [], []
+    for i, ids in enumerate(tokenizer(texts, add_special_tokens=False)["input_ids"]):
+        for start, end in split_windows(len(ids), content, stride):
+            windows.append(tokenizer.build_inputs_with_special_tokens(ids[start:end]))
+            owners.append(i)
+            weights.append(max(end - start, 1))
+
+    n_batches = (len(windows) - 1) // batch_size + 1
+    logger.info(f"FinBERT (okna): {len(texts)} tekstów → {len(windows)} okien, {n_batches} partii")
+    order = np.argsort([len(w) for w in windows], kind="stable")
+    probs = np.zeros((len(windows), model.config.num_labels))
+    model.eval()
+    with torch.inference_mode():
+        for b, start in enumerate(range(0, len(order), batch_size)):
+            idx = order[start:start + batch_size]
+            batch = tokenizer.pad({"input_ids": [windows[j] for j in idx]}, return_tensors="pt")
+            batch = {k: v.to(model.device) for k, v in batch.items()}
+            probs[idx] = torch.softmax(model(**batch).logits, dim=-1).cpu().numpy()
+            logger.debug(f"FinBERT (okna) — partia {b + 1}/{n_batches}")
+
+    owners = np.asarray(owners)
+    weights = np.asarray(weights, dtype=np.float64)
+    pooled = np.zeros((len(texts), probs.shape[1]))
+    np.add.at(pooled, owners, probs * weights[:, None])
+    pooled /= np.bincount(owners, weights=weights, minlength=len(texts))[:, None]
+    counts = np.bincount(owners, minlength=len(texts))
+
+    labels = [model.config.id2label[k].lower() for k in pooled.argmax(axis=1)]
+    return [
+        {"label": label, "score": float(p.max()), "windows": int(n)}
+        for label, p, n in zip(labels, pooled, counts)
+    ]
+
+
+def score_bodies(
+    df: pd.DataFrame,
+    config: dict,
+    batch_size: int = 16,
+    model_name: str = "ProsusAI/finbert",
+) -> pd.DataFrame:
+    """
+    Dokłada sentyment treści artykułów (nlp.body_scoring).
+
+    Kolumny: body_sentiment_score, body_sentiment_label, body_windows,
+    headline_sentiment_score (wynik samego nagłówka). sentiment_score staje się
+    średnią ważoną headline_weight · nagłówek + (1 - headline_weight) · treść
+    tam, gdzie treść jest dostępna.
+    """
+    body_cfg = config["nlp"].get("body_scoring", {})
+    bodies = fetch_bodies(
+        df["url"].tolist(),
+        load_fetcher(config),
+        cache_dir=body_cfg.get("cache_dir", "data/cache/bodies"),
+        max_workers=body_cfg.get("max_workers", 8),
+        miss_ttl=body_cfg.get("miss_ttl_hours", 24) * 3600,
+    )
+
+    df = df.copy()
+    df["headline_sentiment_score"] = df["sentiment_score"]
+    df["body_sentiment_score"] = np.nan
+    df["body_sentiment_label"] = None
+    df["body_windows"] = 0
+    if not bodies:
+        return df
+
+    # Każdy URL liczony raz, także gdy artykuł przypisano kilku wierszom
+    urls = list(bodies)
+    texts = [bodies[url] for url in urls]
+    translate = body_cfg.get("translate")
+    if config["nlp"]["translation_enabled"] if translate is None else translate:
+        logger.info(f"Tłumaczenie {len(texts)} treści artykułów PL → EN...")
+        texts = translate_long(texts)
+    results = run_finbert_windows(
+        texts,
+        batch_size=batch_size,
+        model_name=model_name,
+        max_length=body_cfg.get("max_length", 512),
+        overlap=body_cfg.get("overlap", 128),
+    )
+    by_url = dict(zip(urls, results))
+
+    mask = df["url"].isin(list(by_url))
+    scored = [by_url[url] for url in df.loc[mask, "url"]]
+    df.loc[mask, "body_sentiment_score"] = [label_to_score(r["label"], r["score"]) for r in scored]
+    df.loc[mask, "body_sentiment_label"] = [r["label"] for r in scored]
+    df.loc[mask, "body_windows"] = [r["windows"] for r in scored]
+
+    weight = body_cfg.get("headline_weight", 0.5)
+    df.loc[mask, "sentiment_score"] = (
+        weight * df.loc[mask, "headline_sentiment_score"] + (1 - weight) * df.loc[mask, "body_sentiment_score"]
+    )
+    logger.info(
+        f"Treści: {mask.sum()}/{len(df)} artykułów, średnio {df.loc[mask, 'body_windows'].mean():.1f} okien"
+    )
+    return df
+
+
+# Uzupełnienie słownika VADER o słownictwo z nagłówków giełdowych (skala VADER: -4..+4)
+FINANCE_LEXICON = {
+    "plunge": -2.8, "plunges": -2.8, "plunged": -2.8, "slump": -2.2, "slumps": -2.2,
+    "drop": -1.6, "drops": -1.6, "dropped": -1.6, "fall": -1.6, "falls": -1.6, "fell": -1.6,
+    "decline": -1.6, "declines": -1.6, "declined": -1.6, "loss": -2.0, "losses": -2.0,
+    "downgrade": -2.0, "downgraded": -2.0, "cut": -1.2, "cuts": -1.2, "lower": -1.0,
+    "bankruptcy": -3.0, "fine": -1.5, "penalty": -2.0, "probe": -1.5, "sell-off": -2.5,
+    "surge": 2.5, "surges": 2.5, "surged": 2.5, "jump": 2.0, "jumps": 2.0, "jumped": 2.0,
+    "rally": 2.0, "rallies": 2.0, "gain": 1.6, "gains": 1.6, "rise": 1.5, "rises": 1.5,
+    "rose": 1.5, "upgrade": 2.0, "upgraded": 2.0, "beat": 1.5, "beats": 1.5,
+    "record": 1.5, "dividend": 1.2, "growth": 1.5, "higher": 1.0, "profit": 1.2,
+}
+
+
+@lru_cache(maxsize=1)
+def _load_lexicon():
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    analyzer = SentimentIntensityAnalyzer()
+    analyzer.lexicon.update(FINANCE_LEXICON)
+    return analyzer
+
+
+def run_lexicon(texts: list[str]) -> list[dict]:
+    """
+    Szybki scoring leksykalny (VADER + słownik finansowy), format jak run_finbert.
+
+    score = pewność etykiety: |compound| dla positive/negative, udział neutralny dla neutral;
+    nagłówek z mieszanymi sygnałami (pos i neg > 0) dostaje pewność obniżoną o połowę.
+    Nagłówek bez żadnego słowa ze słownika (np. nieprzetłumaczony polski) to brak
+    informacji, a nie dowód neutralności — dostaje pewność 0 i zawsze trafia do FinBERT.
+    """
+    analyzer = _load_lexicon()
+    results = []
+    for text in texts:
+        scores = analyzer.polarity_scores(text)
+        compound = scores["compound"]
+        if compound >= 0.05:
+            label, confidence = "positive", abs(compound)
+        elif compound <= -0.05:
+            label, confidence = "negative", abs(compound)
+        elif scores["pos"] == 0 and scores["neg"] == 0:
+            label, confidence = "neutral", 0.0
+        else:
+            label, confidence = "neutral", scores["neu"]
+        if scores["pos"] > 0 and scores["neg"] > 0:
+            confidence *= 0.5
+        results.append({"label": label, "score": float(confidence)})
+    return results
+
+
+def run_cascade(
+    texts: list[str],
+    threshold: float = 0.6,
+    batch_size: int = 16,
+    model_name: str = "ProsusAI/finbert",
+    eval_sample: int = 200,
+    seed: int = 42,
+) -> tuple[list[dict], list[str], dict]:
+    """
+    Kaskada: leksykon → FinBERT tylko dla nagłówków z pewnością < threshold.
+
+    Zgodność z pełnym FinBERT mierzymy na losowej próbie nagłówków rozstrzygniętych
+    leksykonem (eval_sample) — to jedyne miejsce, gdzie kaskada może się mylić.
+    Kaskada dostaje teksty już po ewentualnym tłumaczeniu — nie zmniejsza jego kosztu.
+
+    Returns:
+        (wyniki w formacie run_finbert, etap per tekst "lexicon"|"finbert", raport)
+    """
+    results = run_lexicon(texts)
+    stages = ["lexicon"] * len(texts)
+    escalated = [i for i, r in enumerate(results) if r["score"] < threshold]
+    kept = [i for i, r in enumerate(results) if r["score"] >= threshold]
+
+    logger.info(f"Kaskada: {len(escalated)}/{len(texts)} nagłówków eskalowanych do FinBERT")
+    for i, r in zip(escalated, run_finbert([texts[i] for i in escalated], batch_size, model_name)):
+        results[i] = r
+        stages[i] = "finbert"
+
+    report = {
+        "n_texts": len(texts),
+        "threshold": threshold,
+        "n_escalated": len(escalated),
+        "escalation_rate": len(escalated) / max(len(texts), 1),
+    }
+
+    rng = np.random.default_rng(seed)
+    sample = sorted(rng.choice(kept, size=min(eval_sample, len(kept)), replace=False).tolist()) if kept else []
+    if sample:
+        reference = run_finbert([texts[i] for i in sample], batch_size, model_name)
+        cascade_labels = [results[i]["label"] for i in sample]
+        cascade_scores = [label_to_score(results[i]["label"], results[i]["score"]) for i in sample]
+        ref_labels = [r["label"] for r in reference]
+        ref_scores = [label_to_score(r["label"], r["score"]) for r in reference]
+        agreement_kept = float(np.mean([a == b for a, b in zip(cascade_labels, ref_labels)]))
+        report.update({
+            "eval_sample": len(sample),
+            "agreement_lexicon_vs_finbert": agreement_kept,
+            # Eskalowane nagłówki mają wynik FinBERT, więc zgodność całości szacujemy ważąc udziałem
+            "agreement_estimated_total": 1 - (1 - agreement_kept) * len(kept) / max(len(texts), 1),
+            "score_mae_lexicon_vs_finbert": float(np.mean(np.abs(np.subtract(cascade_scores, ref_scores)))),
+            "confusion_lexicon_to_finbert": pd.crosstab(
+                pd.Series(cascade_labels, name="lexicon"), pd.Series(ref_labels, name="finbert")
+            ).to_dict(orient="index"),
+        })
+        logger.info(
+            f"Kaskada: zgodność leksykonu z FinBERT {agreement_kept:.1%} na próbie {len(sample)}, "
+            f"szacowana zgodność całości {report['agreement_estimated_total']:.1%}"
+        )
+    return results, stages, report
+
+
 def label_to_score(label: str, score: float) -> float:
     """
     Konwertuje label FinBERT na liczbę ciągłą:
@@ -71,18 +366,28 @@ def label_to_score(label: str, score: float) -> float:
     return 0.0
 
 
-def run_sentiment(config_path: str = "config.yaml") -> None:
+def score_articles(config_path: str = "config.yaml") -> pd.DataFrame:
+    """
+    Tłumaczenie + FinBERT dla wszystkich nagłówków z raw_news.
+    Zapisuje artykuły z wynikiem do paths.news_scored.
+
+    Tłumaczenie (translation_enabled) obejmuje każdy nagłówek, także przy włączonej
+    kaskadzie — leksykon wymaga tekstu angielskiego, więc kaskada ogranicza tylko
+    liczbę nagłówków liczonych FinBERT (raport: n_translated, n_escalated).
+    """
     config = load_config(config_path)
     input_path = config["paths"]["raw_news"]
-    output_path = config["paths"]["sentiment_daily"]
+    output_path = config["paths"]["news_scored"]
     translate = config["nlp"]["translation_enabled"]
     batch_size = config["nlp"]["batch_size"]
+    model_name = config["nlp"].get("finbert_model", "ProsusAI/finbert")
+    cascade = config["nlp"].get("cascade", {})
 
     if not os.path.exists(input_path):
         logger.error(f"Brak pliku z newsami: {input_path}. Uruchom najpierw moduł ingestion.")
-        return
+        return pd.DataFrame()
 
-    df = pd.read_csv(input_path)
+    df = apply_news_schema(pd.read_csv(input_path), config)
     logger.info(f"Załadowano {len(df)} artykułów z {input_path}")
 
     titles = df["title"].fillna("").tolist()
@@ -95,9 +400,27 @@ def run_sentiment(config_path: str = "config.yaml") -> None:
     else:
         df["title_en"] = titles
 
-    # Krok 2: FinBERT
-    logger.info("Uruchamianie FinBERT...")
-    finbert_results = run_finbert(df["title_en"].tolist(), batch_size=batch_size)
+    # Krok 2: FinBERT (albo kaskada leksykon → FinBERT)
+    if cascade.get("enabled", False):
+        logger.info("Uruchamianie kaskady leksykon → FinBERT...")
+        finbert_results, stages, report = run_cascade(
+            df["title_en"].tolist(),
+            threshold=cascade.get("threshold", 0.6),
+            batch_size=batch_size,
+            model_name=model_name,
+            eval_sample=cascade.get("eval_sample", 200),
+            seed=cascade.get("seed", 42),
+        )
+        df["sentiment_stage"] = stages
+        report["n_translated"] = len(titles) if translate else 0
+        report_path = config["paths"]["cascade_report"]
+        os.makedirs(os.path.dirname(report_path), exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        logger.success(f"Raport kaskady zapisany do: {report_path}")
+    else:
+        logger.info("Uruchamianie FinBERT...")
+        finbert_results = run_finbert(df["title_en"].tolist(), batch_size=batch_size, model_name=model_name)
 
     df["sentiment_label"] = [r["label"] for r in finbert_results]
     df["sentiment_confidence"] = [r["score"] for r in finbert_results]
@@ -105,25 +428,63 @@ def run_sentiment(config_path: str = "config.yaml") -> None:
         label_to_score(r["label"], r["score"]) for r in finbert_results
     ]
 
-    # Krok 3: Agregacja do dziennego sentymentu per spółka
-    df["date"] = pd.to_datetime(df["published_at"], errors="coerce", utc=True).dt.date
-
-    daily_sentiment = (
-        df.groupby(["date", "ticker_mentioned"])
-        .agg(
-            sentiment_mean=("sentiment_score", "mean"),
-            sentiment_std=("sentiment_score", "std"),
-            article_count=("sentiment_score", "count"),
-            positive_pct=("sentiment_label", lambda x: (x == "positive").mean()),
-            negative_pct=("sentiment_label", lambda x: (x == "negative").mean()),
-        )
-        .reset_index()
-    )
+    # Krok 3 (opcjonalnie): treści artykułów — okna FinBERT
+    if config["nlp"].get("body_scoring", {}).get("enabled", False):
+        logger.info("Scoring treści artykułów (okna FinBERT)...")
+        df = score_bodies(df, config, batch_size=batch_size, model_name=model_name)
+    df = apply_news_schema(df, config)
+    memory_report(df, "news scored")
 
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    daily_sentiment.to_csv(output_path, index=False)
-    logger.success(f"Sentyment dzienny zapisany do: {output_path}")
-    logger.info(f"Przykład:\n{daily_sentiment.head()}")
+    df.to_csv(output_path, index=False)
+    logger.success(f"Artykuły z sentymentem zapisane do: {output_path}")
+    return df
+
+
+def aggregate_daily(df: pd.DataFrame, method: str = "mean") -> pd.DataFrame:
+    """
+    Agregacja do dziennego sentymentu per spółka (dzień wg UTC).
+
+    Args:
+        method: "mean" lub "median" — sposób liczenia kolumny sentiment_mean.
+    """
+    return aggregate_levels(df, {}, method=method)["ticker"]
+
+
+def run_aggregation(config_path: str = "config.yaml") -> None:
+    """
+    Czyta paths.news_scored i zapisuje dzienny sentyment: per spółka
+    (paths.sentiment_daily), per sektor (paths.sentiment_sector) i rynku
+    (paths.sentiment_market) — wszystkie z jednego przebiegu po artykułach.
+    """
+    config = load_config(config_path)
+    paths = config["paths"]
+    input_path = paths["news_scored"]
+    method = config["nlp"].get("aggregation", "mean")
+
+    if not os.path.exists(input_path):
+        logger.error(f"Brak pliku: {input_path}. Uruchom najpierw scoring sentymentu.")
+        return
+
+    df = apply_news_schema(pd.read_csv(input_path), config)
+    levels = aggregate_levels(df, sector_map(config), method=method)
+    no_ticker = int(df["ticker_mentioned"].isna().sum())
+    logger.info(f"Artykuły bez spółki (tylko poziom rynku): {no_ticker}/{len(df)}")
+
+    for level, key in (("ticker", "sentiment_daily"), ("sector", "sentiment_sector"), ("market", "sentiment_market")):
+        if key not in paths:
+            continue
+        os.makedirs(os.path.dirname(paths[key]), exist_ok=True)
+        levels[level].to_csv(paths[key], index=False)
+        logger.success(f"Sentyment dzienny [{level}] ({method}) zapisany do: {paths[key]}")
+    logger.info(f"Przykład:\n{levels['ticker'].head()}")
+
+
+def run_sentiment(config_path: str = "config.yaml") -> None:
+    scored = score_articles(config_path)
+    if scored.empty:
+        return
+    run_aggregation(config_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,170 @@
+"""
+Indeks sentymentu z wykładniczym wygaszaniem w czasie, per spółka.
+
+Dla połowicznego czasu wygaszania h (dni kalendarzowe) artykuł sprzed Δt dni
+ma wagę w = 2^(-Δt / h). Stan spółki to dwie sumy:
+
+    S(t) = Σ w_i · s_i     (wygaszona suma sentymentu)
+    I(t) = Σ w_i           (wygaszona liczba newsów — intensywność)
+
+a indeks to S / I (wygaszona średnia sentymentu, 0 gdy brak newsów).
+
+- SentimentIndex.update() — aktualizacja O(1) na artykuł (strumień),
+- decayed_index() — cała historia naraz: macierz dzień × spółka przez
+  filtr rekurencyjny y[t] = a · y[t-1] + x[t] (scipy.signal.lfilter).
+
+Obie ścieżki dają te same wartości tylko dla znaczników czasu o północy.
+decayed_index() liczy na dniach kalendarzowych (artykuł z 15:00 waży jak
+z 00:00 swojego dnia), a SentimentIndex wygasza o dokładny upływ czasu —
+artykuły śróddzienne dostają w nim mniejszą wagę na koniec dnia.
+"""
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter
+
+DAY = np.timedelta64(1, "D")
+EPOCH = np.datetime64("1970-01-01T00:00:00", "ns")
+MIN_INTENSITY = 1e-9
+
+
+def index_column(half_life: float) -> str:
+    return f"sentiment_idx_{half_life:g}d"
+
+
+def intensity_column(half_life: float) -> str:
+    return f"news_intensity_{half_life:g}d"
+
+
+def index_columns(columns) -> list[str]:
+    """Kolumny indeksów (sentyment + intensywność) obecne w zbiorze kolumn."""
+    return [c for c in columns if c.startswith(("sentiment_idx_", "news_intensity_"))]
+
+
+def _to_days(timestamp) -> float:
+    return float((np.datetime64(pd.Timestamp(timestamp).tz_localize(None), "ns") - EPOCH) / DAY)
+
+
+class SentimentIndex:
+    """Stan strumieniowy: per spółka czas ostatniej aktualizacji oraz sumy S i I dla każdego h."""
+
+    def __init__(self, half_lives=(1, 5, 20)):
+        self.half_lives = [float(h) for h in half_lives]
+        self._rates = np.log(2) / np.asarray(self.half_lives)
+        self._state: dict[str, tuple[float, np.ndarray, np.ndarray]] = {}
+
+    def _decay(self, dt: float) -> np.ndarray:
+        return np.exp(-self._rates * dt)
+
+    def update(self, ticker: str, timestamp, score: float) -> None:
+        """
+        Dodaje artykuł w czasie O(1) (względem historii).
+
+        Artykuł spóźniony (starszy niż ostatnia aktualizacja) dostaje od razu
+        wagę wygaszoną o opóźnienie — wynik jak przy kolejności chronologicznej.
+        """
+        t = _to_days(timestamp)
+        state = self._state.get(ticker)
+        if state is None:
+            self._state[ticker] = (t, np.full(len(self.half_lives), float(score)), np.ones(len(self.half_lives)))
+            return
+        t_last, s, i = state
+        if t >= t_last:
+            decay = self._decay(t - t_last)
+            self._state[ticker] = (t, s * decay + score, i * decay + 1.0)
+        else:
+            weight = self._decay(t_last - t)
+            self._state[ticker] = (t_last, s + weight * score, i + weight)
+
+    def value(self, ticker: str, timestamp=None) -> dict:
+        """Indeksy spółki wygaszone do `timestamp` (domyślnie: chwila ostatniej aktualizacji)."""
+        state = self._state.get(ticker)
+        if state is None:
+            return {**{index_column(h): 0.0 for h in self.half_lives},
+                    **{intensity_column(h): 0.0 for h in self.half_lives}}
+        t_last, s, i = state
+        decay = self._decay(max(_to_days(timestamp) - t_last, 0.0)) if timestamp is not None else 1.0
+        s, i = s * decay, i * decay
+        idx = np.where(i > MIN_INTENSITY, s / np.maximum(i, MIN_INTENSITY), 0.0)
+        return {
+            **{index_column(h): float(v) for h, v in zip(self.half_lives, idx)},
+            **{intensity_column(h): float(v) for h, v in zip(self.half_lives, i)},
+        }
+
+
+def _decay_filter(x: np.ndarray, half_life: float) -> np.ndarray:
+    """y[t] = a · y[t-1] + x[t] wzdłuż osi 0 (dni), a = 2^(-1/h)."""
+    a = 2.0 ** (-1.0 / half_life)
+    return lfilter([1.0], [1.0, -a], x, axis=0)
+
+
+def decayed_index(daily: pd.DataFrame, half_lives, ticker_col: str = "ticker") -> pd.DataFrame:
+    """
+    Indeksy dla całej historii naraz z dziennego sentymentu.
+
+    Args:
+        daily: date, ticker, sentiment_sum, article_count (jak sentiment_daily).
+            sentiment_sum to suma wyników artykułów dnia; pliki sprzed tej kolumny
+            dostają sentiment_mean · article_count (poprawne tylko przy agregacji "mean").
+
+    Returns:
+        Long DataFrame: date (każdy dzień kalendarzowy), ticker, kolumny indeksów;
+        wartość w dniu t uwzględnia newsy z dnia t włącznie.
+    """
+    daily = daily[daily["article_count"] > 0]
+    if daily.empty:
+        return pd.DataFrame(columns=["date", ticker_col])
+    if "sentiment_sum" not in daily.columns:
+        daily = daily.assign(sentiment_sum=daily["sentiment_mean"].astype("float64") * daily["article_count"])
+    calendar = pd.date_range(daily["date"].min(), daily["date"].max(), freq="D")
+
+    # Macierze dzień × spółka; dni bez newsów = 0
+    sums = daily.pivot_table(index="date", columns=ticker_col, values="sentiment_sum",
+                             aggfunc="sum", observed=True).reindex(calendar, fill_value=0).fillna(0)
+    counts = daily.pivot_table(index="date", columns=ticker_col, values="article_count",
+                               aggfunc="sum", observed=True).reindex(calendar, fill_value=0).fillna(0)
+
+    frames = {}
+    for h in half_lives:
+        s = _decay_filter(sums.to_numpy(np.float64), h)
+        i = _decay_filter(counts.to_numpy(np.float64), h)
+        frames[index_column(h)] = np.where(i > MIN_INTENSITY, s / np.maximum(i, MIN_INTENSITY), 0.0)
+        frames[intensity_column(h)] = i
+
+    tickers = sums.columns
+    result = pd.DataFrame({
+        "date": np.repeat(calendar.to_numpy(), len(tickers)),
+        ticker_col: np.tile(np.asarray(tickers, dtype=object), len(calendar)),
+        **{name: values.ravel() for name, values in frames.items()},
+    })
+    return result
+
+
+def add_sentiment_index(merged: pd.DataFrame, daily: pd.DataFrame, half_lives) -> pd.DataFrame:
+    """
+    Dokleja indeksy do panelu (dni sesyjne). Dni przed pierwszym newsem spółki = 0;
+    sesja po weekendzie widzi newsy weekendowe (wygaszone o upływ dni kalendarzowych).
+    """
+    index = decayed_index(daily, half_lives)
+    columns = index_columns(index.columns)
+    if index.empty:
+        for col in [c for h in half_lives for c in (index_column(h), intensity_column(h))]:
+            merged[col] = 0.0
+        return merged
+
+    # Dni sesyjne po ostatnim newsie: wygaszamy stan z ostatniego dnia kalendarza
+    last_day = index["date"].max()
+    index["ticker"] = index["ticker"].astype(merged["ticker"].dtype)
+    out = merged.merge(index, on=["date", "ticker"], how="left")
+    after = out["date"] > last_day
+    if after.any():
+        last = index[index["date"] == last_day]
+        last = last.set_index(last["ticker"].astype(str))
+        gap = (out.loc[after, "date"] - last_day).dt.days.to_numpy()
+        tick = out.loc[after, "ticker"].astype(str)
+        for h in half_lives:
+            decay = 2.0 ** (-gap / h)
+            i_col, s_col = intensity_column(h), index_column(h)
+            out.loc[after, i_col] = tick.map(last[i_col]).to_numpy(np.float64) * decay
+            out.loc[after, s_col] = tick.map(last[s_col]).to_numpy(np.float64)
+    out[columns] = out[columns].fillna(0.0)
+    return out
@@ -0,0 +1,158 @@
+"""
+Dzienny sentyment na trzech poziomach: spółka, sektor, cały rynek.
+
+Jeden przebieg groupby(["date", "ticker_mentioned"], dropna=False) po
+artykułach liczy statystyki dostateczne każdej grupy (liczność, suma, suma
+kwadratów, liczba pozytywnych / negatywnych). Poziomy wyższe to zwykłe sumy
+tych statystyk:
+
+- spółka — grupy z tickerem,
+- sektor — grupy spółek z tym samym `sector` w config.yaml,
+- rynek — wszystkie grupy, także artykuły bez spółki (makro, komentarze rynkowe),
+  które w agregacji per spółka by przepadły.
+
+Średnia i odchylenie standardowe (z próby, jak pandas .std()) wynikają wprost
+ze statystyk. Mediany nie da się zsumować — przy method="median" sektor i rynek
+dostają osobny groupby po artykułach. Kolumna sentiment_sum to zawsze suma
+surowych wyników artykułów (niezależnie od method) — potrzebna indeksom z wygaszaniem.
+"""
+import numpy as np
+import pandas as pd
+
+LEVEL_KEYS = {"ticker": ["date", "ticker_mentioned"], "sector": ["date", "sector"], "market": ["date"]}
+# Kolumny poziomów sektor / rynek doklejane do panelu merged
+BROADCAST_COLUMNS = ["sentiment_mean", "article_count"]
+
+_STATS = ["n", "s", "ss", "pos", "neg", "rows"]
+
+
+def sector_map(config: dict) -> dict[str, str]:
+    """{symbol: sektor} dla spółek z config.yaml, które mają pole sector."""
+    return {t["symbol"]: t["sector"] for t in config["tickers"] if t.get("sector")}
+
+
+def level_column(level: str, column: str) -> str:
+    """("market", "sentiment_mean") → "market_sentiment_mean"."""
+    return f"{level}_{column}"
+
+
+def _finalize(stats: pd.DataFrame, keys: list[str]) -> pd.DataFrame:
+    """Sumy → sentiment_mean, sentiment_std, article_count, sentiment_sum, positive_pct, negative_pct."""
+    n = stats["n"].to_numpy(np.float64)
+    s = stats["s"].to_numpy(np.float64)
+    ss = stats["ss"].to_numpy(np.float64)
+    rows = stats["rows"].to_numpy(np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = np.maximum(ss - s * s / n, 0.0) / (n - 1)
+        out = stats[keys].reset_index(drop=True)
+        out["sentiment_mean"] = np.where(n > 0, s / n, np.nan)
+        out["sentiment_std"] = np.where(n > 1, np.sqrt(var), np.nan)
+    out["article_count"] = stats["n"].to_numpy()
+    out["sentiment_sum"] = s
+    out["positive_pct"] = stats["pos"].to_numpy() / rows
+    out["negative_pct"] = stats["neg"].to_numpy() / rows
+    return out
+
+
+def aggregate_levels(
+    df: pd.DataFrame, sectors: dict[str, str], method: str = "mean"
+) -> dict[str, pd.DataFrame]:
+    """
+    Dzienny sentyment (dzień wg UTC) per spółka, sektor i rynek z jednego przebiegu groupby.
+
+    Args:
+        df: ocenione artykuły (published_at, ticker_mentioned, sentiment_score, sentiment_label).
+        sectors: {symbol: sektor} — spółki spoza mapy nie wchodzą do poziomu sektorowego.
+        method: "mean" lub "median" — sposób liczenia kolumny sentiment_mean.
+
+    Returns:
+        {"ticker": date, ticker_mentioned, …; "sector": date, sector, …; "market": date, …}
+        — każda ramka z kolumnami jak sentiment_daily.
+    """
+    if method not in ("mean", "median"):
+        raise ValueError(f"Nieznana metoda agregacji: {method}")
+
+    score = df["sentiment_score"].astype("float64")
+    label = df["sentiment_label"].astype(str)
+    articles = pd.DataFrame({
+        "date": df["published_at"].dt.tz_localize(None).dt.normalize(),
+        "ticker_mentioned": df["ticker_mentioned"],
+        "n": score.notna().astype("int64"),
+        "s": score.fillna(0.0),
+        "ss": score.fillna(0.0) ** 2,
+        "pos": (label == "positive").astype("int64"),
+        "neg": (label == "negative").astype("int64"),
+        "rows": np.ones(len(df), dtype="int64"),
+    })
+    # Artykuły bez daty publikacji nie należą do żadnego dnia (dropna=False niżej zostawiłby NaT)
+    articles = articles.dropna(subset=["date"])
+
+    # Jedyny przebieg po artykułach; NaN ticker = newsy rynkowe, zostają w grupach
+    stats = (
+        articles.groupby(["date", "ticker_mentioned"], dropna=False, observed=True, sort=True)[_STATS]
+        .sum()
+        .reset_index()
+    )
+    ticker_stats = stats[stats["ticker_mentioned"].notna()]
+    sector_stats = (
+        ticker_stats.assign(sector=ticker_stats["ticker_mentioned"].astype(str).map(sectors))
+        .dropna(subset=["sector"])
+        .groupby(["date", "sector"], sort=True)[_STATS].sum()
+        .reset_index()
+    )
+    market_stats = stats.groupby("date", sort=True)[_STATS].sum().reset_index()
+
+    levels = {
+        "ticker": _finalize(ticker_stats, LEVEL_KEYS["ticker"]),
+        "sector": _finalize(sector_stats, LEVEL_KEYS["sector"]),
+        "market": _finalize(market_stats, LEVEL_KEYS["market"]),
+    }
+
+    if method == "median":
+        scored = pd.DataFrame({
+            "date": articles["date"],
+            "ticker_mentioned": df["ticker_mentioned"].astype(object),
+            "sector": df["ticker_mentioned"].astype(object).map(sectors),
+            "sentiment_score": score,
+        })
+        for level, keys in LEVEL_KEYS.items():
+            medians = scored.dropna(subset=keys).groupby(keys)["sentiment_score"].median()
+            frame = levels[level]
+            index = pd.MultiIndex.from_frame(frame[keys].astype({k: object for k in keys[1:]})) \
+                if len(keys) > 1 else pd.Index(frame["date"])
+            frame["sentiment_mean"] = medians.reindex(index).to_numpy(np.float64)
+    return levels
+
+
+def broadcast_levels(
+    merged: pd.DataFrame, sector_daily: pd.DataFrame, market_daily: pd.DataFrame, sectors: dict[str, str]
+) -> pd.DataFrame:
+    """
+    Dokleja sentyment sektora i rynku do każdego wiersza panelu (spółka × dzień).
+
+    Zamiast merge (kopia całego panelu na każdy poziom) wyznacza pozycję wiersza
+    w małej tabeli poziomu i pobiera wartości przez take — panel dostaje tylko
+    nowe kolumny float32 / int32. Dni bez newsów na danym poziomie = 0.
+    """
+    dates = merged["date"].to_numpy("datetime64[ns]")
+
+    # Rynek: klucz = data
+    market = market_daily.sort_values("date")
+    pos = pd.Index(market["date"].to_numpy("datetime64[ns]")).get_indexer(dates)
+    _take_columns(merged, market, pos, "market")
+
+    # Sektor: klucz = (data, sektor spółki); spółki bez sektora → brak dopasowania
+    ticker_sector = merged["ticker"].astype(object).map(sectors)
+    keys = pd.MultiIndex.from_arrays([sector_daily["date"].to_numpy("datetime64[ns]"), sector_daily["sector"]])
+    pos = keys.get_indexer(pd.MultiIndex.from_arrays([dates, ticker_sector.to_numpy()]))
+    _take_columns(merged, sector_daily, pos, "sector")
+    return merged
+
+
+def _take_columns(merged: pd.DataFrame, level_daily: pd.DataFrame, pos: np.ndarray, level: str) -> None:
+    found = pos >= 0
+    for col in BROADCAST_COLUMNS:
+        source = level_daily[col].to_numpy(np.float64)
+        values = np.zeros(len(merged), dtype=np.float64)
+        values[found] = np.nan_to_num(source[pos[found]])
+        merged[level_column(level, col)] = values.astype("int32" if col == "article_count" else "float32")
@@ -0,0 +1,52 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pytest
+
+
+class StubServer:
+    """
+    Lokalny serwer HTTP do testów: route(path, handler), gdzie
+    handler(request) -> (status, headers, body); każde żądanie trafia do .requests.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                stub.requests.append({"path": path, "url": self.path, "headers": dict(self.headers)})
+                handler = stub.routes.get(path)
+                status, headers, body = handler(self) if handler else (404, {}, b"")
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def route(self, path: str, handler) -> None:
+        self.routes[path] = handler
+
+    def hits(self, path: str) -> list[dict]:
+        return [r for r in self.requests if r["path"] == path]
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    server._thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
@@ -0,0 +1,37 @@
+import os
+
+from ingestion.article_body import BodyCache, fetch_bodies
+
+
+def test_fetcher_errors_are_isolated_and_misses_cached(tmp_path):
+    calls = []
+
+    def fetcher(url):
+        calls.append(url)
+        if url.endswith("broken"):
+            raise ValueError("parser exploded")
+        if url.endswith("empty"):
+            return None
+        return f"treść {url}"
+
+    urls = ["https://a/ok", "https://a/broken", "https://a/empty"]
+    bodies = fetch_bodies(urls, fetcher, cache_dir=str(tmp_path), max_workers=2)
+    assert bodies == {"https://a/ok": "treść https://a/ok"}
+
+    # Drugie uruchomienie: treść i oba braki z cache — bez wywołań fetchera
+    calls.clear()
+    assert fetch_bodies(urls, fetcher, cache_dir=str(tmp_path)) == bodies
+    assert calls == []
+
+
+def test_expired_miss_is_refetched(tmp_path):
+    cache = BodyCache(str(tmp_path), miss_ttl=60)
+    cache.store_miss("https://a/x")
+    assert cache.load("https://a/x") == ""
+
+    old = os.path.getmtime(cache._path("https://a/x", "miss")) - 120
+    os.utime(cache._path("https://a/x", "miss"), (old, old))
+    assert cache.load("https://a/x") is None
+    assert fetch_bodies(["https://a/x"], lambda url: "nowa treść", cache_dir=str(tmp_path), miss_ttl=60) == {
+        "https://a/x": "nowa treść"
+    }
@@ -0,0 +1,87 @@
+import re
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime
+from urllib.parse import parse_qs, urlsplit
+
+import yaml
+
+from ingestion.backfill_googlenews import backfill_google_news
+
+ARTICLES_PER_DAY = 2
+BROKEN_DAY = "2025-01-12"
+
+
+def _feed(start: date, end: date) -> bytes:
+    items = []
+    day = start
+    while day < end:
+        published = format_datetime(datetime(day.year, day.month, day.day, 12, tzinfo=timezone.utc))
+        for k in range(ARTICLES_PER_DAY):
+            items.append(
+                f"<item><title>PKO {day.isoformat()} news {k}</title>"
+                f"<link>https://example.com/{day.isoformat()}/{k}</link><pubDate>{published}</pubDate></item>"
+            )
+        day += timedelta(days=1)
+    return f"<rss><channel>{''.join(items)}</channel></rss>".encode()
+
+
+def _window(url: str) -> tuple[str, str]:
+    """(after, before) z zapytania q=... after:RRRR-MM-DD before:RRRR-MM-DD."""
+    query = parse_qs(urlsplit(url).query)["q"][0]
+    return re.search(r"after:(\S+)", query).group(1), re.search(r"before:(\S+)", query).group(1)
+
+
+def _config(tmp_path, base_url: str) -> str:
+    config = {
+        "tickers": [{"symbol": "PKO.WA", "name": "PKO BP", "keywords": ["PKO BP"]}],
+        "sources": {"google_news": {"base_url": base_url}},
+        "ingestion": {
+            "request_delay": 0,
+            "backfill": {
+                "window_days": 4, "min_window_days": 1, "item_cap": 3, "max_workers": 2,
+                "checkpoint": str(tmp_path / "checkpoint.jsonl"),
+            },
+        },
+        "http": {"retries": 0, "timeout": 5, "cache_enabled": False},
+    }
+    path = tmp_path / "config.yaml"
+    path.write_text(yaml.safe_dump(config))
+    return str(path)
+
+
+def test_split_on_item_cap_and_resume_from_checkpoint(stub_server, tmp_path):
+    broken = {"active": True}
+
+    def handler(request):
+        start, end = _window(request.path)
+        if broken["active"] and start == BROKEN_DAY and end == "2025-01-13":
+            return 200, {}, b""  # pusty / uszkodzony feed — błąd parsera, nie sieci
+        return 200, {}, _feed(date.fromisoformat(start), date.fromisoformat(end))
+
+    stub_server.route("/rss/search", handler)
+    config_path = _config(tmp_path, f"{stub_server.url}/rss/search")
+    end = date(2025, 1, 17)
+
+    first = backfill_google_news(days_back=8, config_path=config_path, end=end)
+
+    windows = [_window(r["url"]) for r in stub_server.requests]
+    lengths = {(date.fromisoformat(b) - date.fromisoformat(a)).days for a, b in windows}
+    assert lengths == {4, 2, 1}  # 4 dni = 8 pozycji ≥ cap → 2 dni = 4 ≥ cap → 1 dzień = 2 < cap
+    days = sorted({t.split()[1] for t in first["title"]})
+    assert BROKEN_DAY not in days
+    assert len(first) == ARTICLES_PER_DAY * len(days)
+
+    # Wznowienie: tylko okno, które poprzednio się nie udało
+    broken["active"] = False
+    stub_server.requests.clear()
+    second = backfill_google_news(days_back=8, config_path=config_path, end=end)
+
+    assert [_window(r["url"]) for r in stub_server.requests] == [(BROKEN_DAY, "2025-01-13")]
+    assert len(second) == len(first) + ARTICLES_PER_DAY
+    assert BROKEN_DAY in {t.split()[1] for t in second["title"]}
+
+    # Wszystko w checkpoincie — kolejne uruchomienie nie wysyła żądań
+    stub_server.requests.clear()
+    third = backfill_google_news(days_back=8, config_path=config_path, end=end)
+    assert stub_server.requests == []
+    assert len(third) == len(second)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from econometrics.cross_correlation import correlation_bounds, lagged_correlations
+
+MAX_LAG = 3
+
+
+def _matrices() -> tuple[np.ndarray, np.ndarray]:
+    """Sentyment i stopy zwrotu (80 dni × 3 spółki) z brakami w różnych miejscach."""
+    rng = np.random.default_rng(3)
+    x = rng.normal(size=(80, 3))
+    y = 0.3 * np.roll(x, 1, axis=0) + rng.normal(size=(80, 3))
+    x[rng.random(x.shape) < 0.15] = np.nan
+    y[rng.random(y.shape) < 0.1] = np.nan
+    x[:20, 2] = np.nan  # spółka notowana później
+    return x, y
+
+
+def _pandas_reference(x: np.ndarray, y: np.ndarray, k: int, i: int, j: int) -> tuple[float, int]:
+    shifted, target = pd.Series(x[:, i]).shift(k), pd.Series(y[:, j])
+    return target.corr(shifted), int((shifted.notna() & target.notna()).sum())
+
+
+def test_lagged_correlations_match_pandas():
+    x, y = _matrices()
+
+    r, n = lagged_correlations(x, y, MAX_LAG)
+    r_cross, n_cross = lagged_correlations(x, y, MAX_LAG, cross=True)
+
+    assert r.shape == n.shape == (MAX_LAG + 1, 3)
+    assert r_cross.shape == n_cross.shape == (MAX_LAG + 1, 3, 3)
+    for k in range(MAX_LAG + 1):
+        for i in range(3):
+            expected_r, expected_n = _pandas_reference(x, y, k, i, i)
+            np.testing.assert_allclose(r[k, i], expected_r, atol=1e-12)
+            assert n[k, i] == expected_n
+            for j in range(3):
+                expected_r, expected_n = _pandas_reference(x, y, k, i, j)
+                np.testing.assert_allclose(r_cross[k, i, j], expected_r, atol=1e-12)
+                assert n_cross[k, i, j] == expected_n
+
+
+def test_correlation_bounds_fisher_z():
+    r, n = np.array([0.5, -0.2, 0.0, 0.4]), np.array([28, 103, 50, 3])
+
+    lower, upper, p_value = correlation_bounds(r, n, confidence=0.95)
+
+    half = stats.norm.ppf(0.975) / np.sqrt(n[:3] - 3)
+    np.testing.assert_allclose(lower[:3], np.tanh(np.arctanh(r[:3]) - half))
+    np.testing.assert_allclose(upper[:3], np.tanh(np.arctanh(r[:3]) + half))
+    np.testing.assert_allclose([lower[0], upper[0]], [0.1560, 0.7358], atol=1e-4)
+    assert lower[2] == -upper[2]
+    # n = 3: przedział nieokreślony (n - 3 = 0), p-value jeszcze tak
+    assert np.isnan(lower[3]) and np.isnan(upper[3]) and not np.isnan(p_value[3])
+
+    # p-value jak w teście pearsonr na tych samych danych
+    rng = np.random.default_rng(5)
+    a = rng.normal(size=40)
+    b = 0.4 * a + rng.normal(size=40)
+    expected = stats.pearsonr(a, b)
+    _, _, p = correlation_bounds(np.array([expected.statistic]), np.array([40]))
+    np.testing.assert_allclose(p[0], expected.pvalue, rtol=1e-8)
@@ -0,0 +1,72 @@
+import io
+import types
+from datetime import datetime
+
+from ingestion.feed_parser import fetch_feed, iter_feed
+
+RSS2 = b"""<?xml version="1.0"?><rss version="2.0"><channel>
+<item><title>PKO BP podnosi prognoze</title><link>https://example.com/1</link>
+<pubDate>Mon, 06 Jan 2025 10:00:00 +0100</pubDate><source url="https://bankier.pl">Bankier.pl</source></item>
+<item><title>Stary news</title><link>https://example.com/2</link>
+<pubDate>Mon, 01 Jan 2024 10:00:00 +0100</pubDate></item>
+</channel></rss>"""
+
+RDF = b"""<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns="http://purl.org/rss/1.0/" xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel><title>kanal</title></channel>
+<item><title>KGHM zwieksza wydobycie</title><link>https://example.com/rdf</link>
+<dc:date>2025-01-06T10:00:00Z</dc:date></item>
+</rdf:RDF>"""
+
+ATOM = b"""<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom">
+<entry><title>Orlen wyniki</title><link rel="alternate" href="https://example.com/atom"/>
+<updated>2025-01-06T10:00:00Z</updated></entry>
+</feed>"""
+
+
+def test_rss2_with_cutoff():
+    articles = list(iter_feed(io.BytesIO(RSS2), cutoff=datetime(2024, 6, 1)))
+    assert [a.title for a in articles] == ["PKO BP podnosi prognoze"]
+    assert articles[0].url == "https://example.com/1"
+    assert articles[0].source == "Bankier.pl"
+
+
+def test_rss1_rdf_namespaced_items():
+    (article,) = iter_feed(io.BytesIO(RDF))
+    assert article.title == "KGHM zwieksza wydobycie"
+    assert article.url == "https://example.com/rdf"
+    assert article.published_at.year == 2025
+
+
+def test_atom_entry():
+    (article,) = iter_feed(io.BytesIO(ATOM))
+    assert (article.title, article.url) == ("Orlen wyniki", "https://example.com/atom")
+
+
+class _FakeResponse:
+    def __init__(self, payload: bytes):
+        self.raw = io.BytesIO(payload)
+        self.closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.closed = True
+
+
+def test_fetch_feed_is_lazy():
+    response = _FakeResponse(RSS2)
+    calls = []
+    client = types.SimpleNamespace(get=lambda url, stream: calls.append(url) or response)
+
+    articles = fetch_feed("https://example.com/feed", client=client)
+    assert calls == []  # żądanie dopiero przy pierwszym next()
+    first = next(articles)
+    assert first.title == "PKO BP podnosi prognoze" and not response.closed
+    assert list(articles)[-1].title == "Stary news"
+    assert response.closed
@@ -0,0 +1,116 @@
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+from statsmodels.tsa.arima.model import ARIMA
+
+from econometrics.arimax_model import model_path_for, save_model_meta
+from econometrics.forecast_server import build_server
+
+TICKER = "LPP.WA"
+
+
+def _save_model(models_dir) -> None:
+    """Mały ARIMAX(1,0,0) na danych syntetycznych — zapisany jak przez run_arimax."""
+    rng = np.random.default_rng(0)
+    exog = rng.normal(size=120)
+    y = 0.5 * exog + rng.normal(scale=0.1, size=120)
+    path = model_path_for(str(models_dir), TICKER)
+    ARIMA(pd.Series(y), exog=exog.reshape(-1, 1), order=(1, 0, 0)).fit().save(path)
+    save_model_meta(path, {
+        "ticker": TICKER, "order": [1, 0, 0], "return_col": "log_return",
+        "exog_column": "sentiment_lag1", "last_date": "2025-06-30", "n_obs": 120,
+    })
+
+
+@pytest.fixture
+def forecast_server(tmp_path):
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    _save_model(models_dir)
+    config = {
+        "paths": {"arimax_models": str(models_dir)},
+        "forecast_server": {"host": "127.0.0.1", "port": 0, "persist_updates": True},
+    }
+    server = build_server(config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_forecast_returns_interval(forecast_server):
+    response = requests.get(f"{forecast_server.url}/forecast", params={"ticker": TICKER, "exog": 0.3, "alpha": 0.1})
+
+    assert response.status_code == 200
+    payload = response.json()
+    assert payload["lower"] < payload["forecast"] < payload["upper"]
+    assert payload["exog_column"] == "sentiment_lag1" and payload["alpha"] == 0.1
+
+
+def test_update_appends_and_persists(forecast_server, tmp_path):
+    response = requests.post(
+        f"{forecast_server.url}/update", json={"ticker": TICKER, "value": 0.01, "exog": 0.2, "date": "2025-07-01"},
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"ticker": TICKER, "n_obs": 121, "last_date": "2025-07-01"}
+    meta = json.loads((tmp_path / "models" / f"{TICKER}.json").read_text())
+    assert meta["n_obs"] == 121
+
+
+@pytest.mark.parametrize("params", [
+    {"ticker": TICKER, "exog": "nan"},
+    {"ticker": TICKER, "exog": "inf"},
+    {"ticker": TICKER, "exog": "abc"},
+    {"ticker": TICKER, "exog": 0.3, "alpha": 2},
+    {"ticker": TICKER, "exog": 0.3, "alpha": 0},
+    {"ticker": TICKER},
+])
+def test_forecast_rejects_invalid_parameters(forecast_server, params):
+    response = requests.get(f"{forecast_server.url}/forecast", params=params)
+
+    assert response.status_code == 400
+    assert "error" in response.json()
+
+
+@pytest.mark.parametrize("body", [
+    {"ticker": TICKER, "value": "nan", "exog": 0.2},
+    {"ticker": TICKER, "value": 0.01, "exog": "-inf"},
+    {"ticker": TICKER, "value": 0.01},
+    [TICKER, 0.01, 0.2],
+])
+def test_update_rejects_invalid_body(forecast_server, tmp_path, body):
+    response = requests.post(f"{forecast_server.url}/update", json=body)
+
+    assert response.status_code == 400
+    meta = json.loads((tmp_path / "models" / f"{TICKER}.json").read_text())
+    assert meta["n_obs"] == 120
+
+
+def test_update_rejects_bad_content_length(forecast_server):
+    response = requests.post(
+        f"{forecast_server.url}/update", data=b"{}", headers={"Content-Length": "abc"},
+    )
+
+    assert response.status_code == 400
+
+
+def test_unknown_ticker_and_store_errors(forecast_server):
+    assert requests.get(f"{forecast_server.url}/forecast", params={"ticker": "XYZ", "exog": 0}).status_code == 404
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("uszkodzony model")
+
+    store = forecast_server.RequestHandlerClass.store
+    store.forecast = store.update = broken
+    forecast = requests.get(f"{forecast_server.url}/forecast", params={"ticker": TICKER, "exog": 0.3})
+    update = requests.post(f"{forecast_server.url}/update", json={"ticker": TICKER, "value": 0.01, "exog": 0.2})
+
+    assert forecast.status_code == update.status_code == 500
+    assert "uszkodzony model" in forecast.json()["error"]
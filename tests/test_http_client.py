@@ -0,0 +1,91 @@
+from ingestion.http_client import HttpClient
+
+
+def _client(tmp_path, **kwargs) -> HttpClient:
+    return HttpClient(retries=2, backoff_factor=0, cache_dir=str(tmp_path / "http"), **kwargs)
+
+
+def test_retry_on_503(stub_server, tmp_path):
+    responses = iter([(503, {}, b"busy"), (200, {}, b"ok")])
+    stub_server.route("/flaky", lambda request: next(responses))
+    client = _client(tmp_path)
+
+    response = client.get(f"{stub_server.url}/flaky")
+
+    assert response.status_code == 200 and response.text == "ok"
+    assert len(stub_server.hits("/flaky")) == 2
+    assert client.metrics.snapshot()[stub_server.url[7:]]["retries"] == 1
+
+
+def test_fresh_max_age_served_from_cache(stub_server, tmp_path):
+    stub_server.route("/feed", lambda request: (200, {"Cache-Control": "max-age=60"}, b"<rss>body</rss>"))
+    client = _client(tmp_path)
+
+    # Pierwsze pobranie strumieniowe — body trafia do cache w trakcie czytania
+    with client.get(f"{stub_server.url}/feed", stream=True) as response:
+        assert response.raw.read() == b"<rss>body</rss>"
+    with client.get(f"{stub_server.url}/feed", stream=True) as cached:
+        assert cached.from_cache
+        assert cached.raw.read() == b"<rss>body</rss>"
+    assert client.get(f"{stub_server.url}/feed").content == b"<rss>body</rss>"
+
+    assert len(stub_server.hits("/feed")) == 1
+
+
+def test_partially_read_stream_is_not_cached(stub_server, tmp_path):
+    stub_server.route("/big", lambda request: (200, {"Cache-Control": "max-age=60"}, b"x" * 10000))
+    client = _client(tmp_path)
+
+    with client.get(f"{stub_server.url}/big", stream=True) as response:
+        response.raw.read(100)
+    assert client.get(f"{stub_server.url}/big").content == b"x" * 10000
+
+    assert len(stub_server.hits("/big")) == 2
+
+
+def test_304_revalidation_refreshes_entry(stub_server, tmp_path):
+    def handler(request):
+        if request.headers.get("If-None-Match") == '"v1"':
+            return 304, {"ETag": '"v1"', "X-Revision": "2"}, b""
+        return 200, {"ETag": '"v1"', "Cache-Control": "no-cache", "X-Revision": "1"}, b"payload"
+
+    stub_server.route("/item", handler)
+    client = _client(tmp_path)
+
+    assert client.get(f"{stub_server.url}/item").content == b"payload"
+    revalidated = client.get(f"{stub_server.url}/item")
+
+    assert revalidated.from_cache and revalidated.content == b"payload"
+    assert stub_server.hits("/item")[1]["headers"]["If-None-Match"] == '"v1"'
+    entry = client.cache.load(f"{stub_server.url}/item", dict(client._session(stub_server.url[7:]).headers))
+    assert entry["headers"]["X-Revision"] == "2"
+    assert client.metrics.snapshot()[stub_server.url[7:]]["revalidated"] == 1
+
+
+def test_vary_mismatch_goes_to_network(stub_server, tmp_path):
+    stub_server.route(
+        "/vary",
+        lambda request: (200, {"Cache-Control": "max-age=60", "Vary": "Accept-Language"},
+                         request.headers["Accept-Language"].encode()),
+    )
+    polish = _client(tmp_path, headers={"Accept-Language": "pl"})
+    english = _client(tmp_path, headers={"Accept-Language": "en"})
+
+    assert polish.get(f"{stub_server.url}/vary").content == b"pl"
+    assert english.get(f"{stub_server.url}/vary").content == b"en"
+
+    assert len(stub_server.hits("/vary")) == 2
+
+
+def test_vary_header_names_are_case_insensitive(stub_server, tmp_path):
+    stub_server.route(
+        "/vary-case",
+        lambda request: (200, {"Cache-Control": "max-age=60", "vary": "accept-language"}, b"pl"),
+    )
+    first = _client(tmp_path, headers={"Accept-Language": "pl"})
+    second = _client(tmp_path, headers={"accept-language": "pl"})
+
+    assert first.get(f"{stub_server.url}/vary-case").content == b"pl"
+    assert second.get(f"{stub_server.url}/vary-case").from_cache
+
+    assert len(stub_server.hits("/vary-case")) == 1
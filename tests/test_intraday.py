@@ -0,0 +1,96 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from ingestion.intraday import BAR_COLUMNS, IntradayStore, event_window_returns, resample_bars
+
+
+def _bars(timestamps, closes=None) -> pd.DataFrame:
+    timestamps = pd.to_datetime(timestamps, utc=True)
+    closes = np.arange(1, len(timestamps) + 1, dtype=np.float64) if closes is None else np.asarray(closes, float)
+    return pd.DataFrame({
+        "timestamp": timestamps,
+        "Open": closes - 0.5,
+        "High": closes + 1.0,
+        "Low": closes - 1.0,
+        "Close": closes,
+        "Volume": np.arange(10, 10 * (len(timestamps) + 1), 10),
+    })
+
+
+def _arrays(frame: pd.DataFrame) -> dict[str, np.ndarray]:
+    return {
+        "ts": pd.DatetimeIndex(frame["timestamp"]).asi8,
+        **{c: frame[c].to_numpy(np.int64 if c == "Volume" else np.float64) for c in BAR_COLUMNS},
+    }
+
+
+def test_store_round_trip_across_month_partitions(tmp_path):
+    store = IntradayStore(str(tmp_path), "5m")
+    first = _bars(["2025-01-31 23:50", "2025-01-31 23:55", "2025-02-01 00:00"])
+    assert store.write("PKO.WA", first) == 2
+
+    # Nadpisanie znacznika z 23:55, nowy słupek w lutym i pominięty słupek bez Close
+    update = _bars(["2025-01-31 23:55", "2025-02-01 00:05", "2025-02-01 00:10"], closes=[7.0, 8.0, np.nan])
+    store.write("PKO.WA", update)
+
+    assert [os.path.basename(p) for p in store.partitions("PKO.WA")] == ["2025-01.npz", "2025-02.npz"]
+    bars = store.read("PKO.WA")
+    assert pd.to_datetime(bars["ts"], utc=True).strftime("%m-%d %H:%M").tolist() == [
+        "01-31 23:50", "01-31 23:55", "02-01 00:00", "02-01 00:05",
+    ]
+    assert bars["Close"].tolist() == [1.0, 7.0, 3.0, 8.0]
+    assert bars["Close"].dtype == np.float32 and bars["Volume"].dtype == np.int64
+
+    # Zakres [start, end) — tylko luty, koniec wyłączny
+    february = store.read("PKO.WA", start="2025-02-01", end="2025-02-01 00:05")
+    assert february["Close"].tolist() == [3.0]
+    assert len(store.read("OTHER.WA")["ts"]) == 0
+
+
+def test_resample_partial_buckets_and_empty_months():
+    # Pierwszy kubełek 15 min zaczyna się od 09:10 (niepełny), ostatni ma jeden słupek;
+    # luty bez notowań — brak pustych kubełków w wyniku
+    timestamps = (
+        list(pd.date_range("2025-01-30 09:10", "2025-01-30 09:45", freq="5min"))
+        + list(pd.date_range("2025-03-03 09:00", "2025-03-03 09:10", freq="5min"))
+    )
+    frame = _bars(timestamps)
+
+    result = resample_bars(_arrays(frame), "15min")
+
+    expected = (
+        frame.set_index("timestamp")
+        .resample("15min")
+        .agg({"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"})
+        .dropna(subset=["Close"])
+    )
+    assert pd.to_datetime(result["ts"], utc=True).equals(expected.index)
+    for column in BAR_COLUMNS:
+        np.testing.assert_array_equal(result[column], expected[column].to_numpy())
+    assert result["Close"][0] == 1.0 and result["Volume"][0] == 10  # 09:00 ← tylko słupek 09:10
+
+    daily = resample_bars(_arrays(frame), "1D")
+    assert pd.to_datetime(daily["ts"], utc=True).strftime("%Y-%m-%d").tolist() == ["2025-01-30", "2025-03-03"]
+
+
+def test_event_window_returns_as_of_edges():
+    # Słupki 5m 09:00..09:55 → znane w chwilach zamknięcia 09:05..10:00
+    frame = _bars(pd.date_range("2025-01-06 09:00", "2025-01-06 09:55", freq="5min"))
+    bars = _arrays(frame)
+    minute = pd.Timedelta("1min").value
+    offsets = np.array([-5, 0, 2, 55, 60]) * minute
+    events = pd.to_datetime(["2025-01-06 09:05", "2025-01-06 09:07", "2025-01-06 09:04"], utc=True).asi8
+
+    result = event_window_returns(bars, "5min", events, offsets)
+
+    log_close = np.log(frame["Close"].to_numpy())
+    # 09:05: słupek 09:00 zamknięty dokładnie w chwili zdarzenia; -5 min → nic jeszcze nie zamknięte;
+    # +55 min = 10:00 — ostatnie zamknięcie; +60 min → po ostatnim słupku
+    np.testing.assert_allclose(result[0, 1:4], [0.0, 0.0, log_close[11] - log_close[0]])
+    assert np.isnan(result[0, 0]) and np.isnan(result[0, 4])
+    # 09:07: as-of nadal słupek 09:00; +2 min = 09:09 → wciąż 09:00 (09:05 zamyka się o 09:10)
+    np.testing.assert_allclose(result[1, :3], [np.nan, 0.0, 0.0])
+    # 09:04: przed pierwszym zamknięciem — cały wiersz NaN
+    assert np.isnan(result[2]).all()
@@ -0,0 +1,53 @@
+import warnings
+
+import numpy as np
+from statsmodels.tsa.stattools import grangercausalitytests
+
+from econometrics import rolling_granger
+from econometrics.rolling_granger import rolling_granger_lag
+
+WINDOW = 40
+LAG = 2
+
+
+def _series() -> tuple[np.ndarray, np.ndarray]:
+    """Stopy zwrotu zależne od sentymentu; sentyment stały (dni bez newsów) na sesjach 60–129."""
+    rng = np.random.default_rng(7)
+    x = rng.normal(size=220)
+    x[60:130] = 0.0
+    y = np.empty_like(x)
+    y[0] = rng.normal()
+    for t in range(1, len(x)):
+        y[t] = 0.2 * y[t - 1] + 0.4 * x[t - 1] + rng.normal(scale=0.5)
+    return y, x
+
+
+def _reference(y: np.ndarray, x: np.ndarray, j: int) -> tuple[float, float]:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        result = grangercausalitytests(np.column_stack([y[j:j + WINDOW], x[j:j + WINDOW]]), [LAG], verbose=False)
+    f_stat, p_value, _, _ = result[LAG][0]["ssr_ftest"]
+    return f_stat, p_value
+
+
+def test_matches_grangercausalitytests_around_constant_segment(monkeypatch):
+    y, x = _series()
+    refits = []
+    refit = rolling_granger.RecursiveOLS.refit
+    monkeypatch.setattr(rolling_granger.RecursiveOLS, "refit",
+                        lambda self, X, target: refits.append(refit(self, X, target)) or refits[-1])
+
+    f_stat, p_value = rolling_granger_lag(y, x, LAG, WINDOW, refresh_every=25)
+
+    # Kolumna lagu k w oknie j to x[j + LAG - k : j + WINDOW - k] — okno osobliwe, gdy któraś jest stała
+    singular = np.array([
+        any(np.ptp(x[j + LAG - k:j + WINDOW - k]) == 0 for k in range(1, LAG + 1)) for j in range(len(f_stat))
+    ])
+    assert singular.sum() > 0
+    assert np.isnan(f_stat[singular]).all() and np.isnan(p_value[singular]).all()
+    for j in np.flatnonzero(~singular):
+        expected_f, expected_p = _reference(y, x, j)
+        np.testing.assert_allclose([f_stat[j], p_value[j]], [expected_f, expected_p], rtol=1e-6, atol=1e-10)
+
+    # Okna ze stałym sentymentem są pomijane bez nieudanych prób dokładnego dopasowania
+    assert refits and all(refits)
@@ -0,0 +1,19 @@
+import pytest
+
+pytest.importorskip("vaderSentiment")
+
+from processing.sentiment_finbert import run_lexicon
+
+
+def test_headline_without_lexicon_hits_is_not_confident():
+    results = run_lexicon([
+        "PKO BP: zarząd rekomenduje wypłatę dywidendy",
+        "CD Projekt to release Witcher 4 trailer",
+    ])
+    assert [r["label"] for r in results] == ["neutral", "neutral"]
+    assert all(r["score"] == 0.0 for r in results)
+
+
+def test_clear_signal_is_confident():
+    (result,) = run_lexicon(["Orlen shares surge after record profit"])
+    assert result["label"] == "positive" and result["score"] > 0.6
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from processing.sentiment_index import decayed_index
+from processing.sentiment_levels import aggregate_levels
+
+
+def _articles() -> pd.DataFrame:
+    return pd.DataFrame({
+        "published_at": pd.to_datetime(["2025-01-06 09:00", "2025-01-06 12:00", "2025-01-06 15:00"], utc=True),
+        "ticker_mentioned": ["PKO.WA"] * 3,
+        "sentiment_score": [0.9, 0.1, 0.2],
+        "sentiment_label": ["positive", "positive", "positive"],
+    })
+
+
+def test_sentiment_sum_is_raw_sum_for_median():
+    daily = aggregate_levels(_articles(), {}, method="median")["ticker"]
+    assert daily["sentiment_mean"].iloc[0] == 0.2
+    assert np.isclose(daily["sentiment_sum"].iloc[0], 1.2)
+
+
+def test_decayed_index_independent_of_aggregation():
+    frames = [
+        aggregate_levels(_articles(), {}, method=method)["ticker"].rename(columns={"ticker_mentioned": "ticker"})
+        for method in ("mean", "median")
+    ]
+    mean_index, median_index = (decayed_index(f, [5]) for f in frames)
+    assert np.isclose(median_index["sentiment_idx_5d"].iloc[0], 0.4)
+    pd.testing.assert_frame_equal(mean_index, median_index)
+
+
+def test_articles_without_date_are_dropped():
+    articles = pd.concat([_articles(), pd.DataFrame({
+        "published_at": pd.Series([pd.NaT, pd.NaT], dtype="datetime64[ns, UTC]"),
+        "ticker_mentioned": ["PKO.WA", None],
+        "sentiment_score": [-0.8, -0.5],
+        "sentiment_label": ["negative", "negative"],
+    })], ignore_index=True)
+
+    for method in ("mean", "median"):
+        levels = aggregate_levels(articles, {"PKO.WA": "banki"}, method=method)
+        for frame in levels.values():
+            assert frame["date"].notna().all()
+            assert frame["article_count"].tolist() == [3]
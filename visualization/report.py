@@ -0,0 +1,580 @@
+"""
+Raport: wykresy z tabel wyników + odświeżenie docs/index.html bez notebooków.
+
+- każdy wykres to zadanie (rodzaj, plik, dane, parametry) renderowane w puli procesów,
+- odcisk SHA-256 danych i parametrów zadania trafia do manifestu; wykres
+  z niezmienionym odciskiem i istniejącym plikiem jest pomijany,
+- PNG lądują w paths.plots i są kopiowane do <paths.docs>/img,
+- w docs/index.html między znacznikami REPORT:START/END trafia stały zestaw
+  wyróżnionych wykresów (Granger, heatmapa korelacji, RMSE i prognoza ARIMAX
+  dla spółki z największą poprawą), a pozostałe — między REPORT:MORE:START/END
+  (zwijana sekcja); brak drugiej pary znaczników = pozostałe nie są publikowane.
+
+Użycie: python -m visualization.report [--force]
+"""
+import argparse
+import ast
+import hashlib
+import html
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+import yaml
+from loguru import logger
+
+from econometrics.cross_correlation import cross_correlation_table, own_correlation_matrix
+from econometrics.granger_causality import primary_rows, return_column
+from ingestion.schema import apply_daily_sentiment_schema, apply_news_schema
+from processing.panel_store import open_panel
+
+# Zmiana wyglądu wykresów (kod rendererów) → podbić, żeby wymusić ponowny render
+PLOT_VERSION = 1
+MANIFEST_FILE = "report_manifest.json"
+REPORT_START = "<!-- REPORT:START -->"
+REPORT_END = "<!-- REPORT:END -->"
+MORE_START = "<!-- REPORT:MORE:START -->"
+MORE_END = "<!-- REPORT:MORE:END -->"
+
+# Kolejność wykresów na stronie (sekcja wyników)
+PAGE_ORDER = [
+    "granger", "correlation_heatmap", "rmse_comparison", "arimax_forecast",
+    "price_sentiment", "news_overview", "sentiment_dist",
+]
+
+POSITIVE = "#27ae60"
+NEGATIVE = "#e74c3c"
+
+
+def load_config(path: str = "config.yaml") -> dict:
+    with open(path) as f:
+        return yaml.safe_load(f)
+
+
+@dataclass
+class PlotJob:
+    """Jeden wykres: renderer, plik wynikowy, dane (DataFrame'y) i parametry."""
+    kind: str
+    filename: str
+    caption: str
+    data: dict = field(default_factory=dict)
+    params: dict = field(default_factory=dict)
+    # Wykres z głównego rzędu wyników na stronie (nie wchodzi do odcisku)
+    featured: bool = False
+
+    def fingerprint(self) -> str:
+        h = hashlib.sha256()
+        h.update(json.dumps([PLOT_VERSION, self.kind, self.params], sort_keys=True, default=str).encode("utf-8"))
+        for name in sorted(self.data):
+            df = self.data[name]
+            h.update(name.encode("utf-8"))
+            h.update(",".join(map(str, df.columns)).encode("utf-8"))
+            h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+        return h.hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Renderery (uruchamiane w procesach roboczych)
+# ---------------------------------------------------------------------------
+
+def _init_style() -> None:
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.rcParams["figure.figsize"] = (14, 5)
+    plt.rcParams["font.size"] = 11
+    plt.rcParams["axes.spines.top"] = False
+    plt.rcParams["axes.spines.right"] = False
+    sns.set_palette("husl")
+
+
+def _plot_news_overview(fig_path: str, data: dict, params: dict) -> None:
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    news = data["news"]
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+    panels = [
+        (news["ticker_mentioned"].value_counts().head(10), "husl", "Liczba artykułów per spółka"),
+        (news["source"].value_counts().head(10), "coolwarm", "Artykuły wg źródła"),
+    ]
+    for ax, (counts, palette, title) in zip(axes, panels):
+        counts = counts[counts > 0]
+        ax.barh(counts.index.astype(str), counts.values, color=sns.color_palette(palette, len(counts)))
+        ax.set_title(title, fontweight="bold")
+        ax.set_xlabel("Liczba artykułów")
+        for i, v in enumerate(counts.values):
+            ax.text(v + 0.3, i, str(v), va="center")
+    _save(fig, fig_path, params)
+
+
+def _plot_sentiment_dist(fig_path: str, data: dict, params: dict) -> None:
+    import matplotlib.pyplot as plt
+
+    sentiment = data["sentiment"]
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+
+    by_ticker = sentiment.groupby("ticker", observed=True)["sentiment_mean"].mean().sort_values()
+    colors = [NEGATIVE if v < 0 else "#2ecc71" for v in by_ticker.values]
+    axes[0].barh(by_ticker.index.astype(str), by_ticker.values, color=colors)
+    axes[0].axvline(x=0, color="gray", linestyle="--", linewidth=0.8)
+    axes[0].set_title("Średni sentyment per spółka (FinBERT)", fontweight="bold")
+    axes[0].set_xlabel("Sentyment (negatywny ← 0 → pozytywny)")
+
+    values = sentiment["sentiment_mean"].dropna()
+    axes[1].hist(values[values < 0], bins=20, color=NEGATIVE, alpha=0.7, label="Negatywny")
+    axes[1].hist(values[values == 0], bins=5, color="#95a5a6", alpha=0.7, label="Neutralny")
+    axes[1].hist(values[values > 0], bins=20, color="#2ecc71", alpha=0.7, label="Pozytywny")
+    axes[1].set_title("Rozkład sentymentu (wszystkie spółki)", fontweight="bold")
+    axes[1].set_xlabel("Wartość sentymentu")
+    axes[1].set_ylabel("Liczba obserwacji (dni)")
+    axes[1].legend()
+    _save(fig, fig_path, params)
+
+
+def _sentiment_bars(ax, df: pd.DataFrame, alpha: float = 0.8) -> None:
+    pos = df["sentiment_mean"] >= 0
+    ax.bar(df["date"][pos], df["sentiment_mean"][pos], color=POSITIVE, alpha=alpha, width=1, label="Pozytywny")
+    ax.bar(df["date"][~pos], df["sentiment_mean"][~pos], color=NEGATIVE, alpha=alpha, width=1, label="Negatywny")
+
+
+def _plot_price_sentiment(fig_path: str, data: dict, params: dict) -> None:
+    import matplotlib.dates as mdates
+    import matplotlib.pyplot as plt
+
+    df = data["panel"]
+    color = "#2c3e50"
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 7), sharex=True, gridspec_kw={"height_ratios": [2, 1]})
+
+    ax1.plot(df["date"], df["Close"], color=color, linewidth=2, label="Cena zamknięcia")
+    ax1.fill_between(df["date"], df["Close"].min(), df["Close"], alpha=0.1, color=color)
+    ax1.set_ylabel("Cena (PLN)", fontweight="bold")
+    ax1.set_title(f"{params['ticker']} — Cena vs Sentyment Medialny", fontsize=14, fontweight="bold")
+    ax1.legend(loc="upper left")
+    ax1.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f"{x:.1f} PLN"))
+
+    _sentiment_bars(ax2, df)
+    ax2.axhline(y=0, color="gray", linestyle="-", linewidth=0.5)
+    ax2.set_ylabel("Sentyment", fontweight="bold")
+    ax2.set_xlabel("Data", fontweight="bold")
+    ax2.legend(loc="upper left")
+    ax2.xaxis.set_major_formatter(mdates.DateFormatter("%b %Y"))
+    ax2.xaxis.set_major_locator(mdates.MonthLocator())
+    plt.setp(ax2.get_xticklabels(), rotation=30)
+    _save(fig, fig_path, params)
+
+
+def _plot_correlation_heatmap(fig_path: str, data: dict, params: dict) -> None:
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    sns.heatmap(
+        data["corr"], annot=True, fmt=".2f", cmap="RdYlGn", center=0, vmin=-0.5, vmax=0.5,
+        linewidths=0.5, linecolor="white", ax=ax, cbar_kws={"label": "Korelacja Pearsona"},
+    )
+    ax.set_title("Korelacja: Stopa Zwrotu vs Sentyment z Opóźnieniem", fontsize=13, fontweight="bold", pad=15)
+    ax.set_xlabel("Opóźnienie sentymentu", fontweight="bold")
+    ax.set_ylabel("Spółka", fontweight="bold")
+    _save(fig, fig_path, params)
+
+
+def _plot_granger(fig_path: str, data: dict, params: dict) -> None:
+    import matplotlib.pyplot as plt
+
+    granger = data["granger"]
+    fig, axes = plt.subplots(1, 2, figsize=(14, 5))
+
+    for ticker, df_t in granger.groupby("ticker", sort=False):
+        axes[0].scatter(
+            df_t["lag_days"], [ticker] * len(df_t),
+            s=-np.log10(df_t["p_value"].clip(1e-10)) * 20,
+            c=[NEGATIVE if s else "#bdc3c7" for s in df_t["significant"]],
+            alpha=0.8, zorder=3,
+        )
+    axes[0].axvline(x=5, color="gray", linestyle="--", linewidth=0.8, alpha=0.5)
+    axes[0].set_xlabel("Opóźnienie (dni sesyjne)", fontweight="bold")
+    axes[0].set_title(
+        "Test Grangera: Istotność per Spółka i Lag\n(rozmiar = -log10(p), czerwony = istotny p<0.05)",
+        fontweight="bold", fontsize=10,
+    )
+    axes[0].grid(True, alpha=0.3)
+    axes[0].set_xticks(range(1, int(granger["lag_days"].max()) + 1))
+
+    sig_count = granger[granger["significant"]].groupby("ticker").size().sort_values()
+    if not sig_count.empty:
+        colors = ["#e74c3c" if v >= 5 else "#e67e22" if v >= 3 else "#f1c40f" for v in sig_count.values]
+        axes[1].barh(sig_count.index, sig_count.values, color=colors)
+        axes[1].set_xlabel("Liczba istotnych opóźnień", fontweight="bold")
+        axes[1].set_title("Liczba Istotnych Lagów per Spółka\n(więcej = silniejszy sygnał)", fontweight="bold", fontsize=10)
+        axes[1].axvline(x=5, color="gray", linestyle="--", linewidth=0.8, alpha=0.5)
+        for i, v in enumerate(sig_count.values):
+            axes[1].text(v + 0.1, i, str(v), va="center", fontweight="bold")
+    else:
+        axes[1].text(0.5, 0.5, "Brak istotnych wyników", ha="center", va="center",
+                     transform=axes[1].transAxes, fontsize=12)
+    _save(fig, fig_path, params)
+
+
+def _plot_arimax_forecast(fig_path: str, data: dict, params: dict) -> None:
+    import matplotlib.pyplot as plt
+    from statsmodels.tsa.arima.model import ARIMA
+
+    df = data["panel"]
+    ticker, return_col, lag_col = params["ticker"], params["return_col"], params["lag_col"]
+    order = tuple(params["order"])
+    split = params["n_train"]
+
+    # Ten sam podział i rząd co w econometrics.arimax_model
+    train_y, test_y = df[return_col].iloc[:split], df[return_col].iloc[split:]
+    train_x = df[lag_col].iloc[:split].values.reshape(-1, 1)
+    test_x = df[lag_col].iloc[split:].values.reshape(-1, 1)
+    test_dates = df["date"].iloc[split:]
+    arima_pred = ARIMA(train_y, order=order).fit().forecast(steps=len(test_y))
+    arimax_pred = ARIMA(train_y, exog=train_x, order=order).fit().forecast(steps=len(test_y), exog=test_x)
+
+    fig, axes = plt.subplots(2, 1, figsize=(14, 8), sharex=True, gridspec_kw={"height_ratios": [2, 1]})
+    ax = axes[0]
+    ax.axvspan(df["date"].iloc[0], df["date"].iloc[split - 1], alpha=0.08, color="gray", label="Okres treningu (80%)")
+    ax.plot(df["date"], df[return_col], color="#2c3e50", linewidth=1.2, alpha=0.7, label="Rzeczywiste zwroty", zorder=3)
+    ax.plot(test_dates.values, np.asarray(arima_pred), color=NEGATIVE, linewidth=2, linestyle="--",
+            label=f"ARIMA{order} — RMSE={params['arima_rmse']:.5f}", zorder=4)
+    ax.plot(test_dates.values, np.asarray(arimax_pred), color=POSITIVE, linewidth=2,
+            label=f"ARIMAX + sentyment — RMSE={params['arimax_rmse']:.5f} ({params['improvement']:+.1f}%)", zorder=5)
+    ax.axvline(x=df["date"].iloc[split], color="gray", linestyle=":", linewidth=1.5)
+    ax.axhline(y=0, color="black", linewidth=0.5, alpha=0.3)
+    ax.set_ylabel("Dzienna stopa zwrotu", fontweight="bold")
+    ax.set_title(
+        f"{ticker} — ARIMA vs ARIMAX: Prognoza Stóp Zwrotu\n"
+        f"Sentyment mediów (lag={params['lag']}) — zmiana RMSE {params['improvement']:+.1f}% "
+        f"(p={params['pvalue']:.4f})",
+        fontsize=12, fontweight="bold",
+    )
+    ax.legend(loc="upper left", fontsize=9)
+    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f"{x:.2%}"))
+
+    ax2 = axes[1]
+    _sentiment_bars(ax2, df, alpha=0.7)
+    ax2.axhline(y=0, color="black", linewidth=0.5)
+    ax2.axvline(x=df["date"].iloc[split], color="gray", linestyle=":", linewidth=1.5)
+    ax2.set_ylabel("Sentyment", fontweight="bold")
+    ax2.set_xlabel("Data", fontweight="bold")
+    ax2.set_title("Sentyment mediów finansowych (zmienna egzogenna X)", fontsize=10)
+    _save(fig, fig_path, params)
+
+
+def _plot_rmse_comparison(fig_path: str, data: dict, params: dict) -> None:
+    import matplotlib.pyplot as plt
+
+    rmses = [params["arima_rmse"], params["arimax_rmse"]]
+    fig, ax = plt.subplots(figsize=(8, 5))
+    bars = ax.bar(["ARIMA\n(tylko historia cen)", "ARIMAX\n(cena + sentyment)"], rmses,
+                  color=[NEGATIVE, POSITIVE], width=0.4, edgecolor="white", linewidth=1.5)
+    for bar, val in zip(bars, rmses):
+        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() + 0.0001, f"{val:.5f}",
+                ha="center", va="bottom", fontweight="bold", fontsize=11)
+    color = POSITIVE if params["improvement"] >= 0 else NEGATIVE
+    ax.text(0.5, max(rmses) * 0.92, f"{-params['improvement']:+.1f}% RMSE", ha="center",
+            color=color, fontweight="bold", fontsize=12)
+    ax.set_ylabel("RMSE (niższe = lepsze)", fontweight="bold")
+    ax.set_title(f"{params['ticker']} — Porównanie Dokładności Prognoz", fontweight="bold")
+    ax.set_ylim(0, max(rmses) * 1.15)
+    ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f"{x:.4f}"))
+    _save(fig, fig_path, params)
+
+
+def _save(fig, fig_path: str, params: dict) -> None:
+    import matplotlib.pyplot as plt
+
+    fig.tight_layout()
+    tmp_path = f"{fig_path}.tmp.png"
+    fig.savefig(tmp_path, dpi=params.get("dpi", 150), bbox_inches="tight")
+    plt.close(fig)
+    os.replace(tmp_path, fig_path)
+
+
+RENDERERS = {
+    "news_overview": _plot_news_overview,
+    "sentiment_dist": _plot_sentiment_dist,
+    "price_sentiment": _plot_price_sentiment,
+    "correlation_heatmap": _plot_correlation_heatmap,
+    "granger": _plot_granger,
+    "arimax_forecast": _plot_arimax_forecast,
+    "rmse_comparison": _plot_rmse_comparison,
+}
+
+
+def render_job(job: PlotJob, plots_dir: str) -> str:
+    RENDERERS[job.kind](os.path.join(plots_dir, job.filename), job.data, job.params)
+    return job.filename
+
+
+# ---------------------------------------------------------------------------
+# Budowa listy zadań z tabel wyników
+# ---------------------------------------------------------------------------
+
+def correlation_table(config: dict, panel) -> pd.DataFrame:
+    """
+    Tabela korelacji krzyżowych: paths.cross_correlation, jeśli jest nowsza niż
+    merged CSV, inaczej liczona na bieżąco z panelu (ta sama funkcja co w ekonometrii).
+    """
+    path = config["paths"].get("cross_correlation")
+    if path and os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(config["paths"]["merged"]):
+        return pd.read_csv(path)
+    settings = config["econometrics"].get("cross_correlation", {})
+    return cross_correlation_table(
+        panel,
+        return_col=return_column(config),
+        max_lag=settings.get("max_lag", 6),
+        confidence=settings.get("confidence", 0.95),
+        alpha=config["econometrics"]["significance_level"],
+        min_obs=settings.get("min_obs", 10),
+    )
+
+
+def correlation_matrix(table: pd.DataFrame) -> pd.DataFrame:
+    """Korelacja Pearsona stopy zwrotu z własnym sentymentem opóźnionym o 1..K dni (spółka × "Lag k")."""
+    if table.empty:
+        return pd.DataFrame()
+    return own_correlation_matrix(table, lags=range(1, int(table["lag_days"].max()) + 1))
+
+
+def build_jobs(config: dict) -> list[PlotJob]:
+    paths = config["paths"]
+    return_col = return_column(config)
+    dpi = config.get("report", {}).get("dpi", 150)
+    jobs = []
+
+    if os.path.exists(paths["raw_news"]):
+        news = apply_news_schema(pd.read_csv(paths["raw_news"]), config)
+        jobs.append(PlotJob(
+            "news_overview", "plot_news_overview.png",
+            "Liczba artykułów per spółka i per źródło.",
+            data={"news": news[["ticker_mentioned", "source"]]}, params={"dpi": dpi},
+        ))
+
+    if os.path.exists(paths["sentiment_daily"]):
+        sentiment = pd.read_csv(paths["sentiment_daily"], parse_dates=["date"])
+        sentiment = apply_daily_sentiment_schema(sentiment.rename(columns={"ticker_mentioned": "ticker"}), config)
+        jobs.append(PlotJob(
+            "sentiment_dist", "plot_sentiment_dist.png",
+            "Średni dzienny sentyment per spółka i rozkład sentymentu.",
+            data={"sentiment": sentiment[["ticker", "sentiment_mean"]]}, params={"dpi": dpi},
+        ))
+
+    if os.path.exists(paths["granger_results"]):
+        granger = primary_rows(pd.read_csv(paths["granger_results"]))
+        jobs.append(PlotJob(
+            "granger", "plot_granger_results.png",
+            "Test Grangera — istotność per spółka i opóźnienie. "
+            "Rozmiar punktu = −log₁₀(p). Czerwony = p < 0.05.",
+            data={"granger": granger[["ticker", "lag_days", "p_value", "significant"]]}, params={"dpi": dpi},
+            featured=True,
+        ))
+
+    if not os.path.exists(paths["merged"]):
+        return sorted(jobs, key=lambda job: PAGE_ORDER.index(job.kind))
+    panel = open_panel(config)
+
+    corr = correlation_matrix(correlation_table(config, panel))
+    if not corr.empty:
+        strongest = corr.abs().stack().idxmax()
+        jobs.append(PlotJob(
+            "correlation_heatmap", "plot_correlation_heatmap.png",
+            f"Korelacja Pearsona: stopa zwrotu vs sentyment z opóźnieniem 1–{corr.shape[1]} dni. "
+            f"Najsilniejsza: {strongest[0]} ({corr.loc[strongest]:+.2f} przy {strongest[1].lower()}).",
+            data={"corr": corr}, params={"dpi": dpi}, featured=True,
+        ))
+
+    if os.path.exists(paths["arimax_results"]):
+        arimax = pd.read_csv(paths["arimax_results"])
+        featured = arimax.loc[arimax["rmse_improvement_pct"].idxmax(), "ticker"] if not arimax.empty else None
+        for row in arimax.itertuples(index=False):
+            base = row.ticker.split(".")[0]
+            # Ta sama próba co w run_arimax_for_ticker: wiersze z lagiem Grangera i wybraną egzogenną
+            base_col = f"sentiment_lag{int(row.best_sentiment_lag)}"
+            if base_col not in panel.columns:
+                base_col = "sentiment_lag1"
+            lag_col = getattr(row, "exog_column", None)
+            lag_col = lag_col if isinstance(lag_col, str) else base_col
+            shifted = lag_col not in panel.columns
+            source_col = lag_col[:-len("_lag1")] if shifted else lag_col
+            df_t = panel.frame(row.ticker, list(dict.fromkeys(["date", return_col, "sentiment_mean", base_col, source_col])))
+            if shifted:
+                # Indeks sentymentu opóźniony o sesję
+                df_t[lag_col] = df_t[source_col].shift(1)
+            df_t = df_t.dropna(subset=[return_col, base_col, lag_col]).reset_index(drop=True)
+            params = {
+                "ticker": row.ticker, "return_col": return_col, "lag_col": lag_col,
+                "lag": int(row.best_sentiment_lag), "order": list(ast.literal_eval(row.order)),
+                "n_train": int(row.n_train), "arima_rmse": row.arima_rmse, "arimax_rmse": row.arimax_rmse,
+                "improvement": row.rmse_improvement_pct, "pvalue": row.sentiment_pvalue, "dpi": dpi,
+            }
+            jobs.append(PlotJob(
+                "rmse_comparison", f"plot_{base}_rmse_comparison.png",
+                f"Porównanie RMSE: ARIMA (baseline) vs ARIMAX z sentymentem — {row.ticker}: "
+                f"zmiana błędu prognozy {-row.rmse_improvement_pct:+.1f}%.",
+                params=params, featured=row.ticker == featured,
+            ))
+            jobs.append(PlotJob(
+                "arimax_forecast", f"plot_{base}_arimax_vs_arima.png",
+                f"Prognoza ARIMAX vs rzeczywiste stopy zwrotu {row.ticker}. "
+                "Górny panel: prognozy. Dolny panel: sentyment (zmienna egzogenna X).",
+                data={"panel": df_t}, params=params, featured=row.ticker == featured,
+            ))
+
+    for ticker in panel.tickers:
+        df_t = panel.frame(ticker, ["date", "Close", "sentiment_mean"]).dropna()
+        if df_t.empty:
+            continue
+        jobs.append(PlotJob(
+            "price_sentiment", f"plot_{ticker.replace('.', '_')}_price_sentiment.png",
+            f"{ticker} — cena zamknięcia vs dzienny sentyment mediów.",
+            data={"panel": df_t}, params={"ticker": ticker, "dpi": dpi},
+        ))
+    return sorted(jobs, key=lambda job: PAGE_ORDER.index(job.kind))
+
+
+# ---------------------------------------------------------------------------
+# docs/index.html
+# ---------------------------------------------------------------------------
+
+def render_charts_html(jobs: list[PlotJob]) -> str:
+    boxes = []
+    for job in jobs:
+        caption = html.escape(job.caption)
+        boxes.append(
+            '      <div class="chart-box">\n'
+            f'        <img src="img/{job.filename}"\n'
+            f'             alt="{caption}">\n'
+            '        <div class="chart-caption">\n'
+            f"          {caption}\n"
+            "        </div>\n"
+            "      </div>"
+        )
+    return "\n".join(boxes)
+
+
+def _is_stale(src: str, dst: str) -> bool:
+    """Kopia w docs/img różni się od pliku w plots (copy2 zachowuje mtime)."""
+    if not os.path.exists(dst):
+        return True
+    src_stat, dst_stat = os.stat(src), os.stat(dst)
+    return src_stat.st_size != dst_stat.st_size or int(src_stat.st_mtime) != int(dst_stat.st_mtime)
+
+
+def _replace_between(page: str, start_marker: str, end_marker: str, html: str) -> str | None:
+    start, end = page.find(start_marker), page.find(end_marker)
+    if start < 0 or end < start:
+        return None
+    head = page[:start + len(start_marker)]
+    indent = head[head.rfind("\n") + 1:start]
+    # render_charts_html wcina pod znaczniki na 6 spacjach — dopasowanie do głębszych
+    shift = " " * max(len(indent) - 6, 0)
+    html = "\n".join(shift + line if line else line for line in html.split("\n"))
+    return f"{head}\n{html}\n{indent}{page[end:]}"
+
+
+def update_index(index_path: str, jobs: list[PlotJob]) -> bool:
+    """
+    Wyróżnione wykresy trafiają między REPORT:START a REPORT:END, pozostałe
+    między REPORT:MORE:START a REPORT:MORE:END. False, gdy brak głównych znaczników.
+    """
+    with open(index_path, encoding="utf-8") as f:
+        page = f.read()
+    featured = [job for job in jobs if job.featured]
+    extra = [job for job in jobs if not job.featured]
+    updated = _replace_between(page, REPORT_START, REPORT_END, render_charts_html(featured))
+    if updated is None:
+        logger.warning(f"{index_path}: brak znaczników {REPORT_START} / {REPORT_END} — pomijam.")
+        return False
+    with_extra = _replace_between(updated, MORE_START, MORE_END, render_charts_html(extra))
+    if with_extra is None:
+        logger.warning(f"{index_path}: brak znaczników {MORE_START} / {MORE_END} — "
+                       f"pomijam {len(extra)} dodatkowych wykresów.")
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write(with_extra or updated)
+    return True
+
+
+def build_report(config_path: str = "config.yaml", force: bool = False) -> pd.DataFrame:
+    """
+    Renderuje wszystkie wykresy (równolegle, z pominięciem niezmienionych),
+    kopiuje je do docs/img i odświeża docs/index.html.
+
+    Returns:
+        DataFrame: filename, kind, status ("rendered" | "skipped")
+    """
+    config = load_config(config_path)
+    plots_dir = config["paths"]["plots"]
+    docs_dir = config["paths"]["docs"]
+    max_workers = config.get("report", {}).get("max_workers", 4)
+    os.makedirs(plots_dir, exist_ok=True)
+    os.makedirs(os.path.join(docs_dir, "img"), exist_ok=True)
+
+    jobs = build_jobs(config)
+    manifest_path = os.path.join(plots_dir, MANIFEST_FILE)
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    fingerprints = {job.filename: job.fingerprint() for job in jobs}
+    todo = [
+        job for job in jobs
+        if manifest.get(job.filename) != fingerprints[job.filename]
+        or not os.path.exists(os.path.join(plots_dir, job.filename))
+    ]
+    logger.info(f"Raport: {len(jobs)} wykresów, do renderowania {len(todo)} (reszta bez zmian)")
+
+    rendered = set()
+    if todo:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(todo)), initializer=_init_style) as executor:
+            futures = {executor.submit(render_job, job, plots_dir): job for job in todo}
+            for future, job in futures.items():
+                try:
+                    rendered.add(future.result())
+                    manifest[job.filename] = fingerprints[job.filename]
+                except Exception as e:
+                    logger.error(f"Błąd wykresu {job.filename}: {e}")
+                    manifest.pop(job.filename, None)
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    published = []
+    for job in jobs:
+        src = os.path.join(plots_dir, job.filename)
+        dst = os.path.join(docs_dir, "img", job.filename)
+        if not os.path.exists(src):
+            continue
+        if job.filename in rendered or _is_stale(src, dst):
+            shutil.copy2(src, dst)
+        published.append(job)
+
+    index_path = os.path.join(docs_dir, "index.html")
+    if os.path.exists(index_path) and update_index(index_path, published):
+        logger.success(f"Zaktualizowano {index_path} ({len(published)} wykresów)")
+
+    return pd.DataFrame([
+        {"filename": job.filename, "kind": job.kind, "status": "rendered" if job.filename in rendered else "skipped"}
+        for job in jobs
+    ])
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Raport WIG20 Sentiment: wykresy + docs/index.html")
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--force", action="store_true", help="Renderuj wszystkie wykresy od nowa")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(build_report(args.config, force=args.force).to_string(index=False))